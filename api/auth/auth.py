@@ -1,7 +1,13 @@
-from passlib.context import CryptContext
-from jose import jwt
-from datetime import datetime, timedelta
+import asyncio
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from jose import jwt
+from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("JWT_SECRET")
@@ -9,12 +15,100 @@ ALGORITHM = os.getenv("JWT_ALGORITHM")
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+# jobs allowed to wait or run at once; beyond this we shed load with a 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+# updated from the event loop and from pool threads
+_password_stats_lock = threading.Lock()
+_password_stats = {
+    "pending": 0,
+    "running": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "max_pending": 0,
+    "wait_seconds": 0.0,
+    "run_seconds": 0.0,
+}
+
+
 def hash_password(password: str):
     return pwd_context.hash(password)
 
+
 def verify_password(plain, hashed):
     return pwd_context.verify(plain, hashed)
 
+
+async def _run_password_job(fn, *args):
+    # check and reserve in one step, so concurrent callers can't all pass the check
+    with _password_stats_lock:
+        admitted = _password_stats["pending"] < PASSWORD_HASH_MAX_PENDING
+        if admitted:
+            _password_stats["pending"] += 1
+            _password_stats["max_pending"] = max(_password_stats["max_pending"], _password_stats["pending"])
+        else:
+            _password_stats["rejected"] += 1
+    if not admitted:
+        raise HTTPException(
+            status_code=503, detail="Too many sign-in attempts in progress. Please retry.", headers={"Retry-After": "1"}
+        )
+
+    enqueued = time.perf_counter()
+
+    def job():
+        started = time.perf_counter()
+        with _password_stats_lock:
+            _password_stats["running"] += 1
+            _password_stats["wait_seconds"] += started - enqueued
+        try:
+            return fn(*args)
+        finally:
+            with _password_stats_lock:
+                _password_stats["running"] -= 1
+                _password_stats["run_seconds"] += time.perf_counter() - started
+
+    outcome = "failed"
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_password_pool, job)
+        outcome = "completed"
+        return result
+    finally:
+        with _password_stats_lock:
+            _password_stats["pending"] -= 1
+            _password_stats[outcome] += 1
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(hash_password, password)
+
+
+async def verify_password_async(plain, hashed) -> bool:
+    return await _run_password_job(verify_password, plain, hashed)
+
+
+def password_pool_stats() -> dict:
+    with _password_stats_lock:
+        stats = dict(_password_stats)
+    done = stats["completed"] + stats["failed"] or 1
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "queue_depth": max(stats["pending"] - stats["running"], 0),
+        "pending": stats["pending"],
+        "running": stats["running"],
+        "completed": stats["completed"],
+        "failed": stats["failed"],
+        "rejected": stats["rejected"],
+        "peak_pending": stats["max_pending"],
+        "avg_wait_ms": round(stats["wait_seconds"] / done * 1000, 2),
+        "avg_run_ms": round(stats["run_seconds"] / done * 1000, 2),
+    }
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -2,13 +2,17 @@
 
 # put comments on the line above per your style rule
 
+import logging
+import os
+
+from dotenv import load_dotenv
+
 # imports
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError, ExpiredSignatureError
-from dotenv import load_dotenv
-import os
-import logging
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from api.cache.user_cache import user_cache
 from api.db.database import get_database
 
 # load .env
@@ -30,6 +34,7 @@ if not JWT_SECRET:
     logger.error("JWT_SECRET missing in environment")
     raise RuntimeError("JWT_SECRET not set")
 
+
 # shared 401
 def _cred_exc(msg: str = "Could not validate credentials"):
     # log and return consistent 401
@@ -40,6 +45,7 @@ def _cred_exc(msg: str = "Could not validate credentials"):
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
 # dependency used by routes
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     # indicate we got a header
@@ -58,10 +64,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 
     except ExpiredSignatureError:
         # token expired
-        raise HTTPException(status_code=401, detail="Token expired")
+        raise HTTPException(status_code=401, detail="Token expired") from None
     except JWTError as e:
         # invalid token
-        raise _cred_exc(f"JWT error: {e}")
+        raise _cred_exc(f"JWT error: {e}") from e
+
+    # serve from the short-TTL cache when possible
+    user = user_cache.get(email)
+    if user:
+        return user
 
     # fetch user
     db = await get_database()
@@ -71,5 +82,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if not user:
         raise _cred_exc(f"no DB user for email={email}")
 
+    user_cache.set(email, user)
+
     # return doc for downstream access (role, _id, etc.)
     return user
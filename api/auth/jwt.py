@@ -1,6 +1,7 @@
 # api/auth/jwt.py
 import os
 from datetime import datetime, timedelta
+
 from jose import jwt
 
 JWT_SECRET = os.getenv("JWT_SECRET")
@@ -10,6 +11,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60 *
 if not JWT_SECRET:
     raise RuntimeError("JWT_SECRET is not set")
 
+
 def issue_jwt(email: str, role: str) -> str:
     claims = {
         "sub": email,
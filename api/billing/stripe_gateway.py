@@ -0,0 +1,140 @@
+# api/billing/stripe_gateway.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import anyio
+import stripe
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+from api.db.database import db
+
+load_dotenv()
+
+logger = logging.getLogger("stripe_gateway")
+
+# --- Stripe config ---
+stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+# point at a local fake (e.g. stripe-mock on http://localhost:12111) for tests
+if os.getenv("STRIPE_API_BASE"):
+    stripe.api_base = os.environ["STRIPE_API_BASE"]
+# requests-backed client keeps one pooled session per worker thread
+stripe.default_http_client = stripe.RequestsClient(timeout=float(os.getenv("STRIPE_TIMEOUT", "20")))
+
+# subscription statuses that still grant access
+LIVE_STATUSES = ("trialing", "active", "past_due")
+
+
+class StripeGateway:
+    """
+    Runs blocking Stripe SDK calls off the event loop (capped by its own limiter) and keeps a
+    per-customer cache of the live subscription, invalidated by webhooks.
+
+    The cache lives in Mongo (`status_collection`), so a webhook handled by one worker
+    invalidates it for every worker. Each invalidation bumps the customer's generation, and a
+    fetch that raced a webhook is not written back.
+    """
+
+    def __init__(self, status_collection, max_workers: int, status_ttl: float):
+        self._limiter = anyio.CapacityLimiter(max_workers)
+        self._status = status_collection
+        self.status_ttl = status_ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    async def _call(self, fn, *args, **kwargs):
+        # own limiter so Stripe latency never eats anyio's shared to_thread slots
+        return await anyio.to_thread.run_sync(lambda: fn(*args, **kwargs), limiter=self._limiter)
+
+    # ---- customers / sessions ----
+    async def create_customer(self, email: Optional[str]) -> str:
+        customer = await self._call(stripe.Customer.create, email=email)
+        return customer.id
+
+    async def portal_url(self, customer_id: str, return_url: str) -> str:
+        session = await self._call(stripe.billing_portal.Session.create, customer=customer_id, return_url=return_url)
+        return session.url
+
+    async def checkout_url(self, **params: Any) -> str:
+        session = await self._call(stripe.checkout.Session.create, **params)
+        return session.url
+
+    async def cancel_at_period_end(self, subscription_id: str, customer_id: Optional[str] = None) -> None:
+        await self._call(stripe.Subscription.modify, subscription_id, cancel_at_period_end=True)
+        await self.invalidate(customer_id)
+
+    # ---- subscriptions ----
+    def _fetch_active_subscription(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        subs = stripe.Subscription.list(customer=customer_id, status="all")
+        for s in subs.auto_paging_iter():
+            if s["status"] in LIVE_STATUSES:
+                return {
+                    "id": s["id"],
+                    "status": s["status"],
+                    "cancel_at_period_end": bool(getattr(s, "cancel_at_period_end", False)),
+                }
+        return None
+
+    async def active_subscription(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the first 'live' subscription for a Stripe customer, or None.
+        Results (including None) are cached until a webhook invalidates them or the TTL runs out.
+        """
+        now = datetime.utcnow()
+        doc = await self._status.find_one({"_id": customer_id}) or {}
+        if "subscription" in doc and doc["expires_at"] > now:
+            self._count("hits")
+            return doc["subscription"]
+        self._count("misses")
+        sub = await self._call(self._fetch_active_subscription, customer_id)
+        try:
+            # only if no webhook bumped the generation while Stripe was answering
+            await self._status.update_one(
+                {"_id": customer_id, "generation": doc.get("generation", 0)},
+                {"$set": {"subscription": sub, "expires_at": now + timedelta(seconds=self.status_ttl)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            pass
+        return sub
+
+    async def invalidate(self, customer_id: Optional[str]) -> None:
+        if not customer_id:
+            return
+        self._count("invalidations")
+        # the document outlives the TTL so a fetch racing this webhook still sees the new generation
+        await self._status.update_one(
+            {"_id": customer_id},
+            {
+                "$inc": {"generation": 1},
+                "$unset": {"subscription": ""},
+                "$set": {"expires_at": datetime.utcnow() + timedelta(seconds=self.status_ttl)},
+            },
+            upsert=True,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        return {
+            "status_cache": {
+                **s,
+                "hit_rate": round(s["hits"] / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": self.status_ttl,
+            }
+        }
+
+
+stripe_gateway = StripeGateway(
+    db.stripe_status,
+    max_workers=int(os.getenv("STRIPE_MAX_WORKERS", "8")),
+    status_ttl=float(os.getenv("STRIPE_STATUS_CACHE_TTL_SECONDS", "60")),
+)
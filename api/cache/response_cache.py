@@ -0,0 +1,162 @@
+# api/cache/response_cache.py
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Dict, Optional
+
+from api.cache.ttl import TTLCache
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# fmt: off
+_CONTRACTIONS = {"i'm": "i am", "im": "i am", "don't": "do not", "can't": "can not", "what's": "what is",
+                 "it's": "it is", "i've": "i have", "isn't": "is not", "won't": "will not"}
+# fmt: on
+
+# fmt: off
+# words that flip or redirect a question; a near match differing in any of them is a different
+# question ("how do I know I'm saved" vs "... I'm not saved"), however close the vectors are
+_GUARD_WORDS = frozenset({
+    "not", "no", "never", "nothing", "nobody", "none", "nor", "neither", "without", "cannot",
+    "lose", "lost", "losing", "still", "anymore", "again", "why", "how", "what", "when", "who",
+    "should", "can", "could", "will", "would", "must", "if", "unless",
+})
+# fmt: on
+
+
+def preference_profile(prefs: Dict[str, Any]) -> str:
+    """
+    The reader's preferences as the crew's prompt shows them (api/crew/agent_handler.py).
+    Shared answers are keyed on the same string, so every preference the prompt carries
+    (locale, timezone, weighting, ...) separates cache entries.
+    """
+    return "; ".join(f"{k}: {v}" for k, v in sorted(prefs.items()) if v not in (None, "", "unset", "DEFAULT"))
+
+
+def normalize_prompt(text: str) -> str:
+    words = (text or "").lower().replace("’", "'").split()
+    words = [_CONTRACTIONS.get(w, w[:-3] + " not" if w.endswith("n't") else w) for w in words]
+    return " ".join(_NON_WORD.sub(" ", " ".join(words)).split())
+
+
+class ResponseCache:
+    """
+    Answer cache for first-turn agent messages.
+
+    Lookup is an exact hash of (normalized prompt, the prompt's preference profile) first;
+    optionally it falls back to TF-IDF cosine similarity against cached prompts that
+    share the same preferences. Turns with conversation history or memories are
+    personal, so they are never served from or written to the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, similarity_threshold: float):
+        self._exact = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        # prefs key -> {hash: token counts}, for the similarity scan
+        self._vectors: Dict[str, Dict[str, Counter]] = {}
+        self._doc_freq: Counter = Counter()
+        self._stats = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "similar_hits": 0,
+            "misses": 0,
+            "skipped": 0,
+            "saved_llm_seconds": 0.0,
+        }
+
+    @staticmethod
+    def _prefs_key(context: Dict[str, Any]) -> str:
+        prefs = (context.get("user_data") or {}).get("preferences") or {}
+        return preference_profile(prefs)
+
+    @staticmethod
+    def cacheable(context: Dict[str, Any]) -> bool:
+        return not context.get("conversation") and not context.get("memories")
+
+    def _tfidf(self, tokens: Counter) -> Dict[str, float]:
+        total = len(self._exact) + 1
+        return {t: c * math.log(total / (1 + self._doc_freq[t])) + c for t, c in tokens.items()}
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        dot = sum(w * b.get(t, 0.0) for t, w in a.items())
+        na = math.sqrt(sum(w * w for w in a.values()))
+        nb = math.sqrt(sum(w * w for w in b.values()))
+        return dot / (na * nb) if na and nb else 0.0
+
+    def _similar(self, prefs_key: str, tokens: Counter) -> Optional[Any]:
+        candidates = self._vectors.get(prefs_key) or {}
+        query = self._tfidf(tokens)
+        best, best_score = None, self.similarity_threshold
+        for digest, other in list(candidates.items()):
+            if (tokens.keys() ^ other.keys()) & _GUARD_WORDS:
+                continue
+            score = self._cosine(query, self._tfidf(other))
+            if score >= best_score:
+                best, best_score = digest, score
+        return self._exact.get(best) if best else None
+
+    def lookup(self, context: Dict[str, Any]):
+        if not self.cacheable(context):
+            with self._lock:
+                self._stats["skipped"] += 1
+            return None
+        prompt = normalize_prompt(context.get("user_input", ""))
+        prefs_key = self._prefs_key(context)
+        digest = hashlib.sha256(f"{prefs_key}\n{prompt}".encode()).hexdigest()
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            run = self._exact.get(digest)
+            kind = "exact_hits"
+            if run is None and self.similarity_threshold > 0:
+                run = self._similar(prefs_key, Counter(prompt.split()))
+                kind = "similar_hits"
+            if run is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats[kind] += 1
+            self._stats["saved_llm_seconds"] += run.timings.get("total", 0.0)
+        return replace(run, cached=True)
+
+    def store(self, context: Dict[str, Any], run) -> None:
+        if not self.cacheable(context) or not run.raw:
+            return
+        prompt = normalize_prompt(context.get("user_input", ""))
+        prefs_key = self._prefs_key(context)
+        digest = hashlib.sha256(f"{prefs_key}\n{prompt}".encode()).hexdigest()
+        tokens = Counter(prompt.split())
+
+        with self._lock:
+            self._exact.set(digest, run)
+            bucket = self._vectors.setdefault(prefs_key, {})
+            if digest not in bucket:
+                self._doc_freq.update(tokens.keys())
+            bucket[digest] = tokens
+            # drop vectors whose answers were evicted or expired
+            for stale in [d for d in bucket if d != digest and self._exact.get(d) is None]:
+                self._doc_freq.subtract(bucket.pop(stale).keys())
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        answered = s["exact_hits"] + s["similar_hits"]
+        return {
+            **s,
+            "saved_llm_seconds": round(s["saved_llm_seconds"], 2),
+            "hit_rate": round(answered / s["lookups"], 4) if s["lookups"] else 0.0,
+            "size": len(self._exact),
+            "similarity_threshold": self.similarity_threshold,
+        }
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_MAXSIZE", "2000")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400")),
+    # 0 (the default) disables the similarity fallback: exact matches only
+    similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0")),
+)
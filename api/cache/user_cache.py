@@ -0,0 +1,38 @@
+# api/cache/user_cache.py
+import copy
+import os
+from typing import Any, Dict, Optional
+
+from api.cache.ttl import TTLCache
+
+
+class UserCache:
+    """
+    Short-lived cache of authenticated user docs, keyed by JWT `sub` (email).
+    Write paths call `invalidate` so profile and role changes show up immediately
+    in this worker; other workers converge within the TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, sub: str) -> Optional[Dict[str, Any]]:
+        user = self._cache.get(sub)
+        # hand out copies so a route can't mutate the shared entry
+        return copy.deepcopy(user) if user is not None else None
+
+    def set(self, sub: str, user: Dict[str, Any]) -> None:
+        self._cache.set(sub, copy.deepcopy(user))
+
+    def invalidate(self, sub: Optional[str]) -> None:
+        if sub:
+            self._cache.pop(sub)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+user_cache = UserCache(
+    maxsize=int(os.getenv("USER_CACHE_MAXSIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "30")),
+)
@@ -0,0 +1,69 @@
+# api/cache/verse_cache.py
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from api.cache.ttl import MISSING, TTLCache
+from api.db.elastic import ELASTIC_INDEX, ElasticClient
+
+logger = logging.getLogger("verse_cache")
+
+# the loaders bump {generation} on this doc every time they (re)index the corpus
+ELASTIC_META_INDEX = os.getenv("ELASTIC_META_INDEX", "discern_meta")
+
+
+class VerseCache:
+    """
+    Search-result cache for the (effectively immutable) verse corpus.
+    Entries are keyed on the normalized query plus the corpus generation, so a
+    reindex invalidates everything without waiting for TTLs to run out.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, generation_check_interval: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.generation = 0
+        self.generation_check_interval = generation_check_interval
+        self._generation_checked_at = 0.0
+
+    @staticmethod
+    def key(q: str, translation: Optional[str], size: int) -> tuple:
+        return (" ".join(q.lower().split()), translation or "DEFAULT", size)
+
+    def get(self, key: tuple) -> Any:
+        return self._cache.get((self.generation, *key), MISSING)
+
+    def set(self, key: tuple, value: Any) -> None:
+        self._cache.set((self.generation, *key), value)
+
+    def bump_generation(self, generation: Optional[int] = None) -> None:
+        self.generation = self.generation + 1 if generation is None else generation
+        self._cache.clear()
+        logger.info("verse cache generation -> %s", self.generation)
+
+    async def sync_generation(self, es: ElasticClient) -> None:
+        """Pick up reindexes done by the loader; at most one ES read per check interval."""
+        now = time.monotonic()
+        if now - self._generation_checked_at < self.generation_check_interval:
+            return
+        self._generation_checked_at = now
+        try:
+            r = await es.get(f"/{ELASTIC_META_INDEX}/_doc/{ELASTIC_INDEX}")
+        except Exception as e:
+            logger.warning("verse cache generation check failed: %s", e)
+            return
+        if r.status_code != 200:
+            return
+        generation = int(r.json().get("_source", {}).get("generation", 0))
+        if generation != self.generation:
+            self.bump_generation(generation)
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "generation": self.generation}
+
+
+verse_cache = VerseCache(
+    maxsize=int(os.getenv("VERSE_CACHE_MAXSIZE", "5000")),
+    ttl=float(os.getenv("VERSE_CACHE_TTL_SECONDS", "3600")),
+    generation_check_interval=float(os.getenv("VERSE_CACHE_GENERATION_CHECK_SECONDS", "30")),
+)
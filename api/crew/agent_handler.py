@@ -1,6 +1,134 @@
-from crew.discern_crew import DiscernCrew
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import replace
+from typing import DefaultDict, Dict
 
-def run_discern_agents(prompt):
-    crew_instance = DiscernCrew(user_prompt=prompt)
-    result = crew_instance.crew().kickoff()
-    return result.raw
+from api.cache.response_cache import preference_profile, response_cache
+from api.crew.citations import hydrate, quote_policy
+from api.crew.crew_pool import CREW_POOL_SIZE, CrewPool
+from crew.discern_crew import CrewRun, DiscernCrew
+
+# pre-built crews; requests only bind their inputs at kickoff
+crew_pool = CrewPool(DiscernCrew, size=CREW_POOL_SIZE)
+
+# per-intent timing totals for this process
+_timings_lock = threading.Lock()
+_intent_timings: DefaultDict[str, Dict[str, float]] = defaultdict(
+    lambda: {"count": 0, "route": 0.0, "answer": 0.0, "total": 0.0}
+)
+
+
+def _format_conversation(messages) -> str:
+    lines = []
+    for m in messages or []:
+        speaker = "User" if m.get("role") == "user" else "Assistant"
+        lines.append(f"{speaker}: {m.get('message', '')}")
+    return "\n".join(lines)
+
+
+def _format_user_profile(user, include_name: bool = True) -> str:
+    if not user:
+        return ""
+    prefs = user.get("preferences") or {}
+    parts = [f"name: {user.get('first_name') or 'friend'}"] if include_name else []
+    profile = preference_profile(prefs)
+    return "; ".join(parts + ([profile] if profile else []))
+
+
+def _format_memories(memories) -> str:
+    return "\n".join(f"- {m.get('memory', '')}" for m in memories or [])
+
+
+def build_inputs(context) -> dict:
+    """Flatten the route context into the string placeholders used by config/tasks.yaml."""
+    user = context.get("user_data") or {}
+    prefs = user.get("preferences") or {}
+    return {
+        "prompt": context.get("user_input", ""),
+        "conversation": _format_conversation(context.get("conversation")),
+        # cacheable answers are shared across users, so they must not address anyone by name
+        "user_profile": _format_user_profile(user, include_name=not response_cache.cacheable(context)),
+        "memories": _format_memories(context.get("memories")),
+        "desired_length": prefs.get("response_length") or "standard",
+        # passages are retrieved in this translation ("DEFAULT" searches all of them)
+        "translation": prefs.get("translation") or "DEFAULT",
+        # verse wording is added after the run (api/crew/citations.py) unless the reader opted out
+        "quote_policy": quote_policy(prefs),
+        "router_summary": "",
+        "scripture": "",
+    }
+
+
+def _record_timings(run: CrewRun) -> None:
+    with _timings_lock:
+        stats = _intent_timings[run.intent]
+        stats["count"] += 1
+        for phase in ("route", "answer", "total"):
+            stats[phase] += run.timings.get(phase, 0.0)
+
+
+def intent_timings() -> dict:
+    """Average seconds per phase, per routed intent."""
+    with _timings_lock:
+        return {
+            intent: {
+                "count": s["count"],
+                **{f"avg_{p}": round(s[p] / s["count"], 3) for p in ("route", "answer", "total")},
+            }
+            for intent, s in _intent_timings.items()
+            if s["count"]
+        }
+
+
+def _cite(run: CrewRun, context) -> CrewRun:
+    prefs = (context.get("user_data") or {}).get("preferences") or {}
+    raw = hydrate(run.raw, prefs)
+    return run if raw == run.raw else replace(run, raw=raw)
+
+
+def run_discern_agents(context, on_event=None, cancel=None) -> CrewRun:
+    cached = response_cache.lookup(context)
+    if cached is not None:
+        run = _cite(cached, context)
+        if on_event:
+            on_event("stage", {"stage": "cached", "intent": run.intent})
+            on_event("token", {"text": run.raw})
+        return run
+
+    with crew_pool.checkout() as crew_instance:
+        run = crew_instance.run(build_inputs(context), on_event=on_event, cancel=cancel)
+    _record_timings(run)
+    # cached with references only; quotes are rendered per reader
+    response_cache.store(context, run)
+    cited = _cite(run, context)
+    # streamed tokens carried the bare references; hand the client the quoted text to swap in
+    if on_event and cited is not run:
+        on_event("replace", {"text": cited.raw})
+    return cited
+
+
+def run_fake_agents(context, on_event=None, cancel=None) -> CrewRun:
+    """In-process stand-in for the crew (no LLM calls); same events and result shape."""
+    emit = on_event or (lambda event, data: None)
+    prompt = context.get("user_input", "")
+    emit("stage", {"stage": "routed", "intent": "teaching"})
+    for stage in ("drafting", "validating", "editing"):
+        emit("stage", {"stage": stage})
+    raw = f"(fake answer) You asked: {prompt}"
+    for word in raw.split(" "):
+        emit("token", {"text": word + " "})
+    time.sleep(FAKE_AGENT_DELAY_SECONDS)
+    return CrewRun(
+        raw=raw,
+        intent="teaching",
+        decision={"primary_intent": "teaching"},
+        timings={"route": 0.0, "answer": FAKE_AGENT_DELAY_SECONDS, "total": FAKE_AGENT_DELAY_SECONDS},
+    )
+
+
+# "crew" runs DiscernCrew; "fake" answers without an LLM (local dev, tests, load tests)
+AGENT_BACKEND = os.getenv("AGENT_BACKEND", "crew")
+FAKE_AGENT_DELAY_SECONDS = float(os.getenv("FAKE_AGENT_DELAY_SECONDS", "0"))
+agent_runner = run_fake_agents if AGENT_BACKEND == "fake" else run_discern_agents
@@ -0,0 +1,148 @@
+# api/crew/citations.py
+"""
+Citation hydration for finished answers.
+
+The crew is told to cite passages by reference only ({quote_policy} in config/tasks.yaml).
+After the run, every reference in the final Markdown is resolved in one batch in the
+reader's translation (verse store, else a single `_msearch`; preferences the corpus lacks,
+such as NIV, get the default translation, named in the label) and the wording is added per
+`citation_style`: "inline" puts a short block quote under the line that first cites the
+passage, "footnote" numbers the references and lists the verses at the end, and "none"
+leaves the prose as written. Quotes come from the text itself rather than the model's
+memory, and cost no output tokens.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Dict, List
+
+from api.scripture.references import LAST_VERSE, find_references, format_span
+from api.scripture.verse_store import served_translation
+from crew.tools.scripture_search_tool import lookup_passages
+
+logger = logging.getLogger("citations")
+
+# verses quoted per reference; longer passages are cut with an ellipsis
+CITATION_MAX_VERSES = int(os.getenv("CITATION_MAX_VERSES", "3"))
+
+_LIST_ITEM = re.compile(r"[ \t]*(?:[-*+]|\d+[.)])[ \t]+")
+
+_lock = threading.Lock()
+_stats = {"answers": 0, "references": 0, "unresolved": 0}
+
+
+def quotes_injected(prefs: dict) -> bool:
+    """Whether answers for these preferences get verse wording added after the run."""
+    return prefs.get("include_direct_quotes", True) is not False and (prefs.get("citation_style") or "inline") in (
+        "inline",
+        "footnote",
+    )
+
+
+def quote_policy(prefs: dict) -> str:
+    """The crew's quoting instruction for these preferences."""
+    if quotes_injected(prefs):
+        translation = prefs.get("translation") or "DEFAULT"
+        served = served_translation(translation)
+        source = "the reader's translation" if served == translation else f"the {served}"
+        return (
+            'Cite passages by reference only, e.g. "(John 3:16)"; do not write out verse wording, '
+            f"it is added from {source} afterwards."
+        )
+    if prefs.get("include_direct_quotes", True) is not False:
+        return 'Cite passages by reference, e.g. "(John 3:16)"; quote at most a short phrase, and only from the retrieved passages.'
+    return 'Cite passages by reference only, e.g. "(John 3:16)"; do not quote verse wording.'
+
+
+def _quote(verses: List[dict]) -> str:
+    text = " ".join(v["text"].strip() for v in verses[:CITATION_MAX_VERSES])
+    return f"“{text}{' …' if len(verses) > CITATION_MAX_VERSES else ''}”"
+
+
+def _inline(text: str, found: list, resolved: Dict[str, List[dict]]) -> str:
+    # block quotes go after the end of the line that first cites each passage
+    inserts: Dict[int, List[tuple]] = {}  # line end -> [(indent, quote)]
+    quoted = set()
+    for start, end, label in found:
+        if label not in resolved or label in quoted:
+            continue
+        quoted.add(label)
+        verses = resolved[label]
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", end)
+        line_end = len(text) if line_end == -1 else line_end
+        item = _LIST_ITEM.match(text, line_start)
+        indent = " " * (item.end() - line_start) if item else ""
+        inserts.setdefault(line_end, []).append((indent, f"{_quote(verses)} ({label}, {verses[0]['translation']})"))
+
+    out, pos = [], 0
+    for line_end in sorted(inserts):
+        indent = inserts[line_end][0][0]
+        block = f"\n{indent}>\n".join(f"{indent}> {quote}" for _, quote in inserts[line_end])
+        out.append(text[pos:line_end])
+        # inside a list item the quote nests under it; in prose it needs blank lines around it
+        if indent:
+            out.append(f"\n{block}")
+        else:
+            out.append(f"\n\n{block}" + ("" if text.startswith("\n\n", line_end) else "\n"))
+        pos = line_end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def _footnotes(text: str, found: list, resolved: Dict[str, List[dict]]) -> str:
+    numbers: Dict[str, int] = {}
+    out, pos = [], 0
+    for _, end, label in found:
+        if label not in resolved:
+            continue
+        n = numbers.setdefault(label, len(numbers) + 1)
+        out.append(f"{text[pos:end]}[^{n}]")
+        pos = end
+    out.append(text[pos:])
+    notes = [
+        f"[^{n}]: {label} ({resolved[label][0]['translation']}) {_quote(resolved[label])}"
+        for label, n in numbers.items()
+    ]
+    return "".join(out).rstrip() + "\n\n" + "\n".join(notes) + "\n"
+
+
+def hydrate(text: str, prefs: dict) -> str:
+    """`text` with the wording of every passage it cites, rendered per the reader's preferences."""
+    if not text or not quotes_injected(prefs):
+        return text
+    # whole chapters ("Romans 8") are pointers for further reading, not something to quote
+    cited: Dict[str, list] = {}
+    found = []
+    for start, end, spans in find_references(text):
+        spans = [s for s in spans if s.end_verse != LAST_VERSE]
+        if spans:
+            label = "; ".join(format_span(s) for s in spans)
+            cited.setdefault(label, spans)
+            found.append((start, end, label))
+    if not found:
+        return text
+
+    # one lookup for every distinct passage; one extra verse shows whether a quote was cut short
+    # translations outside the corpus are quoted in the default one, labelled as such
+    translation = served_translation(prefs.get("translation") or "DEFAULT")
+    passages = lookup_passages(list(cited.values()), translation, CITATION_MAX_VERSES + 1)
+    resolved = {label: verses for label, verses in zip(cited, passages) if verses}
+    with _lock:
+        _stats["answers"] += 1
+        _stats["references"] += len(cited)
+        _stats["unresolved"] += len(cited) - len(resolved)
+    if len(resolved) < len(cited):
+        logger.info("citations: unresolved %s", [label for label in cited if label not in resolved])
+    if not resolved:
+        return text
+    if prefs.get("citation_style") == "footnote":
+        return _footnotes(text, found, resolved)
+    return _inline(text, found, resolved)
+
+
+def citation_stats() -> dict:
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,113 @@
+# api/crew/crew_pool.py
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Generic, Iterator, Optional, TypeVar
+
+logger = logging.getLogger("crew_pool")
+
+T = TypeVar("T")
+
+
+class CrewPool(Generic[T]):
+    """
+    Pool of pre-built crew instances (agents, tasks and their LLM clients).
+    Each instance serves one request at a time; per-request inputs are bound at
+    kickoff, so nothing is rebuilt between messages. An instance whose run raised
+    (cancelled, timed out, failed) may hold that run's state, so it is discarded and
+    rebuilt on a later checkout instead of going back to the pool.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int):
+        self._factory = factory
+        self.size = size
+        # None stands in for a discarded instance whose replacement hasn't been built yet
+        self._idle: "queue.LifoQueue[Optional[T]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {"checkouts": 0, "builds": 0, "discarded": 0, "build_seconds": 0.0, "wait_seconds": 0.0}
+
+    def _build(self) -> T:
+        started = time.perf_counter()
+        instance = self._factory()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["builds"] += 1
+            self._stats["build_seconds"] += elapsed
+        logger.info("built crew instance in %.3fs", elapsed)
+        return instance
+
+    def _acquire(self) -> T:
+        try:
+            return self._replace_discarded(self._idle.get_nowait())
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_build = self._created < self.size
+            if can_build:
+                self._created += 1
+        if can_build:
+            try:
+                return self._build()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        # at capacity: wait for a running request to hand one back
+        return self._replace_discarded(self._idle.get())
+
+    def _replace_discarded(self, instance: Optional[T]) -> T:
+        if instance is not None:
+            return instance
+        try:
+            return self._build()
+        except Exception:
+            self._idle.put(None)
+            raise
+
+    @contextmanager
+    def checkout(self) -> Iterator[T]:
+        started = time.perf_counter()
+        instance = self._acquire()
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += time.perf_counter() - started
+        try:
+            yield instance
+        except BaseException:
+            with self._lock:
+                self._stats["discarded"] += 1
+            self._idle.put(None)
+            raise
+        self._idle.put(instance)
+
+    def warm(self, count: int) -> None:
+        """Build up to `count` instances ahead of the first request."""
+        built = []
+        for _ in range(min(count, self.size)):
+            built.append(self._acquire())
+        for instance in built:
+            self._idle.put(instance)
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            created = self._created
+        checkouts = s["checkouts"] or 1
+        return {
+            "size": self.size,
+            "created": created,
+            "idle": self._idle.qsize(),
+            "checkouts": s["checkouts"],
+            "discarded": s["discarded"],
+            "avg_build_ms": round(s["build_seconds"] / (s["builds"] or 1) * 1000, 2),
+            # per-request setup cost once the pool is warm
+            "avg_checkout_ms": round(s["wait_seconds"] / checkouts * 1000, 3),
+        }
+
+
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", "8"))
+CREW_POOL_WARM = int(os.getenv("CREW_POOL_WARM", "1"))
@@ -0,0 +1,172 @@
+# api/crew/executor.py
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+
+from crew.discern_crew import RunCancelled
+
+logger = logging.getLogger("agent_executor")
+
+
+@dataclass
+class AgentJob:
+    future: Future
+    # set on timeout; the crew stops at its next task boundary
+    cancel: threading.Event = field(default_factory=threading.Event)
+
+
+class AgentExecutor:
+    """
+    Dedicated threads for crew runs, separate from anyio's shared to_thread pool so
+    LLM latency can't starve auth or other offloaded work.
+
+    At most `workers` runs execute and `max_queue` more wait; beyond that submit()
+    sheds load with a 503. Each job has a timeout after which the caller gets a 504
+    and the run is cancelled (dropped if still queued, stopped between tasks if running).
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent")
+        # updated from the event loop and from pool threads
+        self._lock = threading.Lock()
+        self._stats = {
+            "pending": 0,
+            "running": 0,
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "max_pending": 0,
+            "started": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def _retry_after(self) -> int:
+        # rough time for the queue ahead to drain, from the average run so far
+        s = self._stats
+        avg_run = s["run_seconds"] / s["started"] if s["started"] else 10.0
+        return max(1, math.ceil(avg_run * max(s["pending"] - self.workers, 1) / self.workers))
+
+    def _reject_if_full(self) -> None:
+        # caller holds self._lock
+        if self._stats["pending"] >= self.workers + self.max_queue:
+            self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="The assistant is busy. Please retry shortly.",
+                headers={"Retry-After": str(self._retry_after())},
+            )
+
+    def reserve(self) -> None:
+        """
+        Claim a slot (503 when full) before a route does any writes, so the later
+        submit(..., reserved=True) can't fail after the turn is recorded; release() hands it back.
+        """
+        with self._lock:
+            self._reject_if_full()
+            self._stats["pending"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._stats["pending"])
+
+    def release(self) -> None:
+        """Give back a reserve()d slot that won't be submitted."""
+        with self._lock:
+            self._stats["pending"] -= 1
+
+    def submit(self, fn, *args, reserved: bool = False) -> AgentJob:
+        """Queue `fn(*args, cancel=event)`; raises 503 when the queue is full, unless a slot was reserved."""
+        with self._lock:
+            if not reserved:
+                self._reject_if_full()
+                self._stats["pending"] += 1
+            self._stats["submitted"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._stats["pending"])
+
+        cancel = threading.Event()
+        enqueued = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            waited = started - enqueued
+            with self._lock:
+                self._stats["running"] += 1
+                self._stats["started"] += 1
+                self._stats["wait_seconds"] += waited
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            ok = False
+            try:
+                result = fn(*args, cancel=cancel)
+                ok = True
+                return result
+            finally:
+                # released only when the thread is actually free, even if the caller gave up
+                with self._lock:
+                    self._stats["running"] -= 1
+                    self._stats["pending"] -= 1
+                    self._stats["run_seconds"] += time.perf_counter() - started
+                    self._stats["completed" if ok else "failed"] += 1
+
+        future = self._pool.submit(job)
+        future.add_done_callback(self._on_done)
+        return AgentJob(future=future, cancel=cancel)
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            # dropped before it started, so job() never released its slot
+            with self._lock:
+                self._stats["pending"] -= 1
+                self._stats["cancelled"] += 1
+        elif isinstance(future.exception(), RunCancelled):
+            logger.info("agent run stopped after timeout")
+
+    async def wait(self, job: AgentJob):
+        """Await the job's result; raises 504 after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job.future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            job.cancel.set()
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise HTTPException(status_code=504, detail="The assistant took too long to respond.") from None
+        except asyncio.CancelledError:
+            # caller went away (e.g. client disconnected); stop the run too
+            job.cancel.set()
+            raise
+
+    async def run(self, fn, *args, reserved: bool = False):
+        return await self.wait(self.submit(fn, *args, reserved=reserved))
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        started = s.pop("started") or 1
+        return {
+            **{k: v for k, v in s.items() if not k.endswith("seconds")},
+            "queued": max(s["pending"] - s["running"], 0),
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "timeout_seconds": self.timeout,
+            "avg_queue_wait_ms": round(s["wait_seconds"] / started * 1000, 1),
+            "max_queue_wait_ms": round(s["max_wait_seconds"] * 1000, 1),
+            "avg_run_ms": round(s["run_seconds"] / started * 1000, 1),
+        }
+
+
+agent_executor = AgentExecutor(
+    workers=int(os.getenv("AGENT_WORKERS", "8")),
+    max_queue=int(os.getenv("AGENT_MAX_QUEUE", "32")),
+    timeout=float(os.getenv("AGENT_TIMEOUT_SECONDS", "180")),
+)
@@ -0,0 +1,309 @@
+# api/crew/jobs.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from api.crew.agent_handler import agent_runner
+from api.crew.executor import agent_executor
+from api.db.database import db
+
+logger = logging.getLogger("agent_jobs")
+
+# queued -> running -> done | failed; a running job whose lease lapsed is claimable again
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+# finished jobs are removed by the TTL index in api/db/indexes.py
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 86400)))
+
+# never copy credentials into a job or back out of one
+_USER_PROJECTION = {"hashed_password": 0}
+
+
+async def save_reply(db, user_id: str, conversation_id: str, run) -> Any:
+    # save agent response (with routing info for latency analysis)
+    system_msg_doc = {
+        "conversation_id": conversation_id,
+        "user_id": user_id,
+        "role": "system",
+        "message": run.raw,
+        "intent": run.intent,
+        "timings": run.timings,
+        "cached": run.cached,
+        "created_at": datetime.utcnow(),
+    }
+    result = await db.messages.insert_one(system_msg_doc)
+    return result.inserted_id
+
+
+async def enqueue_job(db, user, conversation_id: str, context: Dict[str, Any]) -> str:
+    """Persist one agent turn for the job worker; the user doc is reloaded when it runs."""
+    now = datetime.utcnow()
+    doc = {
+        "user_id": str(user["_id"]),
+        "conversation_id": conversation_id,
+        "status": QUEUED,
+        "input": {
+            "user_input": context["user_input"],
+            "conversation": context.get("conversation") or [],
+            "memories": context.get("memories") or [],
+        },
+        "attempts": 0,
+        "created_at": now,
+        "updated_at": now,
+    }
+    result = await db.jobs.insert_one(doc)
+    job_worker.wake()
+    return str(result.inserted_id)
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    # public shape for GET /agent/jobs/{id}
+    view = {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "conversation_id": job["conversation_id"],
+        "created_at": job["created_at"],
+        "updated_at": job.get("updated_at"),
+    }
+    if job["status"] == DONE:
+        view.update(job.get("result") or {})
+    elif job["status"] == FAILED:
+        view["error"] = job.get("error")
+    return view
+
+
+async def get_job(db, job_id: str, user_id: str, wait: float = 0) -> Dict[str, Any]:
+    """Fetch a caller's job; with `wait`, long-poll until it finishes or the wait runs out."""
+    if not ObjectId.is_valid(job_id):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    query = {"_id": ObjectId(job_id), "user_id": user_id}
+    deadline = asyncio.get_running_loop().time() + wait
+    while True:
+        job = await db.jobs.find_one(query, projection={"input": 0})
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found.")
+        remaining = deadline - asyncio.get_running_loop().time()
+        if job["status"] in FINISHED or remaining <= 0:
+            return job_view(job)
+        await asyncio.sleep(min(JOB_POLL_SECONDS, remaining))
+
+
+class JobWorker:
+    """
+    Claims queued agent jobs from Mongo and runs them on the agent executor.
+
+    A claim is one find_one_and_update that sets a lease; the lease is renewed while
+    the crew runs, so a job held by a worker that died becomes claimable again once
+    its lease lapses. Jobs are retried up to `max_attempts` times, counting claims whose
+    worker died or hung, so a job that takes its worker down is failed rather than reclaimed forever.
+    """
+
+    def __init__(self, db, runner: Callable, concurrency: int, lease: float, poll: float, max_attempts: int):
+        self.db = db
+        # run_discern_agents, or an in-process fake for tests (see AGENT_BACKEND)
+        self.runner = runner
+        self.concurrency = concurrency
+        self.lease = lease
+        self.poll = poll
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running: Dict[Any, asyncio.Task] = {}
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self.stats_counters = {"claimed": 0, "done": 0, "failed": 0, "retried": 0, "requeued": 0}
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._wake = asyncio.Event()
+            self._stopping = False
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is None:
+            return
+        # let the loop exit on its own; cancelling it mid wait_for can be swallowed
+        self._stopping = True
+        self.wake()
+        await self._loop_task
+        unfinished = list(self._running)
+        for task in list(self._running.values()):
+            task.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+        self._loop_task = None
+        # hand unfinished work straight back instead of waiting for the leases to lapse
+        if unfinished:
+            result = await self.db.jobs.update_many(
+                {"_id": {"$in": unfinished}, "status": RUNNING, "worker_id": self.worker_id},
+                {
+                    "$set": {"status": QUEUED, "lease_expires_at": None, "updated_at": datetime.utcnow()},
+                    "$inc": {"attempts": -1},
+                },
+            )
+            self.stats_counters["requeued"] += result.modified_count
+        self._running.clear()
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.db.jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": QUEUED},
+                    {"status": RUNNING, "lease_expires_at": {"$lt": now}, "attempts": {"$lt": self.max_attempts}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "worker_id": self.worker_id,
+                    "updated_at": now,
+                    "lease_expires_at": now + timedelta(seconds=self.lease),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _fail_abandoned(self) -> None:
+        # lapsed leases on their last attempt: the worker died or hung on every try
+        now = datetime.utcnow()
+        result = await self.db.jobs.update_many(
+            {"status": RUNNING, "lease_expires_at": {"$lt": now}, "attempts": {"$gte": self.max_attempts}},
+            {
+                "$set": {
+                    "status": FAILED,
+                    "error": "Agent stopped responding.",
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=JOB_RETENTION_SECONDS),
+                }
+            },
+        )
+        self.stats_counters["failed"] += result.modified_count
+
+    async def _loop(self) -> None:
+        while not self._stopping:
+            try:
+                await self._fail_abandoned()
+                while not self._stopping and len(self._running) < self.concurrency:
+                    job = await self._claim()
+                    if job is None:
+                        break
+                    self.stats_counters["claimed"] += 1
+                    task = asyncio.create_task(self._execute(job))
+                    self._running[job["_id"]] = task
+                    task.add_done_callback(partial(self._finished, job["_id"]))
+            except Exception:
+                logger.exception("job claim failed")
+            if self._stopping:
+                break
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, job_id, _task: Optional[asyncio.Task] = None) -> None:
+        self._running.pop(job_id, None)
+        self.wake()
+
+    async def _renew_lease(self, job_id) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            await self.db.jobs.update_one(
+                {"_id": job_id, "status": RUNNING, "worker_id": self.worker_id},
+                {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease)}},
+            )
+
+    async def _set(self, job, update: Dict[str, Any], inc_attempts: int = 0) -> None:
+        # only the current lease holder may move a job on
+        update["updated_at"] = datetime.utcnow()
+        change: Dict[str, Any] = {"$set": update}
+        if inc_attempts:
+            change["$inc"] = {"attempts": inc_attempts}
+        await self.db.jobs.update_one({"_id": job["_id"], "status": RUNNING, "worker_id": self.worker_id}, change)
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        renew = asyncio.create_task(self._renew_lease(job["_id"]))
+        try:
+            user = await self.db.users.find_one({"_id": ObjectId(job["user_id"])}, projection=_USER_PROJECTION)
+            if not user:
+                raise ValueError("user no longer exists")
+            context = {**job["input"], "user_data": user}
+            run = await agent_executor.run(self.runner, context)
+            message_id = await save_reply(self.db, job["user_id"], job["conversation_id"], run)
+            await self._set(
+                job,
+                {
+                    "status": DONE,
+                    "result": {"response": run.raw, "intent": run.intent, "message_id": str(message_id)},
+                    "expires_at": datetime.utcnow() + timedelta(seconds=JOB_RETENTION_SECONDS),
+                },
+            )
+            self.stats_counters["done"] += 1
+        except asyncio.CancelledError:
+            raise
+        except HTTPException as e:
+            if e.status_code == 503:
+                # executor full of interactive requests; back off and let the job be claimed again
+                await asyncio.sleep(self.poll)
+                await self._set(job, {"status": QUEUED, "lease_expires_at": None}, inc_attempts=-1)
+                self.stats_counters["requeued"] += 1
+            else:
+                # run timed out (504)
+                await self._fail_or_retry(job, e.detail)
+        except Exception:
+            logger.exception("job %s failed", job["_id"])
+            await self._fail_or_retry(job, "Agent failed to respond.")
+        finally:
+            renew.cancel()
+
+    async def _fail_or_retry(self, job, detail: str) -> None:
+        if job["attempts"] < self.max_attempts:
+            self.stats_counters["retried"] += 1
+            await self._set(job, {"status": QUEUED, "lease_expires_at": None, "error": detail})
+            return
+        self.stats_counters["failed"] += 1
+        await self._set(
+            job,
+            {
+                "status": FAILED,
+                "error": detail,
+                "expires_at": datetime.utcnow() + timedelta(seconds=JOB_RETENTION_SECONDS),
+            },
+        )
+
+    def stats(self) -> dict:
+        return {
+            **self.stats_counters,
+            "worker_id": self.worker_id,
+            "active": len(self._running),
+            "concurrency": self.concurrency,
+        }
+
+
+job_worker = JobWorker(
+    db,
+    runner=agent_runner,
+    concurrency=JOB_CONCURRENCY,
+    lease=JOB_LEASE_SECONDS,
+    poll=JOB_POLL_SECONDS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+)
@@ -1,12 +1,14 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 import os
 
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 
-client = AsyncIOMotorClient(MONGO_URI)
+client: AsyncIOMotorClient = AsyncIOMotorClient(MONGO_URI)
 db = client["discern"]
 
+
 async def get_database():
     return db
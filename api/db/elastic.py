@@ -0,0 +1,100 @@
+# api/db/elastic.py
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("elastic")
+
+ELASTIC_HOST = os.getenv("ELASTIC_HOST", "http://elasticsearch:9200").rstrip("/")
+ELASTIC_INDEX = os.getenv("ELASTIC_INDEX", "bible_verses")
+
+# statuses worth another attempt (overload / gateway hiccups)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class ElasticClient:
+    """
+    Shared async Elasticsearch client: one keep-alive connection pool per process,
+    bounded timeouts, and retry with exponential backoff for transient failures.
+    """
+
+    def __init__(
+        self,
+        host: str = ELASTIC_HOST,
+        timeout: float = 5.0,
+        connect_timeout: float = 2.0,
+        max_connections: int = 50,
+        max_keepalive: int = 20,
+        max_retries: int = 2,
+        backoff: float = 0.2,
+    ):
+        self.host = host
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> "ElasticClient":
+        return cls(
+            timeout=float(os.getenv("ELASTIC_TIMEOUT", "5")),
+            connect_timeout=float(os.getenv("ELASTIC_CONNECT_TIMEOUT", "2")),
+            max_connections=int(os.getenv("ELASTIC_MAX_CONNECTIONS", "50")),
+            max_keepalive=int(os.getenv("ELASTIC_MAX_KEEPALIVE", "20")),
+            max_retries=int(os.getenv("ELASTIC_MAX_RETRIES", "2")),
+            backoff=float(os.getenv("ELASTIC_RETRY_BACKOFF", "0.2")),
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=self.host, timeout=self.timeout, limits=self.limits)
+            logger.info("elastic client started for %s", self.host)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("elastic client closed")
+
+    async def request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        # scripts and tests may use the client without the app lifespan
+        if self._client is None:
+            await self.start()
+        client = self._client
+        assert client is not None
+
+        attempt = 0
+        while True:
+            try:
+                r = await client.request(method, path, **kwargs)
+                if r.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return r
+                logger.warning("elastic %s %s -> %s, retrying", method, path, r.status_code)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning("elastic %s %s failed (%s), retrying", method, path, e)
+            # exponential backoff with jitter
+            await asyncio.sleep(self.backoff * (2**attempt) * (0.5 + random.random()))
+            attempt += 1
+
+    async def post(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+
+elastic = ElasticClient.from_env()
+
+
+async def get_elastic() -> ElasticClient:
+    return elastic
@@ -0,0 +1,216 @@
+# api/db/indexes.py
+"""
+Declared Mongo indexes for every collection the API queries, applied on startup.
+
+    python -m api.db.indexes           # apply
+    python -m api.db.indexes --verify  # apply, then fail if a hot query plans a COLLSCAN
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger("indexes")
+
+# collection -> indexes the routes rely on
+INDEXES = {
+    "users": [
+        # Mongo's default names, which databases seeded before this module already use
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        IndexModel(
+            [("auth_providers.google.sub", ASCENDING)], name="auth_providers.google.sub_1", unique=True, sparse=True
+        ),
+        IndexModel([("stripe_customer_id", ASCENDING)], name="stripe_customer", sparse=True),
+        # admin search: email prefix + keyset order, optionally narrowed by role or subscription status
+        IndexModel([("email_lower", ASCENDING), ("_id", ASCENDING)], name="email_lower_id"),
+        IndexModel([("role", ASCENDING), ("email_lower", ASCENDING), ("_id", ASCENDING)], name="role_email_lower"),
+        IndexModel(
+            [("subscription_status", ASCENDING), ("email_lower", ASCENDING), ("_id", ASCENDING)],
+            name="subscription_status_email_lower",
+        ),
+    ],
+    "conversations": [
+        # _id breaks created_at ties for keyset pagination (api/db/pagination.py)
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_recent_id"),
+    ],
+    "messages": [
+        IndexModel(
+            [("conversation_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)],
+            name="conversation_timeline_id",
+        ),
+    ],
+    "memories": [
+        IndexModel([("user_id", ASCENDING)], name="user"),
+    ],
+    "subscriptions": [
+        IndexModel([("stripe_subscription_id", ASCENDING)], name="stripe_subscription_unique", unique=True),
+        IndexModel([("stripe_customer_id", ASCENDING)], name="stripe_customer"),
+    ],
+    "jobs": [
+        # claim order, plus lapsed-lease recovery
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"),
+        # only finished jobs carry expires_at
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "stripe_status": [
+        # cached subscription status (api/billing/stripe_gateway.py); lookups are by _id
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    "rate_limits": [
+        # closed rate-limit buckets expire on their own
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# the queries behind api/routes/* that must stay index-backed (sample values only shape the plan)
+HOT_QUERIES: List[Dict[str, Any]] = [
+    {"collection": "users", "filter": {"email": "someone@example.com"}},
+    {"collection": "users", "filter": {"auth_providers.google.sub": "google-sub"}},
+    {"collection": "users", "filter": {"stripe_customer_id": "cus_123"}},
+    {
+        "collection": "users",
+        "filter": {"email_lower": {"$regex": "^ann"}},
+        "sort": {"email_lower": 1, "_id": 1},
+        "limit": 51,
+    },
+    {
+        "collection": "users",
+        "filter": {"role": "trial", "email_lower": {"$regex": "^ann"}},
+        "sort": {"email_lower": 1, "_id": 1},
+        "limit": 51,
+    },
+    {
+        "collection": "users",
+        "filter": {"subscription_status": "active"},
+        "sort": {"email_lower": 1, "_id": 1},
+        "limit": 51,
+    },
+    {"collection": "conversations", "filter": {"user_id": "u"}, "sort": {"created_at": -1}, "limit": 20},
+    {
+        "collection": "conversations",
+        "filter": {
+            "$and": [
+                {"user_id": "u"},
+                {
+                    "$or": [
+                        {"created_at": {"$lt": datetime(2000, 1, 1)}},
+                        {"created_at": datetime(2000, 1, 1), "_id": {"$lt": ObjectId("0" * 24)}},
+                    ]
+                },
+            ]
+        },
+        "sort": {"created_at": -1, "_id": -1},
+        "limit": 21,
+    },
+    {"collection": "messages", "filter": {"conversation_id": "c"}, "sort": {"created_at": -1}, "limit": 10},
+    {
+        "collection": "messages",
+        "filter": {
+            "$and": [
+                {"conversation_id": "c"},
+                {
+                    "$or": [
+                        {"created_at": {"$lt": datetime(2000, 1, 1)}},
+                        {"created_at": datetime(2000, 1, 1), "_id": {"$lt": ObjectId("0" * 24)}},
+                    ]
+                },
+            ]
+        },
+        "sort": {"created_at": -1, "_id": -1},
+        "limit": 51,
+    },
+    {"collection": "memories", "filter": {"user_id": "u"}, "limit": 20},
+    {"collection": "subscriptions", "filter": {"stripe_subscription_id": "sub_123"}},
+    {"collection": "jobs", "filter": {"status": "queued"}, "sort": {"created_at": 1}, "limit": 1},
+    {"collection": "jobs", "filter": {"status": "running", "lease_expires_at": {"$lt": datetime(2000, 1, 1)}}},
+    {"collection": "rate_limits", "filter": {"expires_at": {"$lt": datetime(2000, 1, 1)}}},
+]
+
+
+async def ensure_indexes(db) -> None:
+    """
+    Create every declared index; existing identical indexes are a no-op. Raises once every
+    collection has been tried if any could not be indexed, so a deployment never runs on
+    silently missing indexes.
+    """
+    failed = []
+    for collection, models in INDEXES.items():
+        try:
+            names = await db[collection].create_indexes(models)
+            logger.info("indexes ok on %s: %s", collection, names)
+        except OperationFailure as e:
+            # e.g. an undeclared index with the same keys but other options; needs a manual drop
+            logger.error("could not apply indexes on %s: %s", collection, e)
+            failed.append(f"{collection}: {e}")
+    if failed:
+        raise RuntimeError(f"Mongo indexes not applied ({'; '.join(failed)}); drop or rename the conflicting indexes")
+
+
+async def backfill_email_lower(db) -> int:
+    """Give pre-existing users the lowercased email the admin search is indexed on."""
+    result = await db.users.update_many(
+        {"email_lower": {"$exists": False}, "email": {"$type": "string"}},
+        [{"$set": {"email_lower": {"$toLower": "$email"}}}],
+    )
+    if result.modified_count:
+        logger.info("backfilled email_lower on %d users", result.modified_count)
+    return result.modified_count
+
+
+def _stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+
+async def verify_query_plans(db) -> list:
+    """Explain each hot query; return the ones whose winning plan scans the collection."""
+    failures = []
+    for q in HOT_QUERIES:
+        cmd = {"find": q["collection"], "filter": q["filter"]}
+        if "sort" in q:
+            cmd["sort"] = q["sort"]
+        if "limit" in q:
+            cmd["limit"] = q["limit"]
+        explained = await db.command({"explain": cmd, "verbosity": "queryPlanner"})
+        winning = explained["queryPlanner"]["winningPlan"]
+        stages = [s for s in _stages(winning) if s]
+        ok = "COLLSCAN" not in stages
+        print(f"{'ok ' if ok else 'BAD'} {q['collection']:<14} {q['filter']} -> {' <- '.join(stages)}")
+        if not ok:
+            failures.append(q)
+    return failures
+
+
+async def _main(verify: bool) -> int:
+    from api.db.database import db
+
+    await ensure_indexes(db)
+    await backfill_email_lower(db)
+    if not verify:
+        return 0
+    failures = await verify_query_plans(db)
+    if failures:
+        print(f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} would COLLSCAN")
+        return 1
+    print("all hot queries are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply Mongo indexes and optionally verify query plans.")
+    parser.add_argument("--verify", action="store_true", help="explain() each hot query and fail on COLLSCAN")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(_main(args.verify)))
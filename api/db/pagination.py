@@ -0,0 +1,75 @@
+# api/db/pagination.py
+"""
+Keyset (cursor) pagination on (sort field, _id).
+
+A cursor is the (value, _id) of the last row on a page, base64-encoded. The next page
+is a range query from that key, so every page is one index seek regardless of depth
+(no skip). `_id` breaks ties between rows that share the same sort value.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+
+def encode_cursor(value: Any, _id: ObjectId) -> str:
+    if isinstance(value, datetime):
+        payload = {"t": value.isoformat()}
+    else:
+        payload = {"v": value}
+    payload["id"] = str(_id)
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = datetime.fromisoformat(payload["t"]) if "t" in payload else payload["v"]
+        return value, ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def keyset_filter(field: str, cursor: Optional[str], descending: bool = True) -> Dict[str, Any]:
+    """Filter selecting the rows strictly after `cursor` in (field, _id) order."""
+    if not cursor:
+        return {}
+    value, _id = decode_cursor(cursor)
+    op = "$lt" if descending else "$gt"
+    return {"$or": [{field: {op: value}}, {field: value, "_id": {op: _id}}]}
+
+
+def keyset_sort(field: str, descending: bool = True) -> List[Tuple[str, int]]:
+    direction = -1 if descending else 1
+    return [(field, direction), ("_id", direction)]
+
+
+async def fetch_page(
+    collection,
+    flt: Dict[str, Any],
+    field: str,
+    cursor: Optional[str],
+    limit: int,
+    projection: Dict[str, Any],
+    descending: bool = True,
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of `collection` plus the cursor for the next page (None on the last page)."""
+    after = keyset_filter(field, cursor, descending)
+    query = {"$and": [flt, after]} if after else flt
+    # one extra row tells us whether another page exists
+    rows = (
+        await collection.find(query, projection=projection)
+        .sort(keyset_sort(field, descending))
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].get(field), rows[-1]["_id"])
+    return rows, next_cursor
@@ -0,0 +1,81 @@
+# api/db/users_repo.py
+"""
+User writes as single round trips.
+
+Each update is one atomic find_one_and_update(..., return_document=AFTER) that returns the
+fresh document (minus credentials), so routes never update-then-refetch, and preference
+merges use dotted $set paths instead of read-modify-write. Cached auth copies are dropped here.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from api.cache.user_cache import user_cache
+from api.db.database import db
+
+# what routes read back after a write: everything but credentials and provider details
+PUBLIC_PROJECTION = {"hashed_password": 0, "auth_providers": 0}
+
+
+def preference_paths(prefs: Dict[str, Any]) -> Dict[str, Any]:
+    # merge into the stored preferences instead of replacing the sub-document
+    return {f"preferences.{k}": v for k, v in prefs.items()}
+
+
+async def update_user(
+    query: Dict[str, Any],
+    fields: Optional[Dict[str, Any]] = None,
+    preferences: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    $set `fields` (and merge `preferences`) on the user matching `query`.
+    Returns the updated document, or None when nothing matched.
+    """
+    updates = {**(fields or {}), **preference_paths(preferences or {}), "updated_at": datetime.utcnow()}
+    user = await db.users.find_one_and_update(
+        query,
+        {"$set": updates},
+        projection=projection or PUBLIC_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if user:
+        user_cache.invalidate(user.get("email"))
+    return user
+
+
+async def find_user(query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    return await db.users.find_one(query, projection=projection or PUBLIC_PROJECTION)
+
+
+async def upsert_user(
+    query: Dict[str, Any],
+    fields: Dict[str, Any],
+    defaults: Dict[str, Any],
+    projection: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Update the matching user, or create it from `defaults` + `fields`, in one round trip.
+    Keys in `fields` win; `defaults` only apply on insert.
+    """
+    now = datetime.utcnow()
+    on_insert = {k: v for k, v in {**defaults, "created_at": now}.items() if k not in fields}
+    user = await db.users.find_one_and_update(
+        query,
+        {"$set": {**fields, "updated_at": now}, "$setOnInsert": on_insert},
+        upsert=True,
+        projection=projection or PUBLIC_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    user_cache.invalidate(user.get("email"))
+    return user
+
+
+async def delete_user(query: Dict[str, Any]) -> bool:
+    deleted = await db.users.find_one_and_delete(query, projection={"email": 1})
+    if not deleted:
+        return False
+    user_cache.invalidate(deleted.get("email"))
+    return True
@@ -1,13 +1,50 @@
 # main.py
-from fastapi import FastAPI
-from fastapi.openapi.utils import get_openapi
 import os
+from contextlib import asynccontextmanager
 
-from api.routes import auth, agent, auth_google, auth_dev, subscription, user, scripture, health
+import anyio
 from dotenv import load_dotenv
+from fastapi import FastAPI
+from fastapi.openapi.utils import get_openapi
+
+from api.crew.agent_handler import AGENT_BACKEND, crew_pool
+from api.crew.crew_pool import CREW_POOL_WARM
+from api.crew.jobs import job_worker
+from api.db.database import db
+from api.db.elastic import elastic
+from api.db.indexes import backfill_email_lower, ensure_indexes
+from api.routes import agent, auth, auth_dev, auth_google, conversation, health, scripture, subscription, user
+from api.scripture.local_search import SCRIPTURE_BACKEND, local_search
+from api.scripture.topics import topic_index
+from api.scripture.verse_store import verse_store
 
 load_dotenv()
-app = FastAPI()
+
+
+# Shared clients live for the whole process
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await elastic.start()
+    await ensure_indexes(db)
+    await backfill_email_lower(db)
+    # reference lookups are served from memory (seed JSONL files)
+    await anyio.to_thread.run_sync(verse_store.load)
+    topic_index.load()
+    if SCRIPTURE_BACKEND == "local":
+        await anyio.to_thread.run_sync(local_search.load)
+    # build crews before the first message instead of during it
+    if AGENT_BACKEND == "crew":
+        await anyio.to_thread.run_sync(crew_pool.warm, CREW_POOL_WARM)
+    # background agent jobs (Mongo-backed; unfinished ones resume on any worker)
+    job_worker.start()
+    try:
+        yield
+    finally:
+        await job_worker.stop()
+        await elastic.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 APP_ENV = os.getenv("APP_ENV", "development")
 
@@ -18,10 +55,12 @@ if APP_ENV == "development":
     app.include_router(auth_dev.router, tags=["Auth - Dev"])
 app.include_router(user.router, tags=["User"])
 app.include_router(agent.router, tags=["Agent"])
+app.include_router(conversation.router, tags=["Conversations"])
 app.include_router(subscription.router, tags=["Subscription"])
 app.include_router(scripture.router, tags=["Scripture"])
 app.include_router(health.router, tags=["Health"])
 
+
 # Define simple Bearer Token auth for Swagger UI
 def custom_openapi():
     if app.openapi_schema:
@@ -49,4 +88,5 @@ def custom_openapi():
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
-app.openapi = custom_openapi
+
+app.openapi = custom_openapi  # type: ignore[method-assign]
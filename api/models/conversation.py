@@ -1,7 +1,9 @@
 # models/conversation.py
-from pydantic import BaseModel
 from typing import Optional
 
+from pydantic import BaseModel
+
+
 class Conversation(BaseModel):
     id: str
     user_id: str
@@ -1,9 +1,11 @@
 # api/models/message.py
 
 # import types used by the models
-from pydantic import BaseModel
-from typing import Optional, Literal
 from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
 
 # request body for POST /agent/send-message
 class SendMessageInput(BaseModel):
@@ -11,16 +13,16 @@ class SendMessageInput(BaseModel):
     conversation_id: Optional[str] = None
     # the user's message text
     content: str
+    # true: return a job id right away and fetch the reply from GET /agent/jobs/{id}
+    background: bool = False
 
     # example shown in Swagger
     class Config:
         json_schema_extra = {
-            "example": {
-                "conversation_id": None,
-                "content": "I feel spiritually dry lately."
-            }
+            "example": {"conversation_id": None, "content": "I feel spiritually dry lately.", "background": False}
         }
 
+
 # internal/db representation for messages saved in Mongo
 class StoredMessage(BaseModel):
     # the conversation this message belongs to
@@ -42,6 +44,6 @@ class StoredMessage(BaseModel):
                 "user_id": "665f29f49c8e5b7a4d1f1ee1",
                 "role": "user",
                 "message": "I feel spiritually dry lately.",
-                "created_at": "2025-08-07T16:45:00Z"
+                "created_at": "2025-08-07T16:45:00Z",
             }
         }
@@ -1,12 +1,13 @@
 # api/models/user.py
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Literal
-from enum import Enum
 from datetime import datetime
+from enum import Enum
+from typing import Literal, Optional
 
+from pydantic import BaseModel, EmailStr, Field
 
 # --- Enums ---
 
+
 class Role(str, Enum):
     ADMIN = "admin"
     TRIAL = "trial"
@@ -38,15 +39,15 @@ class BibleTranslation(str, Enum):
     NLT = "NLT"
     NASB = "NASB"
     CSB = "CSB"
-    WEB = "WEB"   # World English Bible
-    BBE = "BBE"   # Basic Bible English
+    WEB = "WEB"  # World English Bible
+    BBE = "BBE"  # Basic Bible English
     DEFAULT = "DEFAULT"  # let the system pick (fallback)
 
 
 class CitationStyle(str, Enum):
-    INLINE = "inline"        # e.g., (John 3:16)
-    FOOTNOTE = "footnote"    # numbered notes at end
-    NONE = "none"            # refs in prose only
+    INLINE = "inline"  # e.g., (John 3:16)
+    FOOTNOTE = "footnote"  # numbered notes at end
+    NONE = "none"  # refs in prose only
 
 
 class ResponseLength(str, Enum):
@@ -57,6 +58,7 @@ class ResponseLength(str, Enum):
 
 # --- Nested models ---
 
+
 class UserPreferences(BaseModel):
     denomination: Denomination = Denomination.UNSET
     translation: BibleTranslation = BibleTranslation.DEFAULT
@@ -75,6 +77,7 @@ class UserPreferences(BaseModel):
 
 # --- API models ---
 
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
@@ -0,0 +1,187 @@
+# api/ratelimit/limiter.py
+import logging
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from api.cache.ttl import MISSING, TTLCache
+from api.db.database import db
+
+logger = logging.getLogger("ratelimit")
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_SPEC = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])\s*$")
+
+
+@dataclass(frozen=True)
+class RatePolicy:
+    """`limit` messages per `window` seconds; limit None means unlimited."""
+
+    limit: Optional[int]
+    window: int = 3600
+
+    @classmethod
+    def parse(cls, spec: str) -> "RatePolicy":
+        # "25/1d", "25/h", "100/30m" or "unlimited"
+        if spec.strip().lower() in ("unlimited", "none", ""):
+            return cls(limit=None)
+        match = _SPEC.match(spec)
+        if not match:
+            raise ValueError(f"Invalid rate limit spec: {spec!r}")
+        count, amount, unit = match.groups()
+        return cls(limit=int(count), window=int(amount or 1) * _UNITS[unit])
+
+
+# role -> policy; override per role with RATE_LIMIT_<ROLE>, e.g. RATE_LIMIT_TRIAL=25/1d
+DEFAULT_POLICIES = {
+    "trial": "25/1d",
+    "subscriber": "25/1h",
+    "admin": "unlimited",
+}
+# roles without an explicit policy (anything that isn't trial/admin)
+FALLBACK_ROLE = "subscriber"
+
+
+def load_policies() -> Dict[str, RatePolicy]:
+    return {
+        role: RatePolicy.parse(os.getenv(f"RATE_LIMIT_{role.upper()}", spec)) for role, spec in DEFAULT_POLICIES.items()
+    }
+
+
+@dataclass
+class RateDecision:
+    allowed: bool
+    remaining: Optional[int] = None
+    retry_after: int = 0
+
+
+class _TokenBucket:
+    """Local pre-filter: refuses floods in this worker without touching Mongo."""
+
+    def __init__(self, capacity: int, window: int):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def drain(self) -> None:
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+    def seconds_until_token(self) -> int:
+        return max(1, math.ceil((1 - self.tokens) / self.rate))
+
+
+class RateLimiter:
+    """
+    Sliding-window message limiter shared across workers.
+
+    Each (user, window) has fixed buckets in Mongo, bumped with one atomic
+    find_one_and_update($inc, upsert). The sliding count blends the current
+    bucket with the previous one; the previous bucket is closed, so its count
+    is cached locally and read from Mongo at most once per window.
+    Buckets expire via the TTL index declared in api/db/indexes.py.
+    """
+
+    def __init__(self, collection, policies: Dict[str, RatePolicy]):
+        self.collection = collection
+        self.policies = policies
+        # bounded; an evicted bucket just starts full again and Mongo stays authoritative
+        self._buckets = TTLCache(maxsize=50000, ttl=86400)
+        self._closed_counts = TTLCache(maxsize=50000, ttl=86400)
+        self.stats_counters = {"allowed": 0, "rejected_local": 0, "rejected_shared": 0}
+
+    def policy_for(self, role: Optional[str]) -> RatePolicy:
+        return self.policies.get(role or "", self.policies[FALLBACK_ROLE])
+
+    def _local_bucket(self, key: str, limit: int, window: int) -> _TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.capacity != limit:
+            bucket = _TokenBucket(limit, window)
+            self._buckets.set(key, bucket)
+        return bucket
+
+    async def _previous_count(self, key: str, start: int) -> int:
+        cache_key = f"{key}:{start}"
+        count = self._closed_counts.get(cache_key, MISSING)
+        if count is MISSING:
+            doc = await self.collection.find_one({"_id": cache_key}, projection={"count": 1})
+            count = doc.get("count", 0) if doc else 0
+            self._closed_counts.set(cache_key, count)
+        return count
+
+    async def _increment(self, bucket_id: str, user_id: str, expires_at: datetime) -> int:
+        update = {"$inc": {"count": 1}, "$setOnInsert": {"user_id": user_id, "expires_at": expires_at}}
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": bucket_id},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                projection={"count": 1},
+            )
+        except DuplicateKeyError:
+            # two workers raced the upsert; the doc exists now
+            doc = await self.collection.find_one_and_update(
+                {"_id": bucket_id},
+                update,
+                return_document=ReturnDocument.AFTER,
+                projection={"count": 1},
+            )
+        return doc["count"]
+
+    async def hit(self, user_id: str, role: Optional[str]) -> RateDecision:
+        """Count one message for `user_id` and decide whether it is allowed."""
+        policy = self.policy_for(role)
+        if policy.limit is None:
+            return RateDecision(allowed=True)
+
+        key = f"{user_id}:{policy.window}"
+        local = self._local_bucket(key, policy.limit, policy.window)
+        if not local.take():
+            self.stats_counters["rejected_local"] += 1
+            return RateDecision(allowed=False, remaining=0, retry_after=local.seconds_until_token())
+
+        now = time.time()
+        start = int(now // policy.window * policy.window)
+        elapsed = (now - start) / policy.window
+        expires_at = datetime.utcfromtimestamp(start) + timedelta(seconds=2 * policy.window)
+
+        current = await self._increment(f"{key}:{start}", user_id, expires_at)
+        previous = await self._previous_count(key, start - policy.window)
+        sliding = current + previous * (1 - elapsed)
+
+        if sliding > policy.limit:
+            # roll back so refused attempts don't count against the user
+            await self.collection.update_one({"_id": f"{key}:{start}"}, {"$inc": {"count": -1}})
+            local.drain()
+            self.stats_counters["rejected_shared"] += 1
+            return RateDecision(allowed=False, remaining=0, retry_after=max(1, int(start + policy.window - now)))
+
+        self.stats_counters["allowed"] += 1
+        return RateDecision(allowed=True, remaining=max(int(policy.limit - sliding), 0))
+
+    def stats(self) -> dict:
+        return {
+            **self.stats_counters,
+            "policies": {role: {"limit": p.limit, "window_seconds": p.window} for role, p in self.policies.items()},
+        }
+
+
+rate_limiter = RateLimiter(db.rate_limits, load_policies())
@@ -1,78 +1,91 @@
 # api/routes/agent.py
 
 # imports
-from fastapi import APIRouter, Depends, HTTPException
-from datetime import datetime, timedelta
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Set
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
 from api.auth.deps import get_current_user
-from api.crew.agent_handler import run_discern_agents
+from api.crew.agent_handler import agent_runner
+from api.crew.executor import agent_executor
+from api.crew.jobs import enqueue_job, get_job, save_reply
 from api.db.database import get_database
 from api.models.message import SendMessageInput
-import anyio  # <-- for non-blocking thread offload
+from api.ratelimit.limiter import rate_limiter
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
-@router.post("/send-message")
-async def send_message(body: SendMessageInput, user=Depends(get_current_user)):
-    # connect to db
-    db = await get_database()
+# logger
+logger = logging.getLogger("agent")
+
+# strong refs so in-flight stream runs finish (and save) even if the client disconnects
+_stream_jobs: Set[asyncio.Task] = set()
 
-    # extract input
-    user_input = body.content
-    conversation_id = body.conversation_id
 
+async def _start_turn(db, body: SendMessageInput, user):
     # validate content
-    if not user_input:
+    if not body.content:
         raise HTTPException(status_code=400, detail="Prompt is required.")
 
     # deny unsubscribed
     if user.get("role") == "unsubscribed":
         raise HTTPException(status_code=403, detail="Subscription required.")
 
-    # compute limits
+    # background jobs just queue
+    if body.background:
+        return await _record_turn(db, body, user)
+
+    # claim an agent slot before counting the message or writing anything: a full
+    # executor is a plain 503 with nothing recorded, and the later submit can't fail
+    agent_executor.reserve()
+    try:
+        return await _record_turn(db, body, user)
+    except BaseException:
+        agent_executor.release()
+        raise
+
+
+async def _record_turn(db, body: SendMessageInput, user):
+    # extract input
+    user_input = body.content
+    conversation_id = body.conversation_id
+
+    # enforce role-based rate limits (one atomic counter op)
+    decision = await rate_limiter.hit(str(user["_id"]), user.get("role"))
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Message limit reached. Please wait before sending more.",
+            headers={"Retry-After": str(decision.retry_after)},
+        )
+
     now = datetime.utcnow()
-    if user.get("role") == "trial":
-        start_time = now - timedelta(days=1)
-        max_messages = 25
-    elif user.get("role") != "admin":
-        start_time = now - timedelta(hours=1)
-        max_messages = 25
-    else:
-        start_time = None
-        max_messages = None
-
-    # enforce rate limits for non-admins
-    if max_messages is not None:
-        recent_count = await db.messages.count_documents({
-            "user_id": str(user["_id"]),
-            "role": "user",
-            "created_at": {"$gte": start_time}
-        })
-        if recent_count >= max_messages:
-            raise HTTPException(status_code=429, detail="Message limit reached. Please wait before sending more.")
 
     # fetch prior messages if conversation exists
     messages = []
     if not conversation_id:
         # create conversation
         topic = "TBD"  # TODO: replace with topic selector agent
-        conversation_doc = {
-            "user_id": str(user["_id"]),
-            "topic": topic,
-            "created_at": now
-        }
+        conversation_doc = {"user_id": str(user["_id"]), "topic": topic, "created_at": now}
         result = await db.conversations.insert_one(conversation_doc)
         conversation_id = str(result.inserted_id)
     else:
         # get last 10 messages
-        existing = await db.messages.find(
-            {"conversation_id": conversation_id}
-        ).sort("created_at", -1).limit(10).to_list(length=10)
+        existing = (
+            await db.messages.find({"conversation_id": conversation_id})
+            .sort("created_at", -1)
+            .limit(10)
+            .to_list(length=10)
+        )
         messages = list(reversed(existing))
 
     # fetch up to 20 memories
-    memories = await db.memories.find(
-        {"user_id": str(user["_id"])}
-    ).limit(20).to_list(length=20)
+    memories = await db.memories.find({"user_id": str(user["_id"])}).limit(20).to_list(length=20)
 
     # save user message
     user_msg_doc = {
@@ -80,31 +93,98 @@ async def send_message(body: SendMessageInput, user=Depends(get_current_user)):
         "user_id": str(user["_id"]),
         "role": "user",
         "message": user_input,
-        "created_at": now
+        "created_at": now,
     }
     await db.messages.insert_one(user_msg_doc)
 
     # build agent context
-    context = {
-        "user_input": user_input,
-        "user_data": user,
-        "conversation": messages,
-        "memories": memories
-    }
+    context = {"user_input": user_input, "user_data": user, "conversation": messages, "memories": memories}
+    return conversation_id, context
 
-    # --- Non-blocking agent execution ---
-    # Run the synchronous run_discern_agents(...) in a worker thread so we don't block the event loop.
-    agent_response = await anyio.to_thread.run_sync(run_discern_agents, context)
 
-    # save agent response
-    system_msg_doc = {
-        "conversation_id": conversation_id,
-        "user_id": str(user["_id"]),
-        "role": "system",
-        "message": agent_response,
-        "created_at": datetime.utcnow()
-    }
-    await db.messages.insert_one(system_msg_doc)
+def _sse(event: str, data) -> str:
+    # one Server-Sent Event frame
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/send-message")
+async def send_message(body: SendMessageInput, response: Response, user=Depends(get_current_user)):
+    # connect to db
+    db = await get_database()
+    conversation_id, context = await _start_turn(db, body, user)
+
+    # background mode: a job worker runs the crew; the client polls GET /agent/jobs/{job_id}
+    if body.background:
+        job_id = await enqueue_job(db, user, conversation_id, context)
+        response.status_code = 202
+        return {"job_id": job_id, "status": "queued", "conversation_id": conversation_id}
+
+    # --- Non-blocking agent execution ---
+    # Run the synchronous run_discern_agents(...) on the dedicated agent threads (503 when full, 504 on timeout).
+    run = await agent_executor.run(agent_runner, context, reserved=True)
+    await save_reply(db, str(user["_id"]), conversation_id, run)
 
     # return payload
-    return {"response": agent_response, "conversation_id": conversation_id}
+    return {"response": run.raw, "conversation_id": conversation_id}
+
+
+@router.post("/stream-message")
+async def stream_message(body: SendMessageInput, user=Depends(get_current_user)):
+    """
+    Same turn as /send-message, streamed as Server-Sent Events:
+    `stage` events (routed, scripture_gathered, drafting, validating, editing, or cached),
+    `token` events with the final editor's output, a `replace` event with the full text
+    when verse quotes were added after the run (clients swap it in for the streamed tokens;
+    it matches `done.response`), then `done` (or `error`).
+    """
+    db = await get_database()
+    conversation_id, context = await _start_turn(db, body, user)
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    # called from the crew's worker thread
+    def on_event(event: str, data: dict) -> None:
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    # the slot was reserved in _start_turn, so a full queue was already a plain 503
+    agent_job = agent_executor.submit(agent_runner, context, on_event, reserved=True)
+
+    async def _run_and_save():
+        run = await agent_executor.wait(agent_job)
+        await save_reply(db, str(user["_id"]), conversation_id, run)
+        return run
+
+    job = asyncio.create_task(_run_and_save())
+    _stream_jobs.add(job)
+    job.add_done_callback(_stream_jobs.discard)
+    # sentinel lands after every event the thread queued before finishing
+    job.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def events():
+        yield _sse("stage", {"stage": "started", "conversation_id": conversation_id})
+        while (item := await queue.get()) is not None:
+            yield _sse(*item)
+        if job.cancelled() or job.exception():
+            logger.error("stream-message failed: %r", None if job.cancelled() else job.exception())
+            yield _sse("error", {"detail": "Agent failed to respond.", "conversation_id": conversation_id})
+            return
+        run = job.result()
+        yield _sse("done", {"response": run.raw, "conversation_id": conversation_id, "intent": run.intent})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def agent_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to long-poll for the job to finish"),
+    user=Depends(get_current_user),
+):
+    """Status of a background /send-message job; includes the response once it is done."""
+    db = await get_database()
+    return await get_job(db, job_id, str(user["_id"]), wait=wait)
@@ -1,31 +1,34 @@
 # api/routes/auth.py
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime
+from typing import Any, Dict
+
 from dotenv import load_dotenv
-import os
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
 
-from api.db.database import db
-from api.auth.auth import hash_password, verify_password
-from api.models.user import UserCreate, Role
+from api.auth.auth import hash_password_async, verify_password_async
 from api.auth.deps import get_current_user
 from api.auth.jwt import issue_jwt
+from api.db.database import db
+from api.models.user import Role, UserCreate
 
 load_dotenv()
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+
 @router.post("/create-account", status_code=status.HTTP_201_CREATED)
 async def create_account(user: UserCreate):
     existing = await db.users.find_one({"email": user.email})
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed = hash_password(user.password)
+    hashed = await hash_password_async(user.password)
 
-    user_doc = {
+    user_doc: Dict[str, Any] = {
         "email": user.email,
+        "email_lower": user.email.lower(),
         "hashed_password": hashed,
         "first_name": user.first_name or "",
         "last_name": user.last_name or "",
@@ -38,16 +41,18 @@ async def create_account(user: UserCreate):
     await db.users.insert_one(user_doc)
     return {"message": "Account created"}
 
+
 @router.post("/login")
 async def sign_in(form_data: OAuth2PasswordRequestForm = Depends()):
     email = form_data.username
     db_user = await db.users.find_one({"email": email})
-    if not db_user or not verify_password(form_data.password, db_user.get("hashed_password", "")):
+    if not db_user or not await verify_password_async(form_data.password, db_user.get("hashed_password", "")):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = issue_jwt(email=db_user["email"], role=db_user.get("role", Role.UNSUBSCRIBED.value))
     return {"access_token": token, "token_type": "bearer"}
 
+
 @router.get("/get-user-data")
 async def get_user_data(user=Depends(get_current_user)):
     if not user:
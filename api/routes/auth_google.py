@@ -1,25 +1,29 @@
 # api/routes/auth_google.py
-from fastapi import APIRouter, HTTPException, Depends, status
-from pydantic import BaseModel
-from typing import Optional
 from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
 
-from api.db.database import db
 from api.auth.deps import get_current_user
-from api.auth.jwt import issue_jwt
 from api.auth.google_verify import verify_google_id_token
+from api.auth.jwt import issue_jwt
+from api.db.database import db
+from api.db.users_repo import update_user
 
 router = APIRouter(prefix="/auth/google", tags=["Auth - Google"])
 
+
 class GoogleSignInRequest(BaseModel):
     id_token: str
     access_token: Optional[str] = None  # optional (not stored by default)
 
+
 @router.post("/login", status_code=status.HTTP_200_OK)
 async def google_sign_in(body: GoogleSignInRequest):
     payload = await verify_google_id_token(body.id_token)
 
-    sub = payload.get("sub")       # google stable user id
+    sub = payload.get("sub")  # google stable user id
     email = payload.get("email")
     email_verified = payload.get("email_verified", False)
     given_name = payload.get("given_name", "")
@@ -29,16 +33,25 @@ async def google_sign_in(body: GoogleSignInRequest):
     if not email or not sub:
         raise HTTPException(status_code=400, detail="Google token missing email/sub")
 
-    # Try find by google sub first, else by email
-    user_doc = await db.users.find_one({"auth_providers.google.sub": sub}) or await db.users.find_one({"email": email})
-
     now = datetime.utcnow()
     new_user = False
+    google_fields = {
+        "auth_providers.google.sub": sub,
+        "auth_providers.google.email_verified": bool(email_verified),
+        "auth_providers.google.picture": picture,
+        "auth_providers.google.last_login_at": now,
+    }
+
+    # Try the linked google sub first, else link by email (each one atomic update + read)
+    user_doc = await update_user({"auth_providers.google.sub": sub}, google_fields) or await update_user(
+        {"email": email}, google_fields
+    )
 
     if not user_doc:
         # create as unsubscribed (your requirement)
         user_doc = {
             "email": email,
+            "email_lower": (email or "").lower(),
             "hashed_password": "",  # no local password
             "first_name": given_name or "",
             "last_name": family_name or "",
@@ -57,16 +70,6 @@ async def google_sign_in(body: GoogleSignInRequest):
         }
         await db.users.insert_one(user_doc)
         new_user = True
-    else:
-        updates = {
-            "updated_at": now,
-            "auth_providers.google.sub": sub,
-            "auth_providers.google.email_verified": bool(email_verified),
-            "auth_providers.google.picture": picture,
-            "auth_providers.google.last_login_at": now,
-        }
-        await db.users.update_one({"_id": user_doc["_id"]}, {"$set": updates})
-        user_doc = await db.users.find_one({"_id": user_doc["_id"]})
 
     token = issue_jwt(email=user_doc["email"], role=user_doc.get("role", "unsubscribed"))
 
@@ -84,6 +87,7 @@ async def google_sign_in(body: GoogleSignInRequest):
         },
     }
 
+
 @router.post("/link", status_code=status.HTTP_200_OK)
 async def google_link_account(body: GoogleSignInRequest, user=Depends(get_current_user)):
     if not user:
@@ -108,7 +112,6 @@ async def google_link_account(body: GoogleSignInRequest, user=Depends(get_curren
         "auth_providers.google.email_verified": bool(email_verified),
         "auth_providers.google.picture": picture,
         "auth_providers.google.last_login_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow(),
     }
-    await db.users.update_one({"_id": user["_id"]}, {"$set": updates})
+    await update_user({"_id": user["_id"]}, updates, projection={"email": 1})
     return {"message": "Google account linked"}
@@ -0,0 +1,112 @@
+# api/routes/conversation.py
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from api.auth.deps import get_current_user
+from api.db.database import db
+from api.db.pagination import fetch_page
+
+router = APIRouter(prefix="/conversations", tags=["Conversations"])
+
+# ----------------- Schemas -----------------
+
+
+class ConversationSummary(BaseModel):
+    id: str
+    topic: Optional[str] = None
+    created_at: datetime
+
+
+class ConversationPage(BaseModel):
+    items: List[ConversationSummary]
+    # pass back as ?cursor= for older conversations; null on the last page
+    next_cursor: Optional[str] = None
+
+
+class MessageOut(BaseModel):
+    id: str
+    role: str
+    message: str
+    intent: Optional[str] = None
+    created_at: datetime
+
+
+class MessagePage(BaseModel):
+    # oldest first within the page
+    items: List[MessageOut]
+    # pass back as ?cursor= for earlier messages; null once the start is reached
+    next_cursor: Optional[str] = None
+
+
+# only what the list views render
+_CONVERSATION_FIELDS = {"topic": 1, "created_at": 1}
+_MESSAGE_FIELDS = {"role": 1, "message": 1, "intent": 1, "created_at": 1}
+
+# ----------------- Routes -----------------
+
+
+@router.get("/", response_model=ConversationPage)
+async def list_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user=Depends(get_current_user),
+):
+    """The caller's conversations, newest first."""
+    rows, next_cursor = await fetch_page(
+        db.conversations,
+        {"user_id": str(current_user["_id"])},
+        "created_at",
+        cursor,
+        limit,
+        projection=_CONVERSATION_FIELDS,
+    )
+    return ConversationPage(
+        items=[ConversationSummary(id=str(c["_id"]), topic=c.get("topic"), created_at=c["created_at"]) for c in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{conversation_id}/messages", response_model=MessagePage)
+async def list_messages(
+    conversation_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user=Depends(get_current_user),
+):
+    """
+    Messages of one conversation, paged backwards from the latest.
+    Each page costs one index seek on (conversation_id, created_at, _id), however far back it is.
+    """
+    if not ObjectId.is_valid(conversation_id):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    owned = await db.conversations.find_one(
+        {"_id": ObjectId(conversation_id), "user_id": str(current_user["_id"])}, projection={"_id": 1}
+    )
+    if not owned:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+
+    rows, next_cursor = await fetch_page(
+        db.messages,
+        {"conversation_id": conversation_id},
+        "created_at",
+        cursor,
+        limit,
+        projection=_MESSAGE_FIELDS,
+    )
+    return MessagePage(
+        items=[
+            MessageOut(
+                id=str(m["_id"]),
+                role=m["role"],
+                message=m.get("message", ""),
+                intent=m.get("intent"),
+                created_at=m["created_at"],
+            )
+            for m in reversed(rows)
+        ],
+        next_cursor=next_cursor,
+    )
@@ -1,7 +1,43 @@
 from fastapi import APIRouter
 
+from api.auth.auth import password_pool_stats
+from api.billing.stripe_gateway import stripe_gateway
+from api.cache.response_cache import response_cache
+from api.cache.user_cache import user_cache
+from api.cache.verse_cache import verse_cache
+from api.crew.agent_handler import crew_pool, intent_timings
+from api.crew.citations import citation_stats
+from api.crew.executor import agent_executor
+from api.crew.jobs import job_worker
+from api.ratelimit.limiter import rate_limiter
+from api.scripture.local_search import local_search
+from api.scripture.topics import topic_index
+from api.scripture.verse_store import verse_store
+
 router = APIRouter(prefix="/health", tags=["Health"])
 
+
 @router.get("/", tags=["Status"])
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/metrics", tags=["Status"])
+async def metrics():
+    # in-process counters for this worker only
+    return {
+        "verse_cache": verse_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_pool": password_pool_stats(),
+        "stripe": stripe_gateway.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        "agent_executor": agent_executor.stats(),
+        "job_worker": job_worker.stats(),
+        "crew_pool": crew_pool.stats(),
+        "response_cache": response_cache.stats(),
+        "verse_store": verse_store.stats(),
+        "local_search": local_search.stats(),
+        "topics": topic_index.stats(),
+        "citations": citation_stats(),
+        "intent_timings": intent_timings(),
+    }
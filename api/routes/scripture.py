@@ -1,29 +1,225 @@
 # api/routes/scripture.py
+import os
+from typing import Dict, List, Optional
+
+import anyio
+import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+
 from api.auth.deps import get_current_user
-import os, requests
+from api.cache.ttl import MISSING
+from api.cache.verse_cache import verse_cache
+from api.db.elastic import ELASTIC_INDEX, get_elastic
+from api.scripture.local_search import SCRIPTURE_BACKEND, local_search
+from api.scripture.query import msearch_body, msearch_results, passage_query, verse_query
+from api.scripture.references import format_span, in_span, parse_references
+from api.scripture.topics import TOPICS, topic_index
+from api.scripture.verse_store import verse_store
 
 router = APIRouter(prefix="/scripture", tags=["Scripture"])
-ES = os.getenv("ELASTIC_HOST", "http://elasticsearch:9200").rstrip("/")
-INDEX = os.getenv("ELASTIC_INDEX", "bible_verses")
+INDEX = ELASTIC_INDEX
+
+# upper bound on verses returned by /passage (Psalm 119 alone is 176)
+PASSAGE_MAX_VERSES = int(os.getenv("PASSAGE_MAX_VERSES", "500"))
+# most sub-queries one /batch call may carry
+SCRIPTURE_BATCH_MAX = int(os.getenv("SCRIPTURE_BATCH_MAX", "50"))
+
+# ----------------- Schemas -----------------
+
+
+class BatchItem(BaseModel):
+    q: str = Field(..., min_length=1, description="search text or reference")
+    translation: Optional[str] = None
+    size: int = Field(20, ge=1, le=100)
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1, max_length=SCRIPTURE_BATCH_MAX)
+
+
+# ----------------- Helpers -----------------
+
+
+def _translation(requested: str | None, user) -> str:
+    # prefer user’s default if not provided
+    return requested or user.get("preferences", {}).get("translation") or "DEFAULT"
+
+
+async def _es_search(body: dict) -> list:
+    es = await get_elastic()
+    try:
+        r = await es.post(f"/{INDEX}/_search", json=body)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Search backend unavailable: {e}") from e
+    if r.is_error:
+        raise HTTPException(status_code=502, detail=r.text[:300])
+    hits = r.json().get("hits", {}).get("hits", [])
+    return [h["_source"] for h in hits]
+
+
+async def _es_msearch(searches: list) -> list:
+    """One `_msearch` round trip; per search, its hits or an error message."""
+    es = await get_elastic()
+    try:
+        r = await es.post(
+            "/_msearch", content=msearch_body(INDEX, searches), headers={"Content-Type": "application/x-ndjson"}
+        )
+    except httpx.HTTPError as e:
+        return [f"Search backend unavailable: {e}"] * len(searches)
+    if r.is_error:
+        return [r.text[:300]] * len(searches)
+    return msearch_results(r.json(), len(searches))
+
+
+# ----------------- Routes -----------------
+
 
 @router.get("/search")
 async def search(
-    q: str = Query(..., min_length=1),
-    translation: str | None = None,
-    size: int = 20,
-    user=Depends(get_current_user)
+    q: str = Query(..., min_length=1), translation: str | None = None, size: int = 20, user=Depends(get_current_user)
 ):
-    # prefer user’s default if not provided
-    t = translation or user.get("preferences", {}).get("translation") or "DEFAULT"
-    query = {
-        "bool": {
-            "must": [{"multi_match": {"query": q, "fields": ["text^2","reference","book"]}}],
-            "filter": [{"term": {"translation": t}}] if t not in ("DEFAULT", None) else []
+    t = _translation(translation, user)
+
+    # "John 3:16-18" is a lookup, not a search: answer it from memory
+    spans = parse_references(q)
+    loaded = verse_store.resolve(t)
+    if spans and loaded:
+        return verse_store.passage(loaded, spans, limit=size)
+
+    if SCRIPTURE_BACKEND == "local":
+        # in-process BM25; scoring a common term walks a long postings list, so keep it off the loop
+        return await anyio.to_thread.run_sync(local_search.search, q, t, size)
+
+    # cached results skip Elasticsearch entirely
+    es = await get_elastic()
+    await verse_cache.sync_generation(es)
+    cache_key = verse_cache.key(q, t, size)
+    cached = verse_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    results = await _es_search({"query": verse_query(q, t), "size": size})
+    verse_cache.set(cache_key, results)
+    return results
+
+
+async def _lookup(spans, t: str, limit: int) -> tuple:
+    """(translation served, verses) for `spans` in reading order: from memory, else a filter-only ES query."""
+    loaded = verse_store.resolve(t)
+    if loaded:
+        return loaded, verse_store.passage(loaded, spans, limit=limit)
+    if SCRIPTURE_BACKEND == "local":
+        # the local backend has exactly the translations in the seed files
+        return t, []
+    hits = await _es_search(
+        {
+            "query": passage_query(spans, t),
+            "sort": [{"chapter": "asc"}, {"verse": "asc"}],
+            "size": limit,
         }
+    )
+    return t, [v for s in spans for v in hits if in_span(v, s)][:limit]
+
+
+@router.get("/passage")
+async def passage(
+    ref: str = Query(..., min_length=1, description='e.g. "John 3:16-18", "Gen 1:1-2:3", "Ps 23; Rom 8:28"'),
+    translation: str | None = None,
+    user=Depends(get_current_user),
+):
+    """Verses for one or more references, in reading order; ranges may span chapters."""
+    spans = parse_references(ref)
+    if not spans:
+        raise HTTPException(status_code=400, detail=f"Not a scripture reference: {ref}")
+    served, verses = await _lookup(spans, _translation(translation, user), PASSAGE_MAX_VERSES)
+    return {
+        "reference": "; ".join(format_span(s) for s in spans),
+        "translation": served,
+        "verses": verses,
     }
-    r = requests.post(f"{ES}/{INDEX}/_search", json={"query": query, "size": size})
-    if not r.ok:
-        raise HTTPException(status_code=502, detail=r.text[:300])
-    hits = r.json().get("hits", {}).get("hits", [])
-    return [h["_source"] for h in hits]
+
+
+@router.get("/topics")
+async def list_topics(user=Depends(get_current_user)):
+    """The curated topic taxonomy."""
+    return [{"topic": slug, "label": t.label} for slug, t in TOPICS.items()]
+
+
+@router.get("/topics/{topic}")
+async def topic_passages(
+    topic: str,
+    translation: str | None = None,
+    limit: int = Query(10, ge=1, le=50, description="passages (a passage may be a range of verses)"),
+    user=Depends(get_current_user),
+):
+    """Precomputed passages for a topic, best first; no search involved."""
+    spans = topic_index.spans(topic)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Unknown topic")
+    spans = spans[:limit]
+    served, verses = await _lookup(spans, _translation(translation, user), PASSAGE_MAX_VERSES)
+    return {
+        "topic": topic,
+        "label": TOPICS[topic].label,
+        "translation": served,
+        "passages": [{"reference": format_span(s), "verses": [v for v in verses if in_span(v, s)]} for s in spans],
+    }
+
+
+@router.post("/batch")
+async def batch(body: BatchRequest, user=Depends(get_current_user)):
+    """
+    Several searches and/or references in one call. References are answered from memory and
+    everything else goes to Elasticsearch as a single `_msearch`; identical sub-queries run
+    once. Results come back in request order, each with `verses` or its own `error`.
+    """
+    outcomes: Dict[tuple, dict] = {}
+    pending: Dict[tuple, tuple] = {}  # key -> (translation, spans, search body)
+    keys = []
+    if SCRIPTURE_BACKEND != "local":
+        await verse_cache.sync_generation(await get_elastic())
+
+    for item in body.items:
+        t = _translation(item.translation, user)
+        key = verse_cache.key(item.q, t, item.size)
+        keys.append(key)
+        if key in outcomes or key in pending:
+            continue
+        spans = parse_references(item.q)
+        loaded = verse_store.resolve(t)
+        if spans and loaded:
+            outcomes[key] = {"translation": loaded, "verses": verse_store.passage(loaded, spans, limit=item.size)}
+        elif SCRIPTURE_BACKEND == "local":
+            verses = [] if spans else await anyio.to_thread.run_sync(local_search.search, item.q, t, item.size)
+            outcomes[key] = {"translation": t, "verses": verses}
+        elif spans:
+            pending[key] = (
+                t,
+                spans,
+                {
+                    "query": passage_query(spans, t),
+                    "sort": [{"chapter": "asc"}, {"verse": "asc"}],
+                    "size": PASSAGE_MAX_VERSES,
+                },
+            )
+        else:
+            cached = verse_cache.get(key)
+            if cached is not MISSING:
+                outcomes[key] = {"translation": t, "verses": cached}
+            else:
+                pending[key] = (t, None, {"query": verse_query(item.q, t), "size": item.size})
+
+    if pending:
+        results = await _es_msearch([search for _, _, search in pending.values()])
+        for (key, (t, spans, _)), result in zip(pending.items(), results):
+            if isinstance(result, str):
+                outcomes[key] = {"translation": t, "error": result}
+                continue
+            if spans:
+                result = [v for s in spans for v in result if in_span(v, s)][: key[-1]]
+            else:
+                verse_cache.set(key, result)
+            outcomes[key] = {"translation": t, "verses": result}
+
+    return {"results": [{"q": item.q, **outcomes[key]} for item, key in zip(body.items, keys)]}
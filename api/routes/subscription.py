@@ -1,14 +1,20 @@
 # api/routes/subscription.py
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+import datetime
+import json
+import os
+
+import stripe
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import JSONResponse
-import stripe, os, json, datetime
+
 from api.auth.deps import get_current_user
+from api.billing.stripe_gateway import stripe_gateway
+from api.cache.user_cache import user_cache
 from api.db.database import db
 
 router = APIRouter(prefix="/subscription", tags=["Subscription"])
 
-# --- Stripe config ---
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+# --- Stripe config (api key / http client are set up in api.billing.stripe_gateway) ---
 PRICE_ID = os.getenv("STRIPE_PRICE_ID")
 SUCCESS_URL = os.getenv("STRIPE_SUCCESS_URL", "http://localhost:8000/success")
 CANCEL_URL = os.getenv("STRIPE_CANCEL_URL", "http://localhost:8000/cancel")
@@ -17,35 +23,32 @@ WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 if not stripe.api_key or not PRICE_ID:
     raise RuntimeError("Missing STRIPE_SECRET_KEY or STRIPE_PRICE_ID")
 
+
 def _is_admin_or_subscribed(role: str) -> bool:
     return role in ("admin", "subscriber")
 
+
 async def _ensure_customer_for_user(user) -> str:
     """
     Ensure the app user has a Stripe customer; store id on user doc.
     """
     if cid := user.get("stripe_customer_id"):
         return cid
-    customer = stripe.Customer.create(email=user.get("email"))
+    customer_id = await stripe_gateway.create_customer(user.get("email"))
     await db.users.update_one(
-        {"_id": user["_id"]},
-        {"$set": {"stripe_customer_id": customer.id, "updated_at": datetime.datetime.utcnow()}}
+        {"_id": user["_id"]}, {"$set": {"stripe_customer_id": customer_id, "updated_at": datetime.datetime.utcnow()}}
     )
-    return customer.id
+    user_cache.invalidate(user.get("email"))
+    return customer_id
+
 
 async def _active_subscription_for_customer(stripe_customer_id: str):
     """
     Return the first 'live' subscription for a Stripe customer, or None.
+    Served from the gateway cache; webhooks invalidate it.
     """
-    subs = stripe.Subscription.list(
-        customer=stripe_customer_id,
-        status="all",
-        expand=["data.default_payment_method"]
-    )
-    for s in subs.auto_paging_iter():
-        if s["status"] in ("trialing", "active", "past_due"):
-            return s
-    return None
+    return await stripe_gateway.active_subscription(stripe_customer_id)
+
 
 # ---------- New: subscribe now (no trial) ----------
 @router.post("/subscribe-now")
@@ -58,17 +61,15 @@ async def subscribe_now(user=Depends(get_current_user)):
 
     # If already subscribed, send them to the portal instead of creating another subscription
     if _is_admin_or_subscribed(user.get("role", "")):
-        session = stripe.billing_portal.Session.create(customer=customer_id, return_url=SUCCESS_URL)
-        return {"portal_url": session.url}
+        return {"portal_url": await stripe_gateway.portal_url(customer_id, SUCCESS_URL)}
 
     # If they still have an active/trialing subscription record at Stripe, send portal
     existing = await _active_subscription_for_customer(customer_id)
     if existing:
-        session = stripe.billing_portal.Session.create(customer=customer_id, return_url=SUCCESS_URL)
-        return {"portal_url": session.url}
+        return {"portal_url": await stripe_gateway.portal_url(customer_id, SUCCESS_URL)}
 
     try:
-        session = stripe.checkout.Session.create(
+        checkout_url = await stripe_gateway.checkout_url(
             mode="subscription",
             customer=customer_id,
             line_items=[{"price": PRICE_ID, "quantity": 1}],
@@ -79,10 +80,11 @@ async def subscribe_now(user=Depends(get_current_user)):
             allow_promotion_codes=True,
         )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     # Don't flip role here; wait for webhook confirmation (customer.subscription.created/updated -> active)
-    return {"checkout_url": session.url}
+    return {"checkout_url": checkout_url}
+
 
 # ---------- Existing: start 7-day trial ----------
 @router.post("/start-trial")
@@ -95,17 +97,15 @@ async def start_trial(user=Depends(get_current_user)):
 
     # If already subscribed, just send to portal
     if _is_admin_or_subscribed(user.get("role", "")):
-        session = stripe.billing_portal.Session.create(customer=customer_id, return_url=SUCCESS_URL)
-        return {"portal_url": session.url}
+        return {"portal_url": await stripe_gateway.portal_url(customer_id, SUCCESS_URL)}
 
     # If they already have an active/trialing sub at Stripe, send portal
     existing = await _active_subscription_for_customer(customer_id)
     if existing:
-        session = stripe.billing_portal.Session.create(customer=customer_id, return_url=SUCCESS_URL)
-        return {"portal_url": session.url}
+        return {"portal_url": await stripe_gateway.portal_url(customer_id, SUCCESS_URL)}
 
     try:
-        session = stripe.checkout.Session.create(
+        checkout_url = await stripe_gateway.checkout_url(
             mode="subscription",
             customer=customer_id,
             line_items=[{"price": PRICE_ID, "quantity": 1}],
@@ -118,19 +118,23 @@ async def start_trial(user=Depends(get_current_user)):
             allow_promotion_codes=True,
         )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     # Optionally mark trial locally for UX, but the source of truth will be webhooks
     await db.users.update_one(
         {"_id": user["_id"]},
-        {"$set": {
-            "role": "trial" if user.get("role") != "admin" else "admin",
-            "trial_start_date": datetime.datetime.utcnow(),
-            "updated_at": datetime.datetime.utcnow()
-        }}
+        {
+            "$set": {
+                "role": "trial" if user.get("role") != "admin" else "admin",
+                "trial_start_date": datetime.datetime.utcnow(),
+                "updated_at": datetime.datetime.utcnow(),
+            }
+        },
     )
+    user_cache.invalidate(user.get("email"))
+
+    return {"checkout_url": checkout_url}
 
-    return {"checkout_url": session.url}
 
 # ---------- Cancel at period end ----------
 @router.post("/cancel")
@@ -146,12 +150,13 @@ async def cancel_subscription(user=Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="No active subscription found.")
 
     try:
-        stripe.Subscription.modify(active.id, cancel_at_period_end=True)
+        await stripe_gateway.cancel_at_period_end(active["id"], user["stripe_customer_id"])
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     # Keep role as-is until the period actually lapses (webhook will flip)
-    return {"message": "Subscription will cancel at period end.", "subscription_id": active.id}
+    return {"message": "Subscription will cancel at period end.", "subscription_id": active["id"]}
+
 
 # ---------- Billing portal ----------
 @router.post("/portal")
@@ -161,10 +166,11 @@ async def create_billing_portal(user=Depends(get_current_user)):
     """
     cid = user.get("stripe_customer_id") or await _ensure_customer_for_user(user)
     try:
-        session = stripe.billing_portal.Session.create(customer=cid, return_url=SUCCESS_URL)
+        portal_url = await stripe_gateway.portal_url(cid, SUCCESS_URL)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"portal_url": session.url}
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return {"portal_url": portal_url}
+
 
 # ---------- Optional: current subscription status ----------
 @router.get("/status")
@@ -182,6 +188,7 @@ async def subscription_status(user=Depends(get_current_user)):
         status_payload["stripe_subscription_id"] = sub["id"]
     return status_payload
 
+
 # ---------- Webhook ----------
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
@@ -203,10 +210,10 @@ async def stripe_webhook(request: Request):
     # Checkout done: nothing to change locally besides ensuring customer link
     if type_ == "checkout.session.completed":
         customer_id = data.get("customer")
+        await stripe_gateway.invalidate(customer_id)
         if customer_id:
             await db.users.update_one(
-                {"stripe_customer_id": customer_id},
-                {"$set": {"updated_at": datetime.datetime.utcnow()}}
+                {"stripe_customer_id": customer_id}, {"$set": {"updated_at": datetime.datetime.utcnow()}}
             )
         return {"received": True}
 
@@ -215,10 +222,11 @@ async def stripe_webhook(request: Request):
         sub = data
         customer_id = sub.get("customer")
         status_s = sub.get("status")  # trialing, active, past_due, canceled, unpaid
+        await stripe_gateway.invalidate(customer_id)
 
         user_doc = await db.users.find_one({"stripe_customer_id": customer_id})
         if user_doc:
-            updates = {"updated_at": datetime.datetime.utcnow()}
+            updates = {"updated_at": datetime.datetime.utcnow(), "subscription_status": status_s}
             if status_s == "trialing" and user_doc.get("role") != "admin":
                 updates["role"] = "trial"
                 updates["trial_start_date"] = updates["updated_at"]
@@ -227,76 +235,92 @@ async def stripe_webhook(request: Request):
             elif status_s in ("canceled", "unpaid") and user_doc.get("role") != "admin":
                 updates["role"] = "unsubscribed"
             await db.users.update_one({"_id": user_doc["_id"]}, {"$set": updates})
+            user_cache.invalidate(user_doc.get("email"))
 
         # Upsert a local subscription record
         await db.subscriptions.update_one(
             {"stripe_subscription_id": sub["id"]},
-            {"$set": {
-                "stripe_subscription_id": sub["id"],
-                "stripe_customer_id": customer_id,
-                "status": status_s,
-                "current_period_end": datetime.datetime.fromtimestamp(sub["current_period_end"]),
-                "cancel_at_period_end": sub.get("cancel_at_period_end", False),
-                "plan_price_id": sub["items"]["data"][0]["price"]["id"] if sub.get("items") else None,
-                "updated_at": datetime.datetime.utcnow(),
+            {
+                "$set": {
+                    "stripe_subscription_id": sub["id"],
+                    "stripe_customer_id": customer_id,
+                    "status": status_s,
+                    "current_period_end": datetime.datetime.fromtimestamp(sub["current_period_end"]),
+                    "cancel_at_period_end": sub.get("cancel_at_period_end", False),
+                    "plan_price_id": sub["items"]["data"][0]["price"]["id"] if sub.get("items") else None,
+                    "updated_at": datetime.datetime.utcnow(),
+                },
+                "$setOnInsert": {"created_at": datetime.datetime.utcnow()},
             },
-             "$setOnInsert": {"created_at": datetime.datetime.utcnow()}},
-            upsert=True
+            upsert=True,
         )
         return {"received": True}
 
     if type_ == "customer.subscription.deleted":
         customer_id = data.get("customer")
+        await stripe_gateway.invalidate(customer_id)
         user_doc = await db.users.find_one({"stripe_customer_id": customer_id})
-        if user_doc and user_doc.get("role") != "admin":
-            await db.users.update_one(
-                {"_id": user_doc["_id"]},
-                {"$set": {"role": "unsubscribed", "updated_at": datetime.datetime.utcnow()}}
-            )
+        if user_doc:
+            updates = {"subscription_status": "canceled", "updated_at": datetime.datetime.utcnow()}
+            if user_doc.get("role") != "admin":
+                updates["role"] = "unsubscribed"
+            await db.users.update_one({"_id": user_doc["_id"]}, {"$set": updates})
+            user_cache.invalidate(user_doc.get("email"))
         await db.subscriptions.update_one(
             {"stripe_subscription_id": data["id"]},
-            {"$set": {"status": "canceled", "updated_at": datetime.datetime.utcnow()}}
+            {"$set": {"status": "canceled", "updated_at": datetime.datetime.utcnow()}},
         )
         return {"received": True}
 
     # Invoices / Payments
     if type_ == "invoice.payment_succeeded":
         inv = data
-        await db.payments.insert_one({
-            "stripe_invoice_id": inv["id"],
-            "stripe_customer_id": inv.get("customer"),
-            "amount_paid": inv["amount_paid"],
-            "currency": inv["currency"],
-            "paid": inv["paid"],
-            "created_at": datetime.datetime.utcnow(),
-            "lines": inv.get("lines", {}),
-        })
+        await db.payments.insert_one(
+            {
+                "stripe_invoice_id": inv["id"],
+                "stripe_customer_id": inv.get("customer"),
+                "amount_paid": inv["amount_paid"],
+                "currency": inv["currency"],
+                "paid": inv["paid"],
+                "created_at": datetime.datetime.utcnow(),
+                "lines": inv.get("lines", {}),
+            }
+        )
         return {"received": True}
 
     if type_ == "invoice.payment_failed":
         inv = data
-        await db.payments.insert_one({
-            "stripe_invoice_id": inv["id"],
-            "stripe_customer_id": inv.get("customer"),
-            "amount_due": inv["amount_due"],
-            "currency": inv["currency"],
-            "paid": inv["paid"],
-            "attempt_count": inv.get("attempt_count"),
-            "created_at": datetime.datetime.utcnow(),
-            "failure_code": inv.get("last_payment_error", {}).get("code") if inv.get("last_payment_error") else None,
-            "failure_message": inv.get("last_payment_error", {}).get("message") if inv.get("last_payment_error") else None,
-        })
+        await db.payments.insert_one(
+            {
+                "stripe_invoice_id": inv["id"],
+                "stripe_customer_id": inv.get("customer"),
+                "amount_due": inv["amount_due"],
+                "currency": inv["currency"],
+                "paid": inv["paid"],
+                "attempt_count": inv.get("attempt_count"),
+                "created_at": datetime.datetime.utcnow(),
+                "failure_code": (
+                    inv.get("last_payment_error", {}).get("code") if inv.get("last_payment_error") else None
+                ),
+                "failure_message": (
+                    inv.get("last_payment_error", {}).get("message") if inv.get("last_payment_error") else None
+                ),
+            }
+        )
         return {"received": True}
 
     # Optional: 3-day trial ending heads-up
     if type_ == "customer.subscription.trial_will_end":
         sub = data
-        await db.events.insert_one({
-            "type": type_,
-            "stripe_subscription_id": sub["id"],
-            "stripe_customer_id": sub.get("customer"),
-            "created_at": datetime.datetime.utcnow(),
-        })
+        await stripe_gateway.invalidate(sub.get("customer"))
+        await db.events.insert_one(
+            {
+                "type": type_,
+                "stripe_subscription_id": sub["id"],
+                "stripe_customer_id": sub.get("customer"),
+                "created_at": datetime.datetime.utcnow(),
+            }
+        )
         return {"received": True}
 
     # Log everything else
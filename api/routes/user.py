@@ -1,32 +1,30 @@
 # api/routes/user.py
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from typing import Optional, List, Any, Dict
+import re
 from datetime import datetime
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
 from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
 
-from api.db.database import db
+from api.auth.auth import hash_password_async, verify_password_async
 from api.auth.deps import get_current_user
-from api.auth.auth import hash_password, verify_password
+from api.db import users_repo
+from api.db.database import db
+from api.db.pagination import fetch_page
+from api.db.users_repo import PUBLIC_PROJECTION
 from api.models.user import Role
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 # ----------------- Schemas -----------------
 
+
 class PreferencesPut(BaseModel):
-    denomination: Optional[str] = Field(
-        default=None, description="User's denomination (free text or enum later)"
-    )
-    translation: Optional[str] = Field(
-        default=None, description="Preferred Bible translation key (e.g., KJV, ESV)"
-    )
-    response_length: Optional[str] = Field(
-        default="standard", description='One of: "short", "standard", "long"'
-    )
-    citation_style: Optional[str] = Field(
-        default="inline", description='One of: "inline", "footnote"'
-    )
+    denomination: Optional[str] = Field(default=None, description="User's denomination (free text or enum later)")
+    translation: Optional[str] = Field(default=None, description="Preferred Bible translation key (e.g., KJV, ESV)")
+    response_length: Optional[str] = Field(default="standard", description='One of: "short", "standard", "long"')
+    citation_style: Optional[str] = Field(default="inline", description='One of: "inline", "footnote", "none"')
     include_direct_quotes: Optional[bool] = True
     use_denomination_weighting: Optional[bool] = True
     tone_hint: Optional[str] = Field(
@@ -35,6 +33,7 @@ class PreferencesPut(BaseModel):
     timezone: Optional[str] = None
     locale: Optional[str] = None
 
+
 class PreferencesPatch(BaseModel):
     denomination: Optional[str] = None
     translation: Optional[str] = None
@@ -46,19 +45,23 @@ class PreferencesPatch(BaseModel):
     timezone: Optional[str] = None
     locale: Optional[str] = None
 
+
 class UserPatch(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     preferences: Optional[PreferencesPatch] = None
 
+
 class AdminUserPatch(UserPatch):
     role: Optional[Role] = None
     trial_start_date: Optional[datetime] = None
 
+
 class PasswordChange(BaseModel):
     current_password: str
     new_password: str
 
+
 class UserPublic(BaseModel):
     id: Optional[str] = None
     email: Optional[str] = None
@@ -67,18 +70,30 @@ class UserPublic(BaseModel):
     role: Optional[str] = None
     trial_start_date: Optional[datetime] = None
     is_subscribed: Optional[bool] = False
+    subscription_status: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     preferences: Optional[Dict[str, Any]] = None
 
+
+class UserPage(BaseModel):
+    items: List[UserPublic]
+    # pass back as ?cursor= for the next page; null on the last page
+    next_cursor: Optional[str] = None
+    # approximate size of the whole user collection
+    total_estimate: int
+
+
 # ----------------- Helpers -----------------
 
+
 def _oid(id_str: str) -> ObjectId:
     if not ObjectId.is_valid(id_str):
         raise HTTPException(status_code=400, detail="Invalid user id")
     return ObjectId(id_str)
 
-def _to_public(user: Dict[str, Any]) -> UserPublic:
+
+def _to_public(user: Optional[Dict[str, Any]]) -> UserPublic:
     if not user:
         return UserPublic()
     prefs = user.get("preferences") or {}
@@ -90,6 +105,7 @@ def _to_public(user: Dict[str, Any]) -> UserPublic:
         role=user.get("role"),
         trial_start_date=user.get("trial_start_date"),
         is_subscribed=(user.get("role") in (Role.ADMIN.value, Role.SUBSCRIBER.value)),
+        subscription_status=user.get("subscription_status"),
         created_at=user.get("created_at"),
         updated_at=user.get("updated_at"),
         preferences={
@@ -105,16 +121,20 @@ def _to_public(user: Dict[str, Any]) -> UserPublic:
         },
     )
 
+
 def _require_admin(current_user: Dict[str, Any]) -> None:
     if current_user.get("role") != Role.ADMIN.value:
         raise HTTPException(status_code=403, detail="Admin privileges required")
 
+
 # ----------------- Me (self) endpoints -----------------
 
+
 @router.get("/me", response_model=UserPublic)
 async def me(current_user=Depends(get_current_user)):
     return _to_public(current_user)
 
+
 @router.patch("/me", response_model=UserPublic)
 async def update_me(payload: UserPatch, current_user=Depends(get_current_user)):
     updates: Dict[str, Any] = {}
@@ -124,81 +144,83 @@ async def update_me(payload: UserPatch, current_user=Depends(get_current_user)):
     if payload.last_name is not None:
         updates["last_name"] = payload.last_name
 
-    if payload.preferences is not None:
-        pref_updates = {k: v for k, v in payload.preferences.model_dump(exclude_none=True).items()}
-        updates["preferences"] = {**(current_user.get("preferences") or {}), **pref_updates}
+    pref_updates = payload.preferences.model_dump(exclude_none=True) if payload.preferences else {}
 
-    if not updates:
+    if not updates and not pref_updates:
         return _to_public(current_user)
 
-    updates["updated_at"] = datetime.utcnow()
-    await db.users.update_one({"_id": current_user["_id"]}, {"$set": updates})
-    refreshed = await db.users.find_one({"_id": current_user["_id"]})
+    refreshed = await users_repo.update_user({"_id": current_user["_id"]}, updates, preferences=pref_updates)
     return _to_public(refreshed)
 
+
 @router.put("/me/preferences", response_model=UserPublic)
 async def replace_my_preferences(prefs: PreferencesPut, current_user=Depends(get_current_user)):
-    await db.users.update_one(
-        {"_id": current_user["_id"]},
-        {"$set": {"preferences": prefs.model_dump(), "updated_at": datetime.utcnow()}},
-    )
-    refreshed = await db.users.find_one({"_id": current_user["_id"]})
+    refreshed = await users_repo.update_user({"_id": current_user["_id"]}, {"preferences": prefs.model_dump()})
     return _to_public(refreshed)
 
+
 @router.patch("/me/preferences", response_model=UserPublic)
 async def patch_my_preferences(prefs: PreferencesPatch, current_user=Depends(get_current_user)):
-    pref_updates = {k: v for k, v in prefs.model_dump(exclude_none=True).items()}
-    if pref_updates:
-        await db.users.update_one(
-            {"_id": current_user["_id"]},
-            {
-                "$set": {
-                    **{f"preferences.{k}": v for k, v in pref_updates.items()},
-                    "updated_at": datetime.utcnow(),
-                }
-            },
-        )
-    refreshed = await db.users.find_one({"_id": current_user["_id"]})
+    pref_updates = prefs.model_dump(exclude_none=True)
+    if not pref_updates:
+        return _to_public(current_user)
+    refreshed = await users_repo.update_user({"_id": current_user["_id"]}, preferences=pref_updates)
     return _to_public(refreshed)
 
+
 @router.post("/me/change-password", status_code=status.HTTP_204_NO_CONTENT)
 async def change_password(body: PasswordChange, current_user=Depends(get_current_user)):
-    if not verify_password(body.current_password, current_user["hashed_password"]):
+    if not await verify_password_async(body.current_password, current_user["hashed_password"]):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
-    new_hash = hash_password(body.new_password)
-    await db.users.update_one(
-        {"_id": current_user["_id"]},
-        {"$set": {"hashed_password": new_hash, "updated_at": datetime.utcnow()}},
-    )
+    new_hash = await hash_password_async(body.new_password)
+    await users_repo.update_user({"_id": current_user["_id"]}, {"hashed_password": new_hash}, projection={"email": 1})
     return
 
+
 # ----------------- Admin endpoints -----------------
 
-@router.get("/", response_model=List[UserPublic])
+
+@router.get("/", response_model=UserPage)
 async def list_users(
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    q: Optional[str] = Query(None, description="Email contains (case-insensitive)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    q: Optional[str] = Query(None, description="Email starts with (case-insensitive)"),
+    role: Optional[Role] = Query(None),
+    subscription_status: Optional[str] = Query(None, description="Stripe status, e.g. active, trialing, canceled"),
     current_user=Depends(get_current_user),
 ):
+    """Users ordered by email; every filter and page is an index range scan on email_lower."""
     _require_admin(current_user)
     flt: Dict[str, Any] = {}
     if q:
-        flt["email"] = {"$regex": q, "$options": "i"}
+        # anchored + case-sensitive on the lowercased copy, so it becomes index bounds
+        flt["email_lower"] = {"$regex": "^" + re.escape(q.strip().lower())}
+    if role is not None:
+        flt["role"] = role.value
+    if subscription_status:
+        flt["subscription_status"] = subscription_status
+
+    users, next_cursor = await fetch_page(
+        db.users, flt, "email_lower", cursor, limit, projection=PUBLIC_PROJECTION, descending=False
+    )
+    return UserPage(
+        items=[_to_public(u) for u in users],
+        next_cursor=next_cursor,
+        # collection metadata, not a count of matches
+        total_estimate=await db.users.estimated_document_count(),
+    )
 
-    cursor = db.users.find(flt).skip(skip).limit(limit).sort("created_at", 1)
-    users = await cursor.to_list(length=limit)
-    return [_to_public(u) for u in users]
 
 @router.get("/{user_id}", response_model=UserPublic)
 async def get_user(user_id: str, current_user=Depends(get_current_user)):
     if current_user.get("role") != Role.ADMIN.value and str(current_user["_id"]) != user_id:
         raise HTTPException(status_code=403, detail="Forbidden")
-    user = await db.users.find_one({"_id": _oid(user_id)})
+    user = await users_repo.find_user({"_id": _oid(user_id)})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return _to_public(user)
 
+
 @router.patch("/{user_id}", response_model=UserPublic)
 async def admin_update_user(user_id: str, payload: AdminUserPatch, current_user=Depends(get_current_user)):
     _require_admin(current_user)
@@ -212,30 +234,21 @@ async def admin_update_user(user_id: str, payload: AdminUserPatch, current_user=
         updates["role"] = payload.role.value
     if payload.trial_start_date is not None:
         updates["trial_start_date"] = payload.trial_start_date
-    if payload.preferences is not None:
-        pref_updates = {k: v for k, v in payload.preferences.model_dump(exclude_none=True).items()}
-        # Merge with current preferences
-        current = await db.users.find_one({"_id": _oid(user_id)}, projection={"preferences": 1})
-        merged = {**(current.get("preferences") or {}), **pref_updates} if current else pref_updates
-        updates["preferences"] = merged
-
-    if not updates:
-        user = await db.users.find_one({"_id": _oid(user_id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return _to_public(user)
-
-    updates["updated_at"] = datetime.utcnow()
-    result = await db.users.update_one({"_id": _oid(user_id)}, {"$set": updates})
-    if result.matched_count == 0:
+    pref_updates = payload.preferences.model_dump(exclude_none=True) if payload.preferences else {}
+
+    if not updates and not pref_updates:
+        user = await users_repo.find_user({"_id": _oid(user_id)})
+    else:
+        # merged server-side with dotted paths, so concurrent edits don't clobber each other
+        user = await users_repo.update_user({"_id": _oid(user_id)}, updates, preferences=pref_updates)
+    if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user = await db.users.find_one({"_id": _oid(user_id)})
     return _to_public(user)
 
+
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: str, current_user=Depends(get_current_user)):
     _require_admin(current_user)
-    res = await db.users.delete_one({"_id": _oid(user_id)})
-    if res.deleted_count == 0:
+    if not await users_repo.delete_user({"_id": _oid(user_id)}):
         raise HTTPException(status_code=404, detail="User not found")
     return
@@ -0,0 +1,74 @@
+# api/scripture/analysis.py
+"""
+Verse text analysis shared by the Elasticsearch template (elastic/bible_index.py) and the
+in-process engine (api/scripture/local_search.py), so both fold the same words together.
+"""
+
+import re
+from typing import Dict, List
+
+# KJV-era forms folded onto their modern equivalents so either phrasing finds the verse
+TEXT_SYNONYMS = [
+    "thee, thou, ye => you",
+    "thy, thine => your",
+    "hath => has",
+    "hast => have",
+    "doth => does",
+    "saith => says",
+    "shalt => shall",
+    "spake => spoke",
+    "charity => love",
+]
+# stopwords on top of _english_ that carry no meaning in older translations
+ARCHAIC_STOPWORDS = ["unto", "thereof", "lo", "behold", "verily"]
+
+# Elasticsearch's _english_ list
+# fmt: off
+ENGLISH_STOPWORDS = [
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in", "into", "is", "it",
+    "no", "not", "of", "on", "or", "such", "that", "the", "their", "then", "there", "these",
+    "they", "this", "to", "was", "will", "with",
+]
+# fmt: on
+
+_STOP = frozenset(ENGLISH_STOPWORDS + ARCHAIC_STOPWORDS)
+_WORD = re.compile(r"[a-z0-9]+")
+# longest first; "eth"/"est" cover KJV verb forms (loveth, knowest)
+_SUFFIXES = ("ingly", "edly", "ings", "ing", "eth", "est", "ies", "ied", "ed", "es", "ly", "s")
+
+
+def _synonym_map(rules: List[str]) -> Dict[str, str]:
+    mapping = {}
+    for rule in rules:
+        left, _, right = rule.partition("=>")
+        words = [w.strip() for w in left.split(",")]
+        target = right.strip() or words[0]  # equivalences fold onto their first word
+        for w in words:
+            mapping[w] = target
+    return mapping
+
+
+_SYNONYMS = _synonym_map(TEXT_SYNONYMS)
+
+
+def stem(word: str) -> str:
+    """Light suffix stripping; no dictionary, just enough that love/loved/loveth/loving meet."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            if suffix in ("ies", "ied") or word.endswith("i"):
+                word = word.rstrip("i") + "y"  # studies -> study, envieth -> envy
+            elif len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]  # running -> run
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+def analyze(text: str) -> List[str]:
+    """Lowercase words -> synonyms -> stopwords -> stems, like the `verse_text` analyzer."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        word = _SYNONYMS.get(word, word)
+        if word not in _STOP:
+            terms.append(stem(word))
+    return terms
@@ -0,0 +1,164 @@
+# api/scripture/books.py
+"""
+The 66-book canon keyed by USFM code (the `book` value in the seed data: GEN, 1SA, JHN, ...).
+
+One table feeds both the Elasticsearch book-name synonyms (elastic/bible_index.py) and
+reference lookups in the API, so "Genesis", "Gen" and "GEN" resolve the same way everywhere.
+Pure data, no app imports: the loader imports it outside the API process.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+
+class Book(NamedTuple):
+    code: str  # USFM code as stored in the index
+    name: str  # display name
+    aliases: tuple  # other accepted spellings, lowercase, without the number prefix for numbered books
+
+
+# canonical order; position is the book's ordinal (used for sorting/packing references)
+BOOKS = (
+    Book("GEN", "Genesis", ("gen", "gn", "ge")),
+    Book("EXO", "Exodus", ("exod", "exo", "ex")),
+    Book("LEV", "Leviticus", ("lev", "lv")),
+    Book("NUM", "Numbers", ("num", "nm", "nu")),
+    Book("DEU", "Deuteronomy", ("deut", "deu", "dt")),
+    Book("JOS", "Joshua", ("josh", "jos")),
+    Book("JDG", "Judges", ("judg", "jdg", "jg")),
+    Book("RUT", "Ruth", ("rut", "rth", "ru")),
+    Book("1SA", "1 Samuel", ("samuel", "sam", "sa", "sm")),
+    Book("2SA", "2 Samuel", ("samuel", "sam", "sa", "sm")),
+    Book("1KI", "1 Kings", ("kings", "kgs", "ki")),
+    Book("2KI", "2 Kings", ("kings", "kgs", "ki")),
+    Book("1CH", "1 Chronicles", ("chronicles", "chron", "chr", "ch")),
+    Book("2CH", "2 Chronicles", ("chronicles", "chron", "chr", "ch")),
+    Book("EZR", "Ezra", ("ezr",)),
+    Book("NEH", "Nehemiah", ("neh", "ne")),
+    Book("EST", "Esther", ("esth", "est")),
+    Book("JOB", "Job", ("jb",)),
+    Book("PSA", "Psalms", ("psalm", "psa", "pss", "ps")),
+    Book("PRO", "Proverbs", ("prov", "pro", "prv", "pr")),
+    Book("ECC", "Ecclesiastes", ("eccl", "ecc", "ec", "qoheleth", "qoh")),
+    Book(
+        "SNG", "Song of Songs", ("song of solomon", "song of sol", "canticles", "canticle of canticles", "sng", "sos")
+    ),
+    Book("ISA", "Isaiah", ("isa",)),
+    Book("JER", "Jeremiah", ("jer", "je")),
+    Book("LAM", "Lamentations", ("lam", "la")),
+    Book("EZK", "Ezekiel", ("ezek", "ezk", "eze")),
+    Book("DAN", "Daniel", ("dan", "dn", "da")),
+    Book("HOS", "Hosea", ("hos", "ho")),
+    Book("JOL", "Joel", ("jol", "jl")),
+    Book("AMO", "Amos", ("amo",)),
+    Book("OBA", "Obadiah", ("obad", "oba", "ob")),
+    Book("JON", "Jonah", ("jon", "jnh")),
+    Book("MIC", "Micah", ("mic", "mc")),
+    Book("NAM", "Nahum", ("nah", "nam", "na")),
+    Book("HAB", "Habakkuk", ("hab", "hb")),
+    Book("ZEP", "Zephaniah", ("zeph", "zep", "zp")),
+    Book("HAG", "Haggai", ("hag", "hg")),
+    Book("ZEC", "Zechariah", ("zech", "zec", "zc")),
+    Book("MAL", "Malachi", ("mal", "ml")),
+    Book("MAT", "Matthew", ("matt", "mat", "mt")),
+    Book("MRK", "Mark", ("mrk", "mar", "mk")),
+    Book("LUK", "Luke", ("luk", "lk")),
+    Book("JHN", "John", ("jhn", "joh", "jn")),
+    Book("ACT", "Acts", ("act", "ac")),
+    Book("ROM", "Romans", ("rom", "rm", "ro")),
+    Book("1CO", "1 Corinthians", ("corinthians", "cor", "co")),
+    Book("2CO", "2 Corinthians", ("corinthians", "cor", "co")),
+    Book("GAL", "Galatians", ("gal", "ga")),
+    Book("EPH", "Ephesians", ("ephes", "eph")),
+    Book("PHP", "Philippians", ("phil", "php", "pp")),
+    Book("COL", "Colossians", ("col",)),
+    Book("1TH", "1 Thessalonians", ("thessalonians", "thess", "thes", "th")),
+    Book("2TH", "2 Thessalonians", ("thessalonians", "thess", "thes", "th")),
+    Book("1TI", "1 Timothy", ("timothy", "tim", "ti")),
+    Book("2TI", "2 Timothy", ("timothy", "tim", "ti")),
+    Book("TIT", "Titus", ("tit",)),
+    Book("PHM", "Philemon", ("philem", "phlm", "phm")),
+    Book("HEB", "Hebrews", ("heb",)),
+    Book("JAS", "James", ("jas", "jm")),
+    Book("1PE", "1 Peter", ("peter", "pet", "pe", "pt")),
+    Book("2PE", "2 Peter", ("peter", "pet", "pe", "pt")),
+    Book("1JN", "1 John", ("john", "jhn", "jn", "jo")),
+    Book("2JN", "2 John", ("john", "jhn", "jn", "jo")),
+    Book("3JN", "3 John", ("john", "jhn", "jn", "jo")),
+    Book("JUD", "Jude", ("jud", "jde")),
+    Book("REV", "Revelation", ("revelations", "rev", "apocalypse")),
+)
+
+BY_CODE: Dict[str, Book] = {b.code: b for b in BOOKS}
+ORDINAL: Dict[str, int] = {b.code: i for i, b in enumerate(BOOKS)}
+
+# abbreviations that are also everyday words ("Is 53:5", "Am 5:24"): they name a book only in a
+# reference, so they are kept out of the index synonyms, where "love is patient" would match Isaiah
+WORD_ALIASES = {"ISA": ("is",), "AMO": ("am",), "SNG": ("song",)}
+
+# spoken/roman forms of the number prefix on numbered books
+_ORDINAL_PREFIXES = {
+    "1": ("1", "i", "1st", "first"),
+    "2": ("2", "ii", "2nd", "second"),
+    "3": ("3", "iii", "3rd", "third"),
+}
+
+
+def _spellings(book: Book, words: bool = False) -> List[str]:
+    """Every accepted spelling of a book, lowercase, words separated by single spaces."""
+    number, _, base = book.name.partition(" ") if book.code[0].isdigit() else ("", "", book.name)
+    names = [base.lower(), *book.aliases, *(WORD_ALIASES.get(book.code, ()) if words else ())]
+    if not number:
+        return [book.code.lower(), *names]
+    spelled = [book.code.lower()]
+    for prefix in _ORDINAL_PREFIXES[number]:
+        spelled += [f"{prefix} {n}" for n in names]
+    return spelled
+
+
+def _normalize(name: str) -> str:
+    key = name.lower().replace(".", " ")
+    key = re.sub(r"^(\d)(?=[a-z])", r"\1 ", key.strip())  # "1sam" -> "1 sam"
+    return " ".join(key.split())
+
+
+def _build_lookup() -> Dict[str, str]:
+    lookup: Dict[str, str] = {}
+    for book in BOOKS:
+        for spelling in _spellings(book, words=True):
+            key = _normalize(spelling)
+            if lookup.setdefault(key, book.code) != book.code:
+                raise ValueError(f"book alias {spelling!r} is claimed by {lookup[key]} and {book.code}")
+    return lookup
+
+
+_LOOKUP = _build_lookup()
+_WORDS = {_normalize(a) for aliases in WORD_ALIASES.values() for a in aliases}
+
+
+def book_code(name: str) -> Optional[str]:
+    """USFM code for any accepted spelling ("Genesis", "gen.", "1 Sam", "1SA", "First Samuel"), else None."""
+    return _LOOKUP.get(_normalize(name))
+
+
+def is_word_alias(name: str) -> bool:
+    """Whether `name` is a book abbreviation that is also an everyday word ("is", "am")."""
+    return _normalize(name) in _WORDS
+
+
+def synonym_rules() -> List[str]:
+    """
+    Elasticsearch synonym rules collapsing every spelling onto the lowercased code,
+    e.g. "genesis, gn, ge => gen". Contracting to one token keeps the rules valid
+    at index time and lets exact book matches stay a single term lookup.
+    """
+    rules = []
+    for book in BOOKS:
+        spellings = []
+        for s in _spellings(book):
+            spellings.append(s)
+            if s.split(" ", 1)[0].isdigit():
+                spellings.append(s.replace(" ", "", 1))  # "1sam" is a single token to the standard tokenizer
+        spellings = [s for s in dict.fromkeys(spellings) if s != book.code.lower()]
+        rules.append(f"{', '.join(spellings)} => {book.code.lower()}")
+    return rules
@@ -0,0 +1,293 @@
+# api/scripture/local_search.py
+"""
+In-process BM25 verse search over the seed JSONL, for running without Elasticsearch
+(SCRIPTURE_BACKEND=local: dev, tests, small deployments).
+
+The index is a single file of flat arrays, opened with mmap and read through memoryview
+casts, so startup is a page-in rather than a rebuild:
+
+    doc_keys      uint32  packed (book, chapter, verse) per doc, docs grouped by translation
+    doc_lens      uint16  analyzed length, for BM25 length normalization
+    text_offsets  uint32  byte offsets into `text` (n_docs + 1)
+    text          utf-8   all verse texts back to back
+    term_offsets  uint32  start of each term's postings (n_terms + 1)
+    post_docs     uint32  doc ids, ascending within a term
+    post_tfs      uint16  term frequency per posting
+    terms         utf-8   newline-separated vocabulary, in term-id order
+
+Docs of one translation are a contiguous id range, so a translation filter is a bisect
+into each postings list rather than a per-posting check.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional
+
+from api.scripture import analysis
+from api.scripture.analysis import analyze
+from api.scripture.books import ORDINAL
+from api.scripture.verse_store import DATA_DIR, SEED_FILES, pack, unpack
+
+logger = logging.getLogger("local_search")
+
+# "elastic" (default) or "local"
+SCRIPTURE_BACKEND = os.getenv("SCRIPTURE_BACKEND", "elastic")
+# built on first start (the seed directory may be read-only), reused until the seed files or the analyzer change
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", os.path.join(tempfile.gettempdir(), "discern_verses.idx"))
+
+# same parameters as the verse_bm25 similarity in the ES template
+BM25_K1 = 1.2
+BM25_B = 0.5
+
+_MAGIC = b"DISCERN-VERSES-1\n"
+_SECTIONS = [
+    ("doc_keys", "I"),
+    ("doc_lens", "H"),
+    ("text_offsets", "I"),
+    ("text", "B"),
+    ("term_offsets", "I"),
+    ("post_docs", "I"),
+    ("post_tfs", "H"),
+    ("terms", "B"),
+]
+
+
+def _analyzer_fingerprint() -> str:
+    # any edit to api/scripture/analysis.py (stopwords, synonyms, stemmer) makes built indexes stale
+    with open(analysis.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+ANALYZER_FINGERPRINT = _analyzer_fingerprint()
+
+
+def read_header(path: str) -> Optional[dict]:
+    """The JSON header of an index file, or None if `path` isn't one."""
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            return None
+        try:
+            return json.loads(f.readline())
+        except ValueError:
+            return None
+
+
+def build_index(data_dir: str, files: List[str], path: str) -> None:
+    """Analyze the seed files and write the index file (atomically, via a temp file)."""
+    started = time.perf_counter()
+    docs: List[tuple] = []
+    for name in files:
+        source = os.path.join(data_dir, name)
+        if not os.path.exists(source):
+            logger.warning("local search: %s not found, skipping", source)
+            continue
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                doc = json.loads(line)
+                if doc.get("book") not in ORDINAL:
+                    continue
+                key = pack(doc["book"], int(doc["chapter"]), int(doc["verse"]))
+                docs.append((doc["translation"], key, doc["text"]))
+    docs.sort()
+
+    translations: List[list] = []  # [name, first doc id, end doc id]
+    vocab: Dict[str, int] = {}
+    postings: List[List[tuple]] = []
+    arrays = {name: array(code) for name, code in _SECTIONS if code != "B"}
+    text = bytearray()
+    arrays["text_offsets"].append(0)
+    for doc_id, (translation, key, verse_text) in enumerate(docs):
+        if not translations or translations[-1][0] != translation:
+            translations.append([translation, doc_id, doc_id])
+        translations[-1][2] = doc_id + 1
+        terms = analyze(verse_text)
+        arrays["doc_keys"].append(key)
+        arrays["doc_lens"].append(min(len(terms), 0xFFFF))
+        text += verse_text.encode("utf-8")
+        arrays["text_offsets"].append(len(text))
+        for term, tf in Counter(terms).items():
+            term_id = vocab.setdefault(term, len(vocab))
+            if term_id == len(postings):
+                postings.append([])
+            postings[term_id].append((doc_id, min(tf, 0xFFFF)))
+
+    arrays["term_offsets"].append(0)
+    for plist in postings:
+        for doc_id, tf in plist:
+            arrays["post_docs"].append(doc_id)
+            arrays["post_tfs"].append(tf)
+        arrays["term_offsets"].append(len(arrays["post_docs"]))
+    blobs = {name: a.tobytes() for name, a in arrays.items()}
+    blobs["text"] = bytes(text)
+    blobs["terms"] = "\n".join(vocab).encode("utf-8")
+
+    # header: magic, one JSON line, then 8-byte aligned sections at the offsets it lists
+    sections, offset = {}, 0
+    for name, code in _SECTIONS:
+        sections[name] = [offset, len(blobs[name]), code]
+        offset += len(blobs[name]) + (-len(blobs[name]) % 8)
+    header = {
+        "analyzer": ANALYZER_FINGERPRINT,
+        "docs": len(docs),
+        "terms": len(vocab),
+        "translations": translations,
+        "avgdl": sum(arrays["doc_lens"]) / max(len(docs), 1),
+        "sections": sections,
+    }
+    head = _MAGIC + json.dumps(header).encode() + b"\n"
+    head += b"\0" * (-len(head) % 8)
+
+    # private temp file per builder: workers starting together may all rebuild, and each
+    # os.replace swaps in a complete file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(head)
+            for name, _ in _SECTIONS:
+                f.write(blobs[name])
+                f.write(b"\0" * (-len(blobs[name]) % 8))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    logger.info(
+        "local search: indexed %s docs, %s terms into %s in %.1fs",
+        len(docs),
+        len(vocab),
+        path,
+        time.perf_counter() - started,
+    )
+
+
+class LocalSearch:
+    # views into the mapped file, one per _SECTIONS entry, set by load()
+    doc_keys: memoryview
+    doc_lens: memoryview
+    text_offsets: memoryview
+    text: memoryview
+    term_offsets: memoryview
+    post_docs: memoryview
+    post_tfs: memoryview
+    terms: memoryview
+
+    def __init__(self, path: str = LOCAL_INDEX_PATH, data_dir: str = DATA_DIR, files: List[str] = SEED_FILES):
+        self.path = path
+        self.data_dir = data_dir
+        self.files = list(files)
+        self._mm: Optional[mmap.mmap] = None
+        self.searches = 0
+        self.search_seconds = 0.0
+
+    def _stale(self) -> bool:
+        if not os.path.exists(self.path):
+            return True
+        header = read_header(self.path)
+        if not header or header.get("analyzer") != ANALYZER_FINGERPRINT:
+            return True
+        built = os.path.getmtime(self.path)
+        sources = [os.path.join(self.data_dir, f) for f in self.files]
+        return any(os.path.exists(s) and os.path.getmtime(s) > built for s in sources)
+
+    def load(self) -> None:
+        """Open the index file, (re)building it first if missing, from another analyzer, or older than the seed files."""
+        if self._stale():
+            build_index(self.data_dir, self.files, self.path)
+        started = time.perf_counter()
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{self.path} is not a verse index")
+        header_end = mm.find(b"\n", len(_MAGIC))
+        header = json.loads(mm[len(_MAGIC) : header_end])
+        base = header_end + 1 + (-(header_end + 1) % 8)
+        view = memoryview(mm)
+        for name, (offset, length, code) in header["sections"].items():
+            section = view[base + offset : base + offset + length]
+            setattr(self, name, section if code == "B" else section.cast(code))
+        self._mm = mm
+        self.doc_count = header["docs"]
+        self.avgdl = header["avgdl"]
+        self.translations = {t: (lo, hi) for t, lo, hi in header["translations"]}
+        self.vocab = (
+            {term: i for i, term in enumerate(bytes(self.terms).decode("utf-8").split("\n"))} if header["terms"] else {}
+        )
+        # BM25 length normalization per doc, precomputed once
+        self.norms = array("d", (BM25_K1 * (1 - BM25_B + BM25_B * n / self.avgdl) for n in self.doc_lens))
+        logger.info(
+            "local search: opened %s (%s docs, %s terms) in %.3fs",
+            self.path,
+            self.doc_count,
+            len(self.vocab),
+            time.perf_counter() - started,
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._mm is not None
+
+    def _source(self, doc_id: int) -> dict:
+        book, chapter, verse = unpack(self.doc_keys[doc_id])
+        translation = next(t for t, (lo, hi) in self.translations.items() if lo <= doc_id < hi)
+        text = bytes(self.text[self.text_offsets[doc_id] : self.text_offsets[doc_id + 1]]).decode("utf-8")
+        return {
+            "book": book,
+            "chapter": chapter,
+            "verse": verse,
+            "reference": f"{book} {chapter}:{verse}",
+            "text": text,
+            "translation": translation,
+        }
+
+    def search(self, q: str, translation: Optional[str] = None, size: int = 20) -> List[dict]:
+        """Top `size` verses by BM25, shaped like the Elasticsearch `_source`."""
+        started = time.perf_counter()
+        if translation in (None, "DEFAULT"):
+            lo, hi = 0, self.doc_count
+        elif translation in self.translations:
+            lo, hi = self.translations[translation]
+        else:
+            return []
+        scores: Dict[int, float] = {}
+        for term, qtf in Counter(analyze(q)).items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            df = end - start
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5)) * qtf
+            first = bisect_left(self.post_docs, lo, start, end)
+            last = bisect_left(self.post_docs, hi, first, end)
+            norms, get = self.norms, scores.get
+            for doc_id, tf in zip(self.post_docs[first:last], self.post_tfs[first:last]):
+                scores[doc_id] = get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norms[doc_id])
+        # ties go to canonical order, like ES does for equal scores on one shard
+        top = heapq.nsmallest(size, scores.items(), key=lambda item: (-item[1], item[0]))
+        self.searches += 1
+        self.search_seconds += time.perf_counter() - started
+        return [self._source(doc_id) for doc_id, _ in top]
+
+    def stats(self) -> dict:
+        return {
+            "backend": SCRIPTURE_BACKEND,
+            "ready": self.ready,
+            "docs": self.doc_count if self.ready else 0,
+            "searches": self.searches,
+            "avg_ms": round(1000 * self.search_seconds / self.searches, 3) if self.searches else 0.0,
+        }
+
+
+local_search = LocalSearch()
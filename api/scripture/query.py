@@ -0,0 +1,92 @@
+# api/scripture/query.py
+"""
+Verse search and passage queries, shared by the API routes and elastic/bench_search.py.
+Field names follow the index template in elastic/bible_index.py.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Union
+
+# full-word matches; book.names maps any spelling of a book name onto its code
+MATCH_FIELDS = ["text^2", "book.names^1.5", "reference"]
+# as-you-type matches against the search_as_you_type subfield (last term treated as a prefix)
+PREFIX_FIELDS = ["text.suggest", "text.suggest._2gram", "text.suggest._3gram"]
+
+
+def translation_filter(translation: Optional[str]) -> list:
+    return [{"term": {"translation": translation}}] if translation not in ("DEFAULT", None) else []
+
+
+def verse_query(q: str, translation: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "bool": {
+            "must": [
+                {
+                    "dis_max": {
+                        "queries": [
+                            {"multi_match": {"query": q, "fields": MATCH_FIELDS, "tie_breaker": 0.3}},
+                            {"multi_match": {"query": q, "type": "bool_prefix", "fields": PREFIX_FIELDS, "boost": 0.5}},
+                        ]
+                    }
+                }
+            ],
+            # verses containing the words in order (give or take a couple) go first
+            "should": [{"match_phrase": {"text": {"query": q, "slop": 2, "boost": 2}}}],
+            "filter": translation_filter(translation),
+        }
+    }
+
+
+def span_filter(span) -> Dict[str, Any]:
+    """Verses of one book between (chapter, verse) and (end_chapter, end_verse), inclusive."""
+
+    def bound(chapter: int, verse: int, op: str) -> Dict[str, Any]:
+        strict = op[:2]
+        return {
+            "bool": {
+                "should": [
+                    {"range": {"chapter": {strict: chapter}}},
+                    {"bool": {"filter": [{"term": {"chapter": chapter}}, {"range": {"verse": {op: verse}}}]}},
+                ]
+            }
+        }
+
+    return {
+        "bool": {
+            "filter": [
+                {"term": {"book": span.book}},
+                bound(span.chapter, span.verse, "gte"),
+                bound(span.end_chapter, span.end_verse, "lte"),
+            ]
+        }
+    }
+
+
+def passage_query(spans, translation: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "bool": {
+            "should": [span_filter(s) for s in spans],
+            "minimum_should_match": 1,
+            "filter": translation_filter(translation),
+        }
+    }
+
+
+def msearch_body(index: str, searches: List[Dict[str, Any]]) -> str:
+    """NDJSON body for `_msearch`: one header/body pair per search, all against `index`."""
+    header = json.dumps({"index": index})
+    return "".join(f"{header}\n{json.dumps(body)}\n" for body in searches)
+
+
+def msearch_results(payload: Dict[str, Any], count: int) -> List[Union[List[dict], str]]:
+    """Per search, in order: the hits' `_source`s, or an error message for that search alone."""
+    responses = payload.get("responses", [])
+    results: List[Union[List[dict], str]] = []
+    for i in range(count):
+        response: Dict[str, Any] = responses[i] if i < len(responses) else {"error": "missing response"}
+        if "error" in response:
+            error = response["error"]
+            results.append(error.get("reason", str(error)) if isinstance(error, dict) else str(error))
+        else:
+            results.append([h["_source"] for h in response.get("hits", {}).get("hits", [])])
+    return results
@@ -0,0 +1,146 @@
+# api/scripture/references.py
+"""
+Parse typed references ("John 3:16-18", "1 Cor 13:4-7, 13", "Gen 1:1-2:3", "Ps 23; Rom 8:28",
+"John 3.16 KJV") into verse spans, so lookups can skip full-text search entirely, and find the
+references mentioned in free text.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from api.models.user import BibleTranslation
+from api.scripture.books import BY_CODE, book_code, is_word_alias
+
+# verse number standing in for "to the end of the chapter" (no chapter has more than 176)
+LAST_VERSE = 255
+
+# books with one chapter, where "Jude 3" means verse 3
+SINGLE_CHAPTER = {"OBA", "PHM", "2JN", "3JN", "JUD"}
+
+_GROUP = re.compile(
+    r"^\s*(?P<book>(?:[1-3]|i{1,3}|1st|2nd|3rd|first|second|third)?\s*[a-z][a-z .]*?)?\s*(?P<rest>\d.*)$", re.I
+)
+_ITEM = re.compile(r"^(\d{1,3})(?::(\d{1,3}))?(?:-(\d{1,3})(?::(\d{1,3}))?)?$")
+# "John 3.16" is the same as "John 3:16"
+_DOT_SEPARATOR = re.compile(r"(?<=\d)\.(?=\d)")
+# a trailing translation tag is allowed but does not pick the translation: "John 3:16 KJV", "Ps 23 (ESV)"
+_TRANSLATION_TAG = re.compile(
+    r"[\s,]*\(?\s*\b(?:%s)\s*\)?\s*$"
+    % "|".join(t.value for t in BibleTranslation if t is not BibleTranslation.DEFAULT),
+    re.I,
+)
+# "John 3:16", "1 Cor 13:4-7", "Psalm 23", "Song of Songs 2:4" mentioned anywhere in free text
+_MENTION = re.compile(
+    r"\b(?:[1-3]\s*|i{1,3}\s+|first\s+|second\s+|third\s+)?(?P<name>[a-z][a-z]+\.?(?:\s+of\s+[a-z]+)?)"
+    r"\s+\d{1,3}(?P<verse>[:.]\d{1,3}(?:\s*[-–]\s*\d{1,3}(?:[:.]\d{1,3})?)?)?\b",
+    re.I,
+)
+
+
+class Span(NamedTuple):
+    book: str
+    chapter: int
+    verse: int
+    end_chapter: int
+    end_verse: int
+
+
+def _parse_group(rest: str, book: str) -> Optional[List[Span]]:
+    spans: List[Span] = []
+    chapter: Optional[int] = None  # set once an item names a verse; later bare numbers are verses in it
+    if book in SINGLE_CHAPTER:
+        chapter = 1
+    for item in rest.replace(" ", "").split(","):
+        m = _ITEM.match(item)
+        if not m:
+            return None
+        a = int(m.group(1))
+        b, c, d = (int(x) if x else None for x in m.groups()[1:])
+        if b is not None:  # a:b, a:b-c, a:b-c:d
+            chapter = a
+            if c is not None and d is not None:
+                span = Span(book, a, b, c, d)
+            else:
+                span = Span(book, a, b, a, c if c is not None else b)
+        elif chapter is not None:  # verses in the current chapter: v, v-w
+            span = Span(book, chapter, a, chapter, c if c is not None else a)
+        elif c is not None and d is not None:  # a-c:d
+            span = Span(book, a, 1, c, d)
+            chapter = c
+        else:  # whole chapters: a, a-c
+            span = Span(book, a, 1, c if c is not None else a, LAST_VERSE)
+        if (span.chapter, span.verse) > (span.end_chapter, span.end_verse) or 0 in span:
+            return None
+        spans.append(span)
+    return spans
+
+
+def parse_references(text: str) -> Optional[List[Span]]:
+    """
+    Spans for a string that is entirely scripture references, else None (so "love your
+    enemies" or "Genesis" alone stay full-text queries). A group without a book name
+    continues the previous book: "John 3:16; 4:1".
+    """
+    text = text.replace("–", "-").replace("—", "-")
+    text = _DOT_SEPARATOR.sub(":", _TRANSLATION_TAG.sub("", text))
+    spans: List[Span] = []
+    book = None
+    for group in text.split(";"):
+        m = _GROUP.match(group)
+        if not m:
+            return None
+        if m.group("book") and m.group("book").strip():
+            book = book_code(m.group("book"))
+        if not book:
+            return None
+        parsed = _parse_group(m.group("rest").strip(), book)
+        if not parsed:
+            return None
+        spans.extend(parsed)
+    return spans or None
+
+
+def _plausible(m: re.Match) -> bool:
+    # "the job 3 times" and "it is 5 miles" are not references: outside a chapter:verse pair
+    # the book has to be capitalized, and abbreviations that are everyday words need the verse
+    if m.group("verse"):
+        return True
+    return m.group("name")[0].isupper() and not is_word_alias(m.group("name"))
+
+
+def find_references(text: str) -> List[Tuple[int, int, List[Span]]]:
+    """(start, end, spans) for every reference written in free text, in order of appearance."""
+    found: List[Tuple[int, int, List[Span]]] = []
+    pos = 0
+    while True:
+        m = _MENTION.search(text or "", pos)
+        if not m:
+            return found
+        spans = parse_references(m.group(0)) if _plausible(m) else None
+        if spans:
+            found.append((m.start(), m.end(), spans))
+            pos = m.end()
+        else:
+            # "about 1 Cor 13:4" first matches "about 1"; retry from the next word
+            pos = m.start() + 1
+
+
+def in_span(verse: dict, span: Span) -> bool:
+    return verse["book"] == span.book and (span.chapter, span.verse) <= (verse["chapter"], verse["verse"]) <= (
+        span.end_chapter,
+        span.end_verse,
+    )
+
+
+def format_span(span: Span) -> str:
+    """Display form: "John 3:16", "John 3:16-18", "Genesis 1:1-2:3", "Psalms 23"."""
+    name = BY_CODE[span.book].name
+    if span.verse == 1 and span.end_verse == LAST_VERSE:
+        chapters = f"{span.chapter}" if span.chapter == span.end_chapter else f"{span.chapter}-{span.end_chapter}"
+        return f"{name} {chapters}"
+    start = f"{name} {span.chapter}:{span.verse}"
+    if (span.chapter, span.verse) == (span.end_chapter, span.end_verse):
+        return start
+    if span.chapter == span.end_chapter:
+        return f"{start}-{span.end_verse}"
+    return f"{start}-{span.end_chapter}:{span.end_verse}"
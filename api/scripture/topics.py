@@ -0,0 +1,209 @@
+# api/scripture/topics.py
+"""
+Curated pastoral topics and their precomputed passage lists.
+
+elastic/build_topic_index.py ranks passages for every topic offline (curated anchors first,
+then verses the corpus agrees on across the topic's queries) and writes a compact table of
+packed verse spans. The table is loaded at startup and resolved through the verse store in
+the reader's translation, so topic lookups (the endpoint, and the crew's prefetched
+context for pastoral/assurance turns) cost no search round trip. Without a built table the
+curated anchors alone are served.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+from api.scripture.analysis import analyze
+from api.scripture.references import Span, parse_references
+from api.scripture.verse_store import DATA_DIR, unpack
+
+logger = logging.getLogger("topics")
+
+TOPIC_TABLE_PATH = os.getenv("TOPIC_TABLE_PATH", os.path.join(DATA_DIR, "topic_passages.json"))
+
+
+class Topic(NamedTuple):
+    label: str
+    keywords: tuple  # words/phrases in a prompt that select this topic
+    queries: tuple  # corpus searches the offline ranking fuses
+    anchors: tuple  # curated passages, always ranked first
+
+
+TOPICS: Dict[str, Topic] = {
+    "anxiety": Topic(
+        "Anxiety and worry",
+        ("anxious", "anxiety", "worry", "worried", "stress", "stressed", "overwhelmed", "panic", "nervous"),
+        (
+            "be anxious for nothing",
+            "cast your care upon him",
+            "peace of god which passes understanding",
+            "take no thought for tomorrow",
+        ),
+        ("Philippians 4:6-7", "1 Peter 5:7", "Matthew 6:25-34", "Psalm 94:19", "Isaiah 41:10", "Psalm 55:22"),
+    ),
+    "grief": Topic(
+        "Grief and loss",
+        ("grief", "grieving", "grieve", "mourning", "mourn", "loss", "died", "death", "funeral", "bereaved"),
+        (
+            "the lord is near the brokenhearted",
+            "blessed are they that mourn",
+            "wipe away all tears",
+            "sorrow not as others which have no hope",
+        ),
+        ("Psalm 34:18", "Matthew 5:4", "John 11:25-26", "1 Thessalonians 4:13-14", "Revelation 21:4", "Psalm 147:3"),
+    ),
+    "assurance": Topic(
+        "Assurance of salvation",
+        ("saved", "salvation", "assurance", "heaven", "eternal life", "born again", "lose my salvation"),
+        (
+            "eternal life",
+            "no condemnation to them which are in christ",
+            "no man shall pluck them out of my hand",
+            "saved through faith",
+        ),
+        ("John 10:27-29", "Romans 8:1", "Romans 8:38-39", "1 John 5:11-13", "Ephesians 2:8-9", "John 5:24"),
+    ),
+    "forgiveness": Topic(
+        "Forgiveness",
+        ("forgive", "forgiveness", "forgiven", "confess", "grudge", "resent"),
+        (
+            "if we confess our sins he is faithful to forgive",
+            "forgiving one another",
+            "as far as the east is from the west",
+        ),
+        ("1 John 1:9", "Psalm 103:10-12", "Ephesians 4:32", "Colossians 3:13", "Matthew 6:14-15", "Isaiah 1:18"),
+    ),
+    "fear": Topic(
+        "Fear",
+        ("afraid", "fear", "scared", "terrified", "frightened"),
+        ("fear not for i am with thee", "be strong and of a good courage", "god hath not given us the spirit of fear"),
+        ("Isaiah 41:10", "Joshua 1:9", "Psalm 23:4", "2 Timothy 1:7", "Psalm 27:1", "Psalm 56:3-4"),
+    ),
+    "loneliness": Topic(
+        "Loneliness",
+        ("lonely", "loneliness", "alone", "isolated", "abandoned", "rejected"),
+        ("i will never leave thee nor forsake thee", "god setteth the solitary in families", "i am with you always"),
+        ("Deuteronomy 31:6", "Hebrews 13:5", "Psalm 68:6", "Matthew 28:20", "Psalm 27:10", "Psalm 25:16"),
+    ),
+    "despair": Topic(
+        "Depression and despair",
+        ("depressed", "depression", "hopeless", "despair", "empty", "numb", "exhausted"),
+        (
+            "why art thou cast down o my soul",
+            "he giveth power to the faint",
+            "his compassions fail not",
+            "come unto me all ye that labour",
+        ),
+        ("Psalm 42:11", "Isaiah 40:29-31", "Lamentations 3:21-23", "2 Corinthians 4:8-9", "Matthew 11:28-30"),
+    ),
+    "temptation": Topic(
+        "Temptation",
+        ("tempted", "temptation", "addiction", "addicted", "lust", "pornography", "relapse"),
+        (
+            "god will not suffer you to be tempted above that ye are able",
+            "blessed is the man that endureth temptation",
+            "walk in the spirit",
+        ),
+        ("1 Corinthians 10:13", "James 1:12-15", "Hebrews 4:15-16", "Matthew 26:41", "Galatians 5:16"),
+    ),
+    "anger": Topic(
+        "Anger",
+        ("angry", "anger", "rage", "furious", "bitter", "bitterness", "temper"),
+        ("be ye angry and sin not", "slow to wrath", "a soft answer turneth away wrath"),
+        ("Ephesians 4:26-27", "James 1:19-20", "Proverbs 15:1", "Proverbs 29:11", "Colossians 3:8"),
+    ),
+    "doubt": Topic(
+        "Doubt",
+        ("doubt", "doubts", "doubting", "unbelief"),
+        ("help thou mine unbelief", "have mercy on those who doubt", "be not faithless but believing"),
+        ("Mark 9:24", "Jude 22", "John 20:27-29", "Hebrews 11:1", "Psalm 73:25-26", "James 1:5-6"),
+    ),
+    "guilt": Topic(
+        "Guilt and shame",
+        ("guilt", "guilty", "shame", "ashamed", "regret", "unworthy"),
+        (
+            "no condemnation",
+            "blessed is he whose transgression is forgiven",
+            "a new creature old things are passed away",
+        ),
+        ("Romans 8:1", "Psalm 32:1-5", "2 Corinthians 5:17", "Isaiah 43:25", "Hebrews 10:22", "1 John 3:20"),
+    ),
+    "suffering": Topic(
+        "Suffering and illness",
+        ("suffering", "suffer", "pain", "sick", "illness", "cancer", "diagnosis", "trial"),
+        (
+            "the sufferings of this present time",
+            "all things work together for good",
+            "count it all joy",
+            "god is our refuge and strength",
+        ),
+        ("Romans 8:18", "Romans 8:28", "2 Corinthians 4:16-18", "James 1:2-4", "1 Peter 5:10", "Psalm 46:1"),
+    ),
+    "guidance": Topic(
+        "Guidance and decisions",
+        ("decision", "decide", "guidance", "direction", "calling", "will of god"),
+        ("trust in the lord with all thine heart", "i will instruct thee and teach thee", "thy word is a lamp"),
+        ("Proverbs 3:5-6", "Psalm 32:8", "James 1:5", "Psalm 119:105", "Isaiah 30:21", "Romans 12:2"),
+    ),
+}
+
+# topic served to these intents when the prompt names none
+INTENT_DEFAULT_TOPICS = {"assurance": "assurance", "doubt_lament": "doubt"}
+
+
+def anchor_spans(topic: Topic) -> List[Span]:
+    return [span for ref in topic.anchors for span in parse_references(ref) or []]
+
+
+class TopicIndex:
+    def __init__(self, path: str = TOPIC_TABLE_PATH):
+        self.path = path
+        self._spans: Dict[str, List[Span]] = {}
+        self.source = "anchors"
+        # analyzed keyword phrases -> topic, for matching prompts
+        self._keywords = [(tuple(analyze(k)), slug) for slug, t in TOPICS.items() for k in t.keywords]
+        self.hits = 0
+
+    def load(self) -> None:
+        """Read the precomputed table; topics it lacks (or all, without a table) use their anchors."""
+        table: Dict[str, list] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                table = json.load(f).get("topics", {})
+            self.source = self.path
+        else:
+            logger.warning("topics: %s not found, serving curated anchors only", self.path)
+        for slug, topic in TOPICS.items():
+            if slug in table:
+                self._spans[slug] = [Span(*unpack(start), *unpack(end)[1:]) for start, end in table[slug]]
+            else:
+                self._spans[slug] = anchor_spans(topic)
+        logger.info("topics: %s topics loaded from %s", len(self._spans), self.source)
+
+    def spans(self, slug: str) -> Optional[List[Span]]:
+        spans = self._spans.get(slug)
+        if spans is None and slug in TOPICS:
+            # not loaded yet (scripts, tests): anchors are always available
+            spans = self._spans[slug] = anchor_spans(TOPICS[slug])
+        return spans
+
+    def match(self, text: str, intent: Optional[str] = None) -> Optional[str]:
+        """The topic whose keywords occur most in `text`, else the intent's default topic, else None."""
+        terms = analyze(text or "")
+        counts: Dict[str, int] = {}
+        for phrase, slug in self._keywords:
+            n = len(phrase)
+            if n and any(tuple(terms[i : i + n]) == phrase for i in range(len(terms) - n + 1)):
+                counts[slug] = counts.get(slug, 0) + 1
+        if counts:
+            self.hits += 1
+            return max(counts, key=counts.__getitem__)
+        return INTENT_DEFAULT_TOPICS.get(intent or "")
+
+    def stats(self) -> dict:
+        return {"source": self.source, "topics": len(self._spans), "prompt_matches": self.hits}
+
+
+topic_index = TopicIndex()
@@ -0,0 +1,152 @@
+# api/scripture/verse_store.py
+"""
+In-memory verse table built from the seed JSONL files, for reference lookups that never
+touch Elasticsearch.
+
+Per translation, verses are addressed by a packed key (book ordinal << 16 | chapter << 8 | verse)
+held in a sorted array('I'); the same position indexes an offsets array into one concatenated
+text string. A reference or range is two bisects and a slice, and the whole corpus costs a few
+MB per translation instead of a dict per verse.
+"""
+
+import json
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional
+
+from api.scripture.books import BOOKS, ORDINAL
+from api.scripture.references import Span
+
+logger = logging.getLogger("verse_store")
+
+DATA_DIR = os.getenv("DATA_DIR", "/app/seed_data")
+SEED_FILES = ["load_kjv_data.jsonl", "load_web_data.jsonl", "load_bbe_data.jsonl"]
+# used when the caller has no translation preference ("DEFAULT"), or one the corpus lacks
+DEFAULT_TRANSLATION = os.getenv("SCRIPTURE_DEFAULT_TRANSLATION", "KJV")
+# translations in the seed files, and so in the index; the other preferences (NIV, ESV, ...) aren't
+CORPUS_TRANSLATIONS = ("KJV", "WEB", "BBE")
+
+
+def served_translation(translation: Optional[str]) -> Optional[str]:
+    """The translation passages are served in for a preference: the reader's when the corpus has it, else the default."""
+    if translation in (None, "DEFAULT") or translation in CORPUS_TRANSLATIONS:
+        return translation
+    return DEFAULT_TRANSLATION
+
+
+def pack(book: str, chapter: int, verse: int) -> int:
+    return ORDINAL[book] << 16 | chapter << 8 | verse
+
+
+def unpack(key: int) -> tuple:
+    return BOOKS[key >> 16].code, key >> 8 & 0xFF, key & 0xFF
+
+
+class _Table:
+    """One translation: parallel sorted keys / text offsets plus the concatenated text."""
+
+    def __init__(self, rows: List[tuple]):
+        rows.sort()
+        self.keys = array("I", (key for key, _ in rows))
+        self.offsets = array("I", [0])
+        parts = []
+        for _, text in rows:
+            parts.append(text)
+            self.offsets.append(self.offsets[-1] + len(text))
+        self.text = "".join(parts)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def range(self, lo: int, hi: int) -> range:
+        return range(bisect_left(self.keys, lo), bisect_right(self.keys, hi))
+
+    def verse_text(self, i: int) -> str:
+        return self.text[self.offsets[i] : self.offsets[i + 1]]
+
+
+class VerseStore:
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        files: Iterable[str] = SEED_FILES,
+        default_translation: str = DEFAULT_TRANSLATION,
+    ):
+        self.data_dir = data_dir
+        self.files = list(files)
+        self.default_translation = default_translation
+        self._tables: Dict[str, _Table] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> None:
+        """Read the seed files (blocking; run off the event loop). Missing files are skipped."""
+        started = time.perf_counter()
+        rows: Dict[str, List[tuple]] = {}
+        for name in self.files:
+            path = os.path.join(self.data_dir, name)
+            if not os.path.exists(path):
+                logger.warning("verse store: %s not found, skipping", path)
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    doc = json.loads(line)
+                    if doc.get("book") not in ORDINAL:
+                        continue
+                    key = pack(doc["book"], int(doc["chapter"]), int(doc["verse"]))
+                    rows.setdefault(doc["translation"], []).append((key, doc["text"]))
+        self._tables = {t: _Table(r) for t, r in rows.items()}
+        logger.info(
+            "verse store: %s verses in %s translations loaded in %.2fs",
+            sum(len(t) for t in self._tables.values()),
+            len(self._tables),
+            time.perf_counter() - started,
+        )
+
+    def resolve(self, translation: Optional[str]) -> Optional[str]:
+        """The loaded translation to serve for a request, or None if it is not in memory."""
+        if translation in (None, "DEFAULT"):
+            translation = self.default_translation
+        return translation if translation in self._tables else None
+
+    def passage(self, translation: str, spans: List[Span], limit: int) -> List[dict]:
+        """Verses covered by `spans`, in the order given, shaped like the index `_source`."""
+        table = self._tables[translation]
+        verses: List[dict] = []
+        for span in spans:
+            found = table.range(
+                pack(span.book, span.chapter, span.verse), pack(span.book, span.end_chapter, span.end_verse)
+            )
+            for i in found[: limit - len(verses)]:
+                book, chapter, verse = unpack(table.keys[i])
+                verses.append(
+                    {
+                        "book": book,
+                        "chapter": chapter,
+                        "verse": verse,
+                        "reference": f"{book} {chapter}:{verse}",
+                        "text": table.verse_text(i),
+                        "translation": translation,
+                    }
+                )
+        if verses:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return verses
+
+    def stats(self) -> dict:
+        return {
+            "translations": {t: len(table) for t, table in self._tables.items()},
+            "text_chars": sum(len(t.text) for t in self._tables.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+verse_store = VerseStore()
@@ -1,6 +1,99 @@
 # crew/discern_crew.py
-from crewai import Agent, Task, Crew, Process
-from crewai.project import CrewBase, agent, task, crew
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+import yaml
+from crewai import Agent, Crew, Process, Task
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from crewai.project import CrewBase, agent, task
+
+from crew.tools.scripture_search_tool import ScriptureSearchTool, cite, gather_scripture
+
+logger = logging.getLogger("crew")
+
+# crewai's step-by-step console output; on by default only in development
+CREW_VERBOSE = os.getenv("CREW_VERBOSE", str(os.getenv("APP_ENV", "development") == "development")).lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# router intent -> compose task (doubt/lament is answered pastorally)
+INTENT_COMPOSE_TASKS = {
+    "teaching": "compose_teaching_answer",
+    "pastoral": "compose_pastoral_answer",
+    "assurance": "compose_assurance_answer",
+    "doubt_lament": "compose_pastoral_answer",
+}
+DEFAULT_INTENT = "teaching"
+
+# passages handed to the compose step
+SCRIPTURE_PASSAGES = int(os.getenv("SCRIPTURE_PASSAGES", "6"))
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+# on_event(event, data) — progress hook used by streaming callers
+EventHook = Callable[[str, Dict[str, Any]], None]
+
+
+class RunCancelled(Exception):
+    """Raised inside a run once its cancel event is set (e.g. the caller timed out)."""
+
+
+# final_edit task id -> token callback, for runs that asked for streaming
+_token_listeners: Dict[str, Callable[[str], None]] = {}
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _dispatch_stream_chunk(source, event):
+    # chunk events are emitted synchronously, in order, on the calling thread
+    listener = _token_listeners.get(event.task_id or "")
+    if listener and event.chunk and not event.tool_call:
+        listener(event.chunk)
+
+
+@dataclass
+class CrewRun:
+    """Result of one two-phase crew execution."""
+
+    raw: str
+    intent: str
+    decision: Dict[str, Any] = field(default_factory=dict)
+    # seconds per phase: route, answer, total
+    timings: Dict[str, float] = field(default_factory=dict)
+    # served from api/cache/response_cache.py; timings are those of the original run
+    cached: bool = False
+
+
+def parse_router_decision(raw: str) -> Dict[str, Any]:
+    """
+    Parse the router's JSON decision; tolerate code fences and chatter around it.
+    Falls back to a teaching decision if nothing usable comes back.
+    """
+    decision: Dict[str, Any] = {}
+    match = _JSON_OBJECT.search(raw or "")
+    if match:
+        try:
+            parsed = json.loads(match.group(0))
+            if isinstance(parsed, dict):
+                decision = parsed
+        except ValueError:
+            logger.warning("router returned invalid JSON: %s", (raw or "")[:200])
+
+    intent = str(decision.get("primary_intent") or "").strip().lower()
+    if intent not in INTENT_COMPOSE_TASKS:
+        intent = DEFAULT_INTENT
+    decision["primary_intent"] = intent
+    return decision
+
 
 @CrewBase
 class DiscernCrew:
@@ -8,38 +101,36 @@ class DiscernCrew:
     tasks_config = "config/tasks.yaml"
 
     def __init__(self, user_prompt=None, context=None):
-        super().__init__()
         self.user_prompt = user_prompt
         self.context = context or {}
 
     # ---- Agents ----
     @agent
     def intent_router(self) -> Agent:
-        return Agent(config=self.agents_config["intent_router"], verbose=True)
-
-    @agent
-    def scripture_retriever(self) -> Agent:
-        return Agent(config=self.agents_config["scripture_retriever"], verbose=True)
+        return Agent(config=self.agents_config["intent_router"], verbose=CREW_VERBOSE)
 
     @agent
     def doctrine_teacher(self) -> Agent:
-        return Agent(config=self.agents_config["doctrine_teacher"], verbose=True)
+        return Agent(config=self.agents_config["doctrine_teacher"], verbose=CREW_VERBOSE)
 
     @agent
     def pastoral_counselor(self) -> Agent:
-        return Agent(config=self.agents_config["pastoral_counselor"], verbose=True)
+        return Agent(config=self.agents_config["pastoral_counselor"], verbose=CREW_VERBOSE)
 
     @agent
     def assurance_shepherd(self) -> Agent:
-        return Agent(config=self.agents_config["assurance_shepherd"], verbose=True)
+        return Agent(config=self.agents_config["assurance_shepherd"], verbose=CREW_VERBOSE)
 
     @agent
     def berean_validator(self) -> Agent:
-        return Agent(config=self.agents_config["berean_validator"], verbose=True)
+        return Agent(config=self.agents_config["berean_validator"], verbose=CREW_VERBOSE)
 
     @agent
     def final_editor(self) -> Agent:
-        return Agent(config=self.agents_config["final_editor"], verbose=True)
+        editor = Agent(config=self.agents_config["final_editor"], verbose=CREW_VERBOSE)
+        # stream so callers can forward tokens; non-streaming runs just get the joined text
+        editor.llm.stream = True
+        return editor
 
     # ---- Tasks ----
     @task
@@ -49,26 +140,20 @@ class DiscernCrew:
         return t
 
     @task
-    def gather_scripture_task(self) -> Task:
-        t = Task(config=self.tasks_config["gather_scripture_task"])
-        t.agent = self.scripture_retriever()
-        return t
-
-    @task
-    def teach_answer_task(self) -> Task:
-        t = Task(config=self.tasks_config["teach_answer_task"])
+    def compose_teaching_answer(self) -> Task:
+        t = Task(config=self.tasks_config["compose_teaching_answer"])
         t.agent = self.doctrine_teacher()
         return t
 
     @task
-    def pastoral_answer_task(self) -> Task:
-        t = Task(config=self.tasks_config["pastoral_answer_task"])
+    def compose_pastoral_answer(self) -> Task:
+        t = Task(config=self.tasks_config["compose_pastoral_answer"])
         t.agent = self.pastoral_counselor()
         return t
 
     @task
-    def assurance_answer_task(self) -> Task:
-        t = Task(config=self.tasks_config["assurance_answer_task"])
+    def compose_assurance_answer(self) -> Task:
+        t = Task(config=self.tasks_config["compose_assurance_answer"])
         t.agent = self.assurance_shepherd()
         return t
 
@@ -84,30 +169,124 @@ class DiscernCrew:
         t.agent = self.final_editor()
         return t
 
-    # ---- Crew ----
-    @crew
-    def crew(self) -> Crew:
+    # ---- Crews ----
+    def router_crew(self) -> Crew:
+        # phase 1: a single cheap classification call
+        return Crew(
+            agents=[self.intent_router()],
+            tasks=[self.route_intent_task()],
+            process=Process.sequential,
+            verbose=CREW_VERBOSE,
+        )
+
+    def answer_crew(self, intent: str, task_callback=None) -> Crew:
+        # phase 2: only the answer task that matches the routed intent; scripture is
+        # retrieved before kickoff and arrives as the {scripture} input
+        compose_task = getattr(self, INTENT_COMPOSE_TASKS.get(intent, INTENT_COMPOSE_TASKS[DEFAULT_INTENT]))()
+        tasks = [compose_task, self.berean_validate_task(), self.final_edit_task()]
+        for t in tasks:
+            # @task objects are memoized per instance and crewai only fills an empty
+            # task.callback, so a pooled crew would keep calling an earlier run's callback
+            t.callback = None
         return Crew(
             agents=[
-                self.intent_router(),
-                self.scripture_retriever(),
-                self.doctrine_teacher(),
-                self.pastoral_counselor(),
-                self.assurance_shepherd(),
+                compose_task.agent,
                 self.berean_validator(),
                 self.final_editor(),
             ],
-            tasks=[
-                self.route_intent_task(),
-                self.gather_scripture_task(),
-                # One of teach/pastoral/assurance will be used by your handler based on router output,
-                # or leave all here if you’re chaining regardless:
-                self.teach_answer_task(),
-                self.pastoral_answer_task(),
-                self.assurance_answer_task(),
-                self.berean_validate_task(),
-                self.final_edit_task(),
-            ],
+            tasks=tasks,
             process=Process.sequential,
-            verbose=True
+            task_callback=task_callback,
+            verbose=CREW_VERBOSE,
         )
+
+    # ---- Execution ----
+    def run(
+        self,
+        inputs: Dict[str, str],
+        on_event: Optional[EventHook] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> CrewRun:
+        """
+        Route first, then run only the matching answer pipeline.
+        `inputs` fills the task placeholders (prompt, conversation, user_profile, memories, desired_length);
+        `translation` picks the Bible translation passages are retrieved in.
+        With `on_event`, stage events and the final editor's tokens are reported as they happen.
+        `cancel` is checked between tasks; once set the run stops with RunCancelled.
+        """
+        emit = on_event or (lambda event, data: None)
+        started = time.perf_counter()
+
+        def _checkpoint():
+            # an LLM call can't be interrupted mid-flight, so stop at the next task boundary
+            if cancel is not None and cancel.is_set():
+                raise RunCancelled()
+
+        routed = self.router_crew().kickoff(inputs=inputs)
+        _checkpoint()
+        decision = parse_router_decision(routed.raw)
+        intent = decision["primary_intent"]
+        routed_at = time.perf_counter()
+        emit("stage", {"stage": "routed", "intent": intent})
+
+        # retrieval + rerank replaces an LLM recalling references from memory
+        tool = ScriptureSearchTool(translation=inputs.get("translation"))
+        passages, topic = gather_scripture(tool, inputs.get("prompt", ""), decision, limit=SCRIPTURE_PASSAGES)
+        scripture = "\n".join(f"- {cite(v)}" for v in passages) or "(no passages found)"
+        retrieved_at = time.perf_counter()
+        emit("stage", {"stage": "scripture_gathered", "passages": scripture, "topic": topic})
+        _checkpoint()
+
+        answer_inputs = {
+            **inputs,
+            "scripture": scripture,
+            "router_summary": json.dumps(decision, ensure_ascii=False),
+            # router length wins over the profile default when it has an opinion
+            "desired_length": decision.get("length") or inputs.get("desired_length", "standard"),
+        }
+        # stage events follow task completion order in the answer crew
+        completed = []
+
+        def _task_done(output):
+            completed.append(output)
+            _checkpoint()
+            if len(completed) == 1:
+                emit("stage", {"stage": "validating"})
+            elif len(completed) == 2:
+                emit("stage", {"stage": "editing"})
+
+        final_task_id = str(self.final_edit_task().id)
+        if on_event:
+            _token_listeners[final_task_id] = lambda chunk: emit("token", {"text": chunk})
+        emit("stage", {"stage": "drafting"})
+        answering_at = time.perf_counter()
+        try:
+            answered = self.answer_crew(intent, task_callback=_task_done).kickoff(inputs=answer_inputs)
+        finally:
+            _token_listeners.pop(final_task_id, None)
+        finished = time.perf_counter()
+
+        timings = {
+            "route": round(routed_at - started, 3),
+            "retrieve": round(retrieved_at - routed_at, 3),
+            "answer": round(finished - answering_at, 3),
+            "total": round(finished - started, 3),
+        }
+        logger.info("crew run intent=%s timings=%s", intent, timings)
+        return CrewRun(raw=answered.raw, intent=intent, decision=decision, timings=timings)
+
+
+@lru_cache(maxsize=None)
+def _parse_yaml(config_path: str) -> Dict[str, Any]:
+    with open(config_path, encoding="utf-8") as f:
+        content = yaml.safe_load(f)
+    return content if isinstance(content, dict) else {}
+
+
+def _load_yaml_once(config_path) -> Dict[str, Any]:
+    # crewai resolves agent/task names inside the loaded dicts, so every instance gets its own copy
+    return copy.deepcopy(_parse_yaml(str(config_path)))
+
+
+# parse config/*.yaml once per process instead of once per DiscernCrew instance
+DiscernCrew.load_yaml = staticmethod(_load_yaml_once)
@@ -0,0 +1,194 @@
+# crew/tools/scripture_search_tool.py
+"""
+Verse retrieval for the crew: real passages from the verse index instead of references
+recalled by the LLM.
+
+Lookups run synchronously on the crew's worker thread. Typed references are answered
+from the in-memory verse store, and pastoral topics from the precomputed topic table
+(api/scripture/topics.py); everything else goes to the configured search backend,
+with all of a call's queries in a single `_msearch`. Each tool instance belongs to one
+request and caches what it has already fetched.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple, Type
+
+import httpx
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+
+from api.db.elastic import ELASTIC_HOST, ELASTIC_INDEX
+from api.scripture.local_search import SCRIPTURE_BACKEND, local_search
+from api.scripture.query import msearch_body, msearch_results, passage_query, verse_query
+from api.scripture.references import Span, find_references, in_span, parse_references
+from api.scripture.topics import topic_index
+from api.scripture.verse_store import served_translation, verse_store
+
+logger = logging.getLogger("scripture_tool")
+
+# reciprocal rank fusion constant: damps the advantage of rank 1 over rank 2 within one list
+RRF_K = 60
+# intents answered from the precomputed topic passages when the prompt matches a topic
+PREFETCH_INTENTS = {"pastoral", "assurance", "doubt_lament"}
+# verses taken from each topic passage, so one long range doesn't crowd out the rest
+VERSES_PER_TOPIC_PASSAGE = 2
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _http() -> httpx.Client:
+    # one pooled sync client shared by all crew worker threads
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(base_url=ELASTIC_HOST, timeout=httpx.Timeout(5.0, connect=2.0))
+        return _client
+
+
+def _msearch(searches: List[dict]) -> List[List[dict]]:
+    body = msearch_body(ELASTIC_INDEX, searches)
+    try:
+        r = _http().post("/_msearch", content=body, headers={"Content-Type": "application/x-ndjson"})
+        r.raise_for_status()
+    except httpx.HTTPError as e:
+        # retrieval is best effort: the answer is still written, just without fetched passages
+        logger.warning("scripture msearch failed: %s", e)
+        return [[] for _ in searches]
+    results = []
+    for result in msearch_results(r.json(), len(searches)):
+        if isinstance(result, str):
+            logger.warning("scripture msearch item failed: %s", result[:200])
+            result = []
+        results.append(result)
+    return results
+
+
+def mentioned_references(text: str) -> List[str]:
+    """References written in free text ("what does Rom 8:28 mean?" -> ["Rom 8:28"])."""
+    return [text[start:end] for start, end, _ in find_references(text)]
+
+
+def lookup_passages(references: List[List[Span]], translation: Optional[str], limit: int) -> List[List[dict]]:
+    """Verses for each reference in reading order: from memory, else one `_msearch` for all of them."""
+    loaded = verse_store.resolve(translation)
+    if loaded:
+        return [verse_store.passage(loaded, spans, limit=limit) for spans in references]
+    if not references or SCRIPTURE_BACKEND == "local":
+        # the local backend has exactly the translations in the seed files
+        return [[] for _ in references]
+    hits = _msearch(
+        [
+            {"query": passage_query(spans, translation), "sort": [{"chapter": "asc"}, {"verse": "asc"}], "size": limit}
+            for spans in references
+        ]
+    )
+    return [[v for s in spans for v in found if in_span(v, s)][:limit] for spans, found in zip(references, hits)]
+
+
+def cite(verse: dict) -> str:
+    return f"{verse['reference']} ({verse['translation']}): {verse['text']}"
+
+
+class ScriptureSearchInput(BaseModel):
+    queries: List[str] = Field(..., description='Topics or references, e.g. ["anxiety", "Philippians 4:6-7"]')
+    size: int = Field(3, ge=1, le=10, description="Verses per query")
+
+
+class ScriptureSearchTool(BaseTool):
+    name: str = "scripture_search"
+    description: str = (
+        "Look up Bible verses. Pass several topics and/or references at once; "
+        "returns matching verses with their references in the user's translation."
+    )
+    args_schema: Type[BaseModel] = ScriptureSearchInput
+    # the requesting user's preference; None/"DEFAULT" searches every translation
+    translation: Optional[str] = None
+
+    _cache: Dict[tuple, List[dict]] = PrivateAttr(default_factory=dict)
+
+    @field_validator("translation")
+    @classmethod
+    def _in_corpus(cls, value: Optional[str]) -> Optional[str]:
+        # preferences the corpus lacks (NIV, ESV, ...) search the default translation instead of finding nothing
+        return served_translation(value)
+
+    def search(self, queries: List[str], size: int = 3) -> List[List[dict]]:
+        """Verses per query, in query order; one round trip for all uncached full-text queries."""
+        pending = []
+        loaded = verse_store.resolve(self.translation)
+        for q in dict.fromkeys(queries):
+            key = (q.strip().lower(), size)
+            if key in self._cache:
+                continue
+            spans = parse_references(q)
+            if spans and loaded:
+                self._cache[key] = verse_store.passage(loaded, spans, limit=size)
+            elif SCRIPTURE_BACKEND == "local":
+                self._cache[key] = local_search.search(q, self.translation, size)
+            else:
+                pending.append(q)
+        if pending:
+            searches = [{"query": verse_query(q, self.translation), "size": size} for q in pending]
+            for q, hits in zip(pending, _msearch(searches)):
+                self._cache[(q.strip().lower(), size)] = hits
+        return [self._cache.get((q.strip().lower(), size), []) for q in queries]
+
+    def _run(self, queries: List[str], size: int = 3) -> str:
+        lines = []
+        for q, verses in zip(queries, self.search(queries, size)):
+            lines.append(f"{q}:")
+            lines += [f"- {cite(v)}" for v in verses] or ["- (no matches)"]
+        return "\n".join(lines)
+
+
+def _key(verse: dict) -> str:
+    return f"{verse['translation']}:{verse['reference']}"
+
+
+def _prefetched(topic: str, translation: str, limit: int) -> List[dict]:
+    verses: List[dict] = []
+    for span in topic_index.spans(topic) or []:
+        if len(verses) >= limit:
+            break
+        verses += verse_store.passage(translation, [span], limit=min(VERSES_PER_TOPIC_PASSAGE, limit - len(verses)))
+    return verses
+
+
+def gather_scripture(
+    tool: ScriptureSearchTool, prompt: str, decision: dict, limit: int = 6
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retrieval + rerank in place of the LLM retriever step; returns (passages, topic used).
+
+    References the user typed always lead. Pastoral/assurance turns about a known topic then
+    take its precomputed passages straight from memory. Everything else searches the prompt
+    and the router's search phrases, fusing hits by reciprocal rank so a verse several
+    queries agree on beats one query's long tail.
+    """
+    explicit = mentioned_references(prompt)
+    intent = decision.get("primary_intent")
+    topic = topic_index.match(prompt, intent) if intent in PREFETCH_INTENTS else None
+    loaded = verse_store.resolve(tool.translation)
+    if topic and loaded:
+        pinned = [v for verses in tool.search(explicit, size=limit) for v in verses]
+        seen = {_key(v) for v in pinned}
+        rest = [v for v in _prefetched(topic, loaded, limit) if _key(v) not in seen]
+        return (pinned + rest)[: max(limit, len(pinned))], topic
+
+    phrases = [p for p in decision.get("search") or [] if isinstance(p, str) and p.strip()][:3]
+    topical = [prompt, *phrases]
+    results = tool.search(explicit + topical, size=limit)
+
+    ranked: Dict[str, dict] = {}
+    scores: Dict[str, float] = {}
+    for verses in results[len(explicit) :]:
+        for rank, verse in enumerate(verses):
+            ref = _key(verse)
+            ranked.setdefault(ref, verse)
+            scores[ref] = scores.get(ref, 0.0) + 1.0 / (RRF_K + rank + 1)
+    pinned = [v for verses in results[: len(explicit)] for v in verses]
+    pinned_refs = {_key(v) for v in pinned}
+    fused = [ranked[r] for r in sorted(scores, key=scores.__getitem__, reverse=True) if r not in pinned_refs]
+    return (pinned + fused)[: max(limit, len(pinned))], None
@@ -0,0 +1,118 @@
+"""
+Relevance and latency benchmark for verse search.
+
+Runs a fixed set of judged queries against an index (the alias by default) with either the
+pre-template query (`legacy`: plain multi_match over text^2,reference,book) or the current one
+from api/scripture/query.py (`tuned`), and reports MRR@10, recall@10 and latency percentiles.
+
+Compare before/after a reindex, e.g.:
+    python elastic/bench_search.py --index bible_verses_v1 --query legacy
+    python elastic/bench_search.py --query tuned
+
+`--backend local` runs the same judgments against the in-process BM25 engine
+(api/scripture/local_search.py, built from DATA_DIR) for an ES-vs-local comparison.
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+from bible_index import ALIAS, ES
+
+from api.scripture.local_search import LocalSearch
+from api.scripture.query import verse_query
+
+# (query, translation, acceptable references); a query scores if any of them comes back in the top 10
+JUDGMENTS = [
+    ("for god so loved the world", "KJV", ["JHN 3:16"]),
+    ("the lord is my shepherd", "KJV", ["PSA 23:1"]),
+    ("the lord is my shep", "KJV", ["PSA 23:1"]),
+    ("in the beginning god created", "KJV", ["GEN 1:1"]),
+    ("Genesis 1:1", "KJV", ["GEN 1:1"]),
+    ("Psalm 23", "KJV", [f"PSA 23:{v}" for v in range(1, 7)]),
+    ("love is patient", "WEB", ["1CO 13:4"]),
+    ("charity suffereth long", "KJV", ["1CO 13:4"]),
+    ("be still and know that i am god", "KJV", ["PSA 46:10"]),
+    ("i can do all things through christ", "KJV", ["PHP 4:13"]),
+    ("trust in the lord with all your heart", "KJV", ["PRO 3:5"]),
+    ("fear not for i am with you", "KJV", ["ISA 41:10"]),
+    ("all things work together for good", "KJV", ["ROM 8:28"]),
+    ("forgiving one another", "KJV", ["EPH 4:32", "COL 3:13"]),
+    ("peace i leave with you", "KJV", ["JHN 14:27"]),
+    ("casting all your care upon him", "KJV", ["1PE 5:7"]),
+    ("the wages of sin is death", "KJV", ["ROM 6:23"]),
+    ("love your enemies", "KJV", ["MAT 5:44", "LUK 6:27", "LUK 6:35"]),
+    ("faith is the substance of things hoped for", "KJV", ["HEB 11:1"]),
+    ("forgiveness", "WEB", ["EPH 1:7", "COL 1:14", "ACT 13:38", "ACT 26:18", "MRK 3:29"]),
+]
+
+
+def legacy_query(q, translation):
+    return {
+        "bool": {
+            "must": [{"multi_match": {"query": q, "fields": ["text^2", "reference", "book"]}}],
+            "filter": [{"term": {"translation": translation}}],
+        }
+    }
+
+
+QUERIES = {"legacy": legacy_query, "tuned": verse_query}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["elastic", "local"], default="elastic")
+    parser.add_argument("--index", default=ALIAS)
+    parser.add_argument("--query", choices=sorted(QUERIES), default="tuned")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query (first run is a warm-up)")
+    args = parser.parse_args()
+
+    if args.backend == "local":
+        engine = LocalSearch()
+        engine.load()
+        search = lambda q, translation: (engine.search(q, translation, 10), None)  # noqa: E731
+        label = f"local BM25 on {engine.path}"
+    else:
+        build = QUERIES[args.query]
+        session = requests.Session()
+
+        def search(q, translation):
+            body = {"query": build(q, translation), "size": 10, "_source": ["reference"]}
+            r = session.post(f"{ES}/{args.index}/_search", json=body, params={"request_cache": "false"})
+            r.raise_for_status()
+            return [h["_source"] for h in r.json()["hits"]["hits"]], r.json()["took"]
+
+        label = f"{args.query} query on {args.index}"
+
+    reciprocal_ranks, found, took, wall = [], 0, [], []
+    print(f"{label} ({len(JUDGMENTS)} queries x {args.repeat})")
+    for q, translation, expected in JUDGMENTS:
+        for run in range(args.repeat + 1):
+            start = time.perf_counter()
+            hits, took_ms = search(q, translation)
+            elapsed = (time.perf_counter() - start) * 1000
+            if run:
+                wall.append(elapsed)
+                if took_ms is not None:
+                    took.append(took_ms)
+        refs = [h.get("reference", "").upper() for h in hits]
+        rank = next((i + 1 for i, ref in enumerate(refs) if ref in expected), None)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        found += bool(rank)
+        print(f"  {'-' if rank is None else rank:>2}  {q!r} -> {refs[:3]}")
+
+    print(f"MRR@10     {statistics.mean(reciprocal_ranks):.3f}")
+    print(f"recall@10  {found}/{len(JUDGMENTS)}")
+    if took:
+        print(f"took ms    p50={percentile(took, 50)} p95={percentile(took, 95)}")
+    print(f"wall ms    p50={percentile(wall, 50):.2f} p95={percentile(wall, 95):.2f}")
+
+
+if __name__ == "__main__":
+    main()
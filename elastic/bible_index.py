@@ -0,0 +1,207 @@
+"""
+Versioned Bible indices behind the `bible_verses` alias.
+
+Each load goes into a fresh `bible_verses_v{N}` with deterministic ids, is validated,
+and only then replaces the previous version in one atomic `_aliases` call. The API
+searches the alias, so it never sees a half-built index. Old versions are garbage
+collected, keeping BIBLE_INDEX_KEEP previous ones around for rollback.
+"""
+
+import os
+import re
+import sys
+import time
+
+import requests
+
+# the book table and text synonyms are shared with the API (api/scripture/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.scripture.analysis import ARCHAIC_STOPWORDS, TEXT_SYNONYMS  # noqa: E402
+from api.scripture.books import synonym_rules  # noqa: E402
+
+ES = os.getenv("ELASTIC_HOST", "http://elasticsearch:9200").rstrip("/")
+# the name the API searches; an alias once the first versioned load has run
+ALIAS = os.getenv("ELASTIC_INDEX", "bible_verses")
+META_INDEX = os.getenv("ELASTIC_META_INDEX", "discern_meta")
+KEEP_PREVIOUS = int(os.getenv("BIBLE_INDEX_KEEP", "1"))
+
+MAPPING = {
+    "settings": {
+        # ~100k short docs: one shard keeps BM25 term statistics exact and every query a single-shard hit
+        "number_of_shards": 1,
+        "similarity": {
+            # verse length says little about relevance, so soften BM25's length normalization (default b=0.75)
+            "verse_bm25": {"type": "BM25", "k1": 1.2, "b": 0.5}
+        },
+        "analysis": {
+            "filter": {
+                "verse_synonyms": {"type": "synonym", "synonyms": TEXT_SYNONYMS},
+                "verse_stop": {"type": "stop", "stopwords": ["_english_", *ARCHAIC_STOPWORDS]},
+                "english_possessive": {"type": "stemmer", "language": "possessive_english"},
+                "english_stemmer": {"type": "stemmer", "language": "english"},
+                "book_synonyms": {"type": "synonym", "synonyms": synonym_rules()},
+            },
+            "analyzer": {
+                "verse_text": {
+                    "tokenizer": "standard",
+                    "filter": ["lowercase", "verse_synonyms", "english_possessive", "verse_stop", "english_stemmer"],
+                },
+                # no stemming or stopwords: prefixes have to match what the user is typing
+                "verse_prefix": {"tokenizer": "standard", "filter": ["lowercase", "asciifolding"]},
+                # every spelling of a book ("Genesis", "Gen", "GEN", "1 Sam", "First Samuel") -> its code
+                "book_names": {"tokenizer": "standard", "filter": ["lowercase", "book_synonyms"]},
+            },
+            "normalizer": {"lowercase": {"type": "custom", "filter": ["lowercase"]}},
+        },
+    },
+    "mappings": {
+        "dynamic": False,
+        # static per-translation blobs repeated on every verse; still indexed/filterable, just not returned
+        "_source": {"excludes": ["denominations", "version_info"]},
+        "properties": {
+            "book": {
+                "type": "keyword",
+                "fields": {
+                    # a match/no-match signal, so no term frequencies or length norms
+                    "names": {"type": "text", "analyzer": "book_names", "index_options": "docs", "norms": False}
+                },
+            },
+            "chapter": {"type": "integer"},
+            "verse": {"type": "integer"},
+            "reference": {"type": "keyword", "normalizer": "lowercase"},
+            "text": {
+                "type": "text",
+                "analyzer": "verse_text",
+                "similarity": "verse_bm25",
+                # positions (not offsets) are all BM25 plus phrase matching needs
+                "index_options": "positions",
+                "fields": {"suggest": {"type": "search_as_you_type", "analyzer": "verse_prefix"}},
+            },
+            "translation": {"type": "keyword"},
+            "denominations": {"type": "keyword"},
+            "version_info": {"type": "keyword", "index": False, "doc_values": False},
+        },
+    },
+}
+
+_VERSION = re.compile(rf"^{re.escape(ALIAS)}_v(\d+)$")
+
+
+def doc_id(doc):
+    # same verse in the same translation always lands on the same _id, so reloads overwrite
+    return f"{doc['translation']}:{doc['book']}:{doc['chapter']}:{doc['verse']}"
+
+
+def versions():
+    """Existing versioned indices as [(N, name)], oldest first."""
+    r = requests.get(f"{ES}/_cat/indices/{ALIAS}_v*", params={"format": "json", "h": "index"})
+    r.raise_for_status()
+    found = []
+    for row in r.json():
+        m = _VERSION.match(row["index"])
+        if m:
+            found.append((int(m.group(1)), row["index"]))
+    return sorted(found)
+
+
+def aliased_indices():
+    r = requests.get(f"{ES}/_alias/{ALIAS}")
+    if r.status_code == 404:
+        return []
+    r.raise_for_status()
+    return list(r.json())
+
+
+def ensure_template(mapping=MAPPING):
+    """The canonical settings/mapping, applied by ES to every `{ALIAS}_v*` index either loader creates."""
+    body = {"index_patterns": [f"{ALIAS}_v*"], "priority": 100, "template": mapping}
+    r = requests.put(f"{ES}/_index_template/{ALIAS}", json=body)
+    r.raise_for_status()
+
+
+def create_version():
+    ensure_template()
+    existing = versions()
+    name = f"{ALIAS}_v{(existing[-1][0] if existing else 0) + 1}"
+    r = requests.put(f"{ES}/{name}")
+    r.raise_for_status()
+    print(f"Created {name}")
+    return name
+
+
+def counts_by_translation(index):
+    requests.post(f"{ES}/{index}/_refresh").raise_for_status()
+    body = {"size": 0, "aggs": {"t": {"terms": {"field": "translation", "size": 1000}}}}
+    r = requests.post(f"{ES}/{index}/_search", json=body)
+    r.raise_for_status()
+    return {b["key"]: b["doc_count"] for b in r.json()["aggregations"]["t"]["buckets"]}
+
+
+def validate(index, expected):
+    """Compare per-translation counts with what the loader read; returns a list of problems."""
+    actual = counts_by_translation(index)
+    problems = []
+    for translation, want in sorted(expected.items()):
+        got = actual.get(translation, 0)
+        status = "ok" if got == want else "MISMATCH"
+        print(f"  {translation:<6} expected={want} indexed={got} {status}")
+        if got != want:
+            problems.append(f"{translation}: expected {want}, indexed {got}")
+    for translation in sorted(set(actual) - set(expected)):
+        problems.append(f"{translation}: unexpected {actual[translation]} docs")
+    return problems
+
+
+def swap_alias(index):
+    """Point the alias at `index` in one atomic call (retiring a legacy concrete index of that name)."""
+    actions = [{"remove": {"index": old, "alias": ALIAS}} for old in aliased_indices() if old != index]
+    legacy = requests.get(f"{ES}/{ALIAS}")
+    if legacy.ok and ALIAS in legacy.json():
+        # pre-versioning deployments have a real index called `bible_verses`; it goes in the same call
+        actions.append({"remove_index": {"index": ALIAS}})
+    actions.append({"add": {"index": index, "alias": ALIAS}})
+    r = requests.post(f"{ES}/_aliases", json={"actions": actions})
+    r.raise_for_status()
+    print(f"Alias {ALIAS} -> {index}")
+
+
+def drop_version(index):
+    requests.delete(f"{ES}/{index}").raise_for_status()
+    print(f"Deleted {index}")
+
+
+def gc_versions(current, keep=KEEP_PREVIOUS):
+    """Delete versions older than the current one, keeping `keep` of them for rollback."""
+    older = [name for n, name in versions() if name != current and n < int(current.rsplit("_v", 1)[1])]
+    for name in older[: max(len(older) - keep, 0)]:
+        drop_version(name)
+
+
+def bump_generation():
+    # tells API verse caches the corpus changed
+    body = {
+        "script": {
+            "source": "ctx._source.generation += 1; ctx._source.updated_at = params.now",
+            "params": {"now": int(time.time())},
+        },
+        "upsert": {"generation": 1, "updated_at": int(time.time())},
+    }
+    r = requests.post(f"{ES}/{META_INDEX}/_update/{ALIAS}", json=body)
+    r.raise_for_status()
+    print(f"Corpus generation bumped for {ALIAS}")
+
+
+def publish(index, expected):
+    """Validate a freshly loaded version; swap it in and clean up, or drop it. Returns success."""
+    print(f"Validating {index}")
+    problems = validate(index, expected)
+    if problems:
+        print(f"Not publishing {index}; {ALIAS} is unchanged:")
+        for p in problems:
+            print(f"  {p}")
+        drop_version(index)
+        return False
+    swap_alias(index)
+    gc_versions(index)
+    bump_generation()
+    return True
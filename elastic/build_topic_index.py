@@ -0,0 +1,98 @@
+"""
+Offline topic -> passage ranking for the curated taxonomy in api/scripture/topics.py.
+
+For every topic: the curated anchors first, then verses ranked by reciprocal rank fusion over
+the topic's queries (all translations at once, so a verse every translation surfaces
+outranks one that only a single wording matches). The output is a compact JSON table of
+packed (book, chapter, verse) spans the API loads at startup (TOPIC_TABLE_PATH).
+
+    python elastic/build_topic_index.py --out seed_data/topic_passages.json
+    python elastic/build_topic_index.py --backend local      # no Elasticsearch needed
+"""
+
+import argparse
+import json
+import os
+import time
+
+import requests
+from bible_index import ALIAS, ES
+
+from api.scripture.local_search import LocalSearch
+from api.scripture.query import verse_query
+from api.scripture.topics import TOPIC_TABLE_PATH, TOPICS, anchor_spans
+from api.scripture.verse_store import pack, unpack
+
+RRF_K = 60
+HITS_PER_QUERY = 25
+
+
+def es_search(queries):
+    lines = []
+    for q in queries:
+        lines.append(json.dumps({"index": ALIAS}))
+        lines.append(
+            json.dumps({"query": verse_query(q), "size": HITS_PER_QUERY, "_source": ["book", "chapter", "verse"]})
+        )
+    r = requests.post(f"{ES}/_msearch", data="\n".join(lines) + "\n", headers={"Content-Type": "application/x-ndjson"})
+    r.raise_for_status()
+    results = []
+    for response in r.json()["responses"]:
+        if "error" in response:
+            raise RuntimeError(f"msearch failed: {response['error']}")
+        results.append([h["_source"] for h in response["hits"]["hits"]])
+    return results
+
+
+def rank_topic(topic, search, per_topic):
+    anchors = anchor_spans(topic)
+
+    def covered(key):
+        return any(pack(s.book, s.chapter, s.verse) <= key <= pack(s.book, s.end_chapter, s.end_verse) for s in anchors)
+
+    scores = {}
+    for hits in search(list(topic.queries)):
+        for rank, doc in enumerate(hits):
+            key = pack(doc["book"], int(doc["chapter"]), int(doc["verse"]))
+            if not covered(key):
+                scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+    extra = sorted(scores, key=lambda k: (-scores[k], k))[: max(per_topic - len(anchors), 0)]
+    spans = [[pack(s.book, s.chapter, s.verse), pack(s.book, s.end_chapter, s.end_verse)] for s in anchors]
+    return spans + [[key, key] for key in extra]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["elastic", "local"], default="elastic")
+    parser.add_argument("--out", default=TOPIC_TABLE_PATH)
+    parser.add_argument("--per-topic", type=int, default=12, help="passages per topic, anchors included")
+    args = parser.parse_args()
+
+    if args.backend == "local":
+        engine = LocalSearch()
+        engine.load()
+        search = lambda queries: [engine.search(q, None, HITS_PER_QUERY) for q in queries]  # noqa: E731
+        source = f"local:{engine.path}"
+    else:
+        search = es_search
+        source = f"elastic:{ALIAS}"
+
+    started = time.time()
+    table = {}
+    for slug, topic in TOPICS.items():
+        table[slug] = rank_topic(topic, search, args.per_topic)
+        refs = ["{} {}:{}".format(*unpack(key)) for key, _ in table[slug][len(anchor_spans(topic)) :]]
+        print(f"{slug:<12} {len(table[slug])} passages; ranked: {', '.join(refs) or '-'}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    tmp = f"{args.out}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"generated_at": int(started), "source": source, "topics": table}, f, separators=(",", ":"))
+    os.replace(tmp, args.out)
+    print(
+        f"Wrote {len(table)} topics to {args.out} ({os.path.getsize(args.out)} bytes) in {time.time() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
-import os, time, sys, json
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from bible_index import ALIAS, ES, create_version, doc_id, drop_version, publish
 
-ES = os.getenv("ELASTIC_HOST", "http://elasticsearch:9200").rstrip("/")
-INDEX = os.getenv("ELASTIC_INDEX", "bible_verses")
 DATA_DIR = os.getenv("DATA_DIR", "/app/seed_data")
 FILES = ["load_kjv_data.jsonl", "load_web_data.jsonl", "load_bbe_data.jsonl"]
 
+
 def wait_for_es(max_wait=180):
     url = f"{ES}/_cluster/health"
     start = time.time()
@@ -26,57 +33,183 @@ def wait_for_es(max_wait=180):
             sys.exit(1)
         time.sleep(3)
 
-def ensure_index():
-    mapping = {
-        "mappings": {
-            "properties": {
-                "book": {"type": "keyword"},
-                "chapter": {"type": "integer"},
-                "verse": {"type": "integer"},
-                "reference": {"type": "text"},
-                "text": {"type": "text"},
-                "translation": {"type": "keyword"},
-                "denominations": {"type": "keyword"}
-            }
-        }
+
+# bulk sizing: a chunk closes at whichever limit it hits first
+BULK_CHUNK_BYTES = int(os.getenv("BULK_CHUNK_BYTES", str(5 * 1024 * 1024)))
+BULK_CHUNK_DOCS = int(os.getenv("BULK_CHUNK_DOCS", "2000"))
+BULK_WORKERS = int(os.getenv("BULK_WORKERS", "4"))
+BULK_MAX_RETRIES = int(os.getenv("BULK_MAX_RETRIES", "5"))
+BULK_RETRY_BACKOFF = float(os.getenv("BULK_RETRY_BACKOFF", "0.5"))
+
+_session = threading.local()
+
+
+def http():
+    # one keep-alive session per worker thread
+    if not hasattr(_session, "s"):
+        _session.s = requests.Session()
+    return _session.s
+
+
+class LoadStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexed = {}
+        self.failed = []  # (file, line, reason)
+        self.retries = 0
+        # translation -> distinct verse ids read from the files, for validation
+        self.expected = {}
+
+    def ok(self, name, n):
+        with self.lock:
+            self.indexed[name] = self.indexed.get(name, 0) + n
+
+    def fail(self, name, line_no, reason):
+        with self.lock:
+            self.failed.append((name, line_no, reason))
+
+
+def iter_chunks(name, path, stats):
+    """Stream a JSONL file as bulk chunks of [(line_no, ndjson_bytes)], bounded by bytes and docs."""
+    chunk, size = [], 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                _id = doc_id(json.loads(line))
+            except (ValueError, KeyError) as e:
+                stats.fail(name, line_no, f"unreadable line: {e!r}")
+                continue
+            with stats.lock:
+                stats.expected.setdefault(_id.split(":", 1)[0], set()).add(_id)
+            entry = (json.dumps({"index": {"_id": _id}}) + "\n" + line + "\n").encode("utf-8")
+            if chunk and (size + len(entry) > BULK_CHUNK_BYTES or len(chunk) >= BULK_CHUNK_DOCS):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append((line_no, entry))
+            size += len(entry)
+    if chunk:
+        yield chunk
+
+
+def send_chunk(index, name, chunk, stats):
+    """POST one chunk; resend only the items ES pushed back with 429, with backoff."""
+    pending, last_error = chunk, None
+    for attempt in range(BULK_MAX_RETRIES + 1):
+        if attempt:
+            with stats.lock:
+                stats.retries += 1
+            time.sleep(BULK_RETRY_BACKOFF * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        try:
+            r = http().post(
+                f"{ES}/{index}/_bulk",
+                data=b"".join(e for _, e in pending),
+                headers={"Content-Type": "application/x-ndjson"},
+                timeout=120,
+            )
+        except requests.RequestException as e:
+            last_error = f"transport: {e}"
+            continue
+        if r.status_code == 429 or r.status_code >= 500:
+            last_error = f"HTTP {r.status_code}"
+            continue
+        if not r.ok:
+            # the whole request was rejected (e.g. payload too large); nothing was indexed
+            for line_no, _ in pending:
+                stats.fail(name, line_no, f"HTTP {r.status_code}: {r.text[:200]}")
+            return
+        throttled, failed = [], 0
+        for (line_no, entry), item in zip(pending, r.json()["items"]):
+            result = item["index"]
+            if result.get("status") == 429:
+                throttled.append((line_no, entry))
+            elif result.get("status", 0) >= 300:
+                stats.fail(name, line_no, json.dumps(result.get("error"))[:300])
+                failed += 1
+        stats.ok(name, len(pending) - len(throttled) - failed)
+        if not throttled:
+            return
+        pending, last_error = throttled, "429 from bulk items"
+    for line_no, _ in pending:
+        stats.fail(name, line_no, f"gave up after {BULK_MAX_RETRIES} retries ({last_error})")
+
+
+def load_file(index, name, pool, slots, stats):
+    """Producer: stream one translation into the shared pool, blocking while it is saturated."""
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        print(f"Missing file: {path} (skipping)")
+        return []
+    print(f"Loading {name} …")
+    futures = []
+    for chunk in iter_chunks(name, path, stats):
+        slots.acquire()  # backpressure: at most 2 chunks per worker in memory
+        fut = pool.submit(send_chunk, index, name, chunk, stats)
+        fut.add_done_callback(lambda _: slots.release())
+        futures.append(fut)
+    return futures
+
+
+def index_settings(index, settings):
+    r = requests.put(f"{ES}/{index}/_settings", json={"index": settings})
+    r.raise_for_status()
+
+
+def bulk_load(index):
+    # indexing-only settings for the load; the originals come back afterwards
+    current = requests.get(f"{ES}/{index}/_settings", params={"include_defaults": "true"}).json()[index]
+    original = {
+        "refresh_interval": current["settings"]["index"].get("refresh_interval"),  # None = cluster default
+        "number_of_replicas": current["settings"]["index"].get("number_of_replicas", "1"),
     }
-    r = requests.head(f"{ES}/{INDEX}")
-    if r.status_code == 404:
-        print(f"Creating index {INDEX}…")
-        r = requests.put(f"{ES}/{INDEX}", json=mapping)
-        r.raise_for_status()
-    else:
-        print(f"Index {INDEX} already exists.")
-
-def bulk_load():
+    index_settings(index, {"refresh_interval": "-1", "number_of_replicas": 0})
+
+    stats = LoadStats()
+    started = time.perf_counter()
+    slots = threading.BoundedSemaphore(BULK_WORKERS * 2)
+    try:
+        with (
+            ThreadPoolExecutor(max_workers=BULK_WORKERS, thread_name_prefix="bulk") as pool,
+            ThreadPoolExecutor(max_workers=len(FILES), thread_name_prefix="reader") as readers,
+        ):
+            # every translation streams at once through the same bounded pool
+            chunk_futures = [
+                f for fs in readers.map(lambda n: load_file(index, n, pool, slots, stats), FILES) for f in fs
+            ]
+            for fut in chunk_futures:
+                fut.result()
+    finally:
+        index_settings(index, original)
+        requests.post(f"{ES}/{index}/_refresh").raise_for_status()
+
+    elapsed = time.perf_counter() - started
+    total = sum(stats.indexed.values())
     for name in FILES:
-        path = os.path.join(DATA_DIR, name)
-        if not os.path.exists(path):
-            print(f"Missing file: {path} (skipping)")
-            continue
-        print(f"Loading {name} …")
-        lines = []
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                lines.append('{"index":{}}')
-                lines.append(line)
-        ndjson = "\n".join(lines) + "\n"
-        r = requests.post(f"{ES}/{INDEX}/_bulk", data=ndjson,
-                          headers={"Content-Type": "application/x-ndjson"})
-        r.raise_for_status()
-        resp = r.json()
-        if resp.get("errors"):
-            print("Bulk had errors; first item:", json.dumps(resp["items"][0], indent=2))
-        print(f"Finished {name}")
+        if name in stats.indexed:
+            print(f"Finished {name}: {stats.indexed[name]} docs")
+    print(
+        f"Indexed {total} docs in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} docs/s), "
+        f"{stats.retries} retried chunks, {len(stats.failed)} failed"
+    )
+    for name, line_no, reason in sorted(stats.failed):
+        print(f"  FAILED {name}:{line_no} {reason}")
+    return stats
+
 
 if __name__ == "__main__":
     print(f"Connecting to ES at {ES}")
     wait_for_es()
-    ensure_index()
-    bulk_load()
+    # load into a fresh version; the alias keeps serving the old one until it validates
+    index = create_version()
+    stats = bulk_load(index)
+    if stats.failed:
+        print(f"Not publishing {index}; {ALIAS} is unchanged.")
+        drop_version(index)
+        sys.exit(1)
+    if not publish(index, {t: len(ids) for t, ids in stats.expected.items()}):
+        sys.exit(1)
     # quick count
-    r = requests.get(f"{ES}/{INDEX}/_count")
+    r = requests.get(f"{ES}/{ALIAS}/_count")
     print("Count:", r.json())
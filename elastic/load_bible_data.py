@@ -1,30 +1,17 @@
-import os
 import json
+import os
 import time
-from typing import Iterator, Dict, Any
+from typing import Any, Dict, Iterator
 
+from bible_index import ALIAS, create_version, doc_id, drop_version, publish
+from elastic_transport import ConnectionError as ESConnectionError
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import bulk
-from elastic_transport import ConnectionError as ESConnectionError
 
 ELASTIC_HOST = os.environ.get("ELASTIC_HOST", "http://elasticsearch:9200")
-INDEX = os.environ.get("ELASTIC_INDEX", "bible_verses")
 DATA_DIR = os.getenv("DATA_DIR", "/app/seed_data")
 FILES = ["load_kjv_data.jsonl", "load_web_data.jsonl", "load_bbe_data.jsonl"]
 
-MAPPING = {
-    "mappings": {
-        "properties": {
-            "book": {"type": "keyword"},
-            "chapter": {"type": "integer"},
-            "verse": {"type": "integer"},
-            "reference": {"type": "keyword"},
-            "text": {"type": "text"},
-            "translation": {"type": "keyword"},
-            "denominations": {"type": "keyword"}
-        }
-    }
-}
 
 def wait_for_es(es: Elasticsearch, timeout: int = 180, interval: float = 2.5) -> None:
     """Wait until Elasticsearch responds or timeout."""
@@ -42,14 +29,18 @@ def wait_for_es(es: Elasticsearch, timeout: int = 180, interval: float = 2.5) ->
         time.sleep(interval)
     raise RuntimeError(f"Timed out waiting for Elasticsearch at {ELASTIC_HOST}")
 
-def docs_from_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+
+def docs_from_jsonl(path: str, index: str, expected: Dict[str, set]) -> Iterator[Dict[str, Any]]:
     with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             doc = json.loads(line)
-            yield {"_index": INDEX, "_source": doc}
+            _id = doc_id(doc)
+            expected.setdefault(doc["translation"], set()).add(_id)
+            yield {"_index": index, "_id": _id, "_source": doc}
+
 
 def main():
     print(f"🔌 Connecting to ES at: {ELASTIC_HOST}")
@@ -57,11 +48,10 @@ def main():
 
     wait_for_es(es)
 
-    if not es.indices.exists(index=INDEX):
-        es.indices.create(index=INDEX, body=MAPPING)
-        print(f"📖 Created index: {INDEX}")
-    else:
-        print(f"✅ Index exists: {INDEX}")
+    # load into a fresh version; the alias keeps serving the old one until it validates
+    index = create_version()
+    expected: Dict[str, set] = {}
+    failed = 0
 
     for filename in FILES:
         path = os.path.join(DATA_DIR, filename)
@@ -70,13 +60,19 @@ def main():
             continue
 
         print(f"📥 Loading {filename}...")
-        success, errors = bulk(es, docs_from_jsonl(path), raise_on_error=False)
+        success, errors = bulk(es, docs_from_jsonl(path, index, expected), raise_on_error=False)
         print(f"✅ Finished {filename}: indexed={success}, errors={len(errors) if errors else 0}")
-        if errors:
-            print("⚠️ Sample errors:", errors[:3])
+        for err in errors or []:
+            print("⚠️ Failed:", err)
+        failed += len(errors or [])
 
-    es.indices.refresh(index=INDEX)
+    if failed or not publish(index, {t: len(ids) for t, ids in expected.items()}):
+        if failed:
+            print(f"⚠️ Not publishing {index}; {ALIAS} is unchanged.")
+            drop_version(index)
+        raise SystemExit(1)
     print("🎉 Done.")
 
+
 if __name__ == "__main__":
     main()
@@ -1,7 +1,9 @@
 # main.py
 
-import os
+
 from dotenv import load_dotenv
+
+from api.crew.agent_handler import build_inputs
 from crew.discern_crew import DiscernCrew
 
 load_dotenv()
@@ -10,7 +12,8 @@ if __name__ == "__main__":
     question = input("What would you like to ask? ")
 
     crew_instance = DiscernCrew(user_prompt=question)
-    result = crew_instance.crew().kickoff()
+    result = crew_instance.run(build_inputs({"user_input": question}))
 
     print("\n=== RESULT ===\n")
     print(result.raw)
+    print(f"\n(intent={result.intent}, timings={result.timings})")
@@ -14,6 +14,7 @@ from passlib.context import CryptContext
 from motor.motor_asyncio import AsyncIOMotorClient
 from jose import jwt  # keep consistent with API
 
+from api.db.indexes import ensure_indexes
 from api.models.user import (
     Role,
     UserPreferences,
@@ -49,12 +50,6 @@ def default_preferences() -> dict:
     return prefs.model_dump()
 
 
-async def ensure_indexes(db):
-    # Helpful indexes for auth and Google linking
-    await db.users.create_index("email", unique=True)
-    await db.users.create_index("auth_providers.google.sub", unique=True, sparse=True)
-
-
 async def seed_users(db):
     now = datetime.utcnow()
     base = {
@@ -129,10 +124,12 @@ async def seed_users(db):
                     "updated_at": datetime.utcnow(),
                     "preferences": existing.get("preferences", default_preferences()),
                     "auth_providers": existing.get("auth_providers", {}),
+                    "email_lower": existing["email"].lower(),
                 }}
             )
             continue
 
+        user["email_lower"] = user["email"].lower()
         await db.users.insert_one(user)
         print(f"✅ Seeded {user['role']} user: {user['email']}")
 
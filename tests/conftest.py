@@ -0,0 +1,66 @@
+# tests/conftest.py
+import os
+
+# settings the api modules read at import time; no real services are contacted
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-client")
+os.environ.setdefault("STRIPE_SECRET_KEY", "sk_test_dummy")
+os.environ.setdefault("STRIPE_PRICE_ID", "price_test")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("MONGO_URI", "mongodb://127.0.0.1:1")
+os.environ.setdefault("ELASTIC_HOST", "http://127.0.0.1:1")
+os.environ.setdefault("CREW_VERBOSE", "false")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import json
+
+import pytest
+
+# a few real verses (KJV, and WEB for two of them) in the seed JSONL format
+# fmt: off
+VERSES = {
+    "KJV": [
+        ("JHN", 3, 16, "For God so loved the world, that he gave his only begotten Son, that whosoever believeth in him should not perish, but have everlasting life."),
+        ("JHN", 3, 17, "For God sent not his Son into the world to condemn the world; but that the world through him might be saved."),
+        ("PSA", 23, 1, "The LORD is my shepherd; I shall not want."),
+        ("PSA", 23, 2, "He maketh me to lie down in green pastures: he leadeth me beside the still waters."),
+        ("PSA", 23, 3, "He restoreth my soul: he leadeth me in the paths of righteousness for his name's sake."),
+        ("PSA", 23, 4, "Yea, though I walk through the valley of the shadow of death, I will fear no evil: for thou art with me; thy rod and thy staff they comfort me."),
+        ("ROM", 8, 28, "And we know that all things work together for good to them that love God, to them who are the called according to his purpose."),
+        ("1CO", 13, 4, "Charity suffereth long, and is kind; charity envieth not; charity vaunteth not itself, is not puffed up,"),
+        ("ISA", 53, 5, "But he was wounded for our transgressions, he was bruised for our iniquities: the chastisement of our peace was upon him; and with his stripes we are healed."),
+        ("AMO", 5, 24, "But let judgment run down as waters, and righteousness as a mighty stream."),
+        ("SNG", 2, 4, "He brought me to the banqueting house, and his banner over me was love."),
+        ("JOB", 3, 1, "After this opened Job his mouth, and cursed his day."),
+    ],
+    "WEB": [
+        ("JHN", 3, 16, "For God so loved the world, that he gave his one and only Son, that whoever believes in him should not perish, but have eternal life."),
+        ("1CO", 13, 4, "Love is patient and is kind. Love doesn't envy. Love doesn't brag, is not proud,"),
+    ],
+}
+# fmt: on
+SEED_NAMES = {"KJV": "load_kjv_data.jsonl", "WEB": "load_web_data.jsonl"}
+
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    """A DATA_DIR with small KJV and WEB seed files."""
+    for translation, verses in VERSES.items():
+        with open(tmp_path / SEED_NAMES[translation], "w", encoding="utf-8") as f:
+            for book, chapter, verse, text in verses:
+                f.write(
+                    json.dumps(
+                        {
+                            "book": book,
+                            "chapter": chapter,
+                            "verse": verse,
+                            "translation": translation,
+                            "reference": f"{book} {chapter}:{verse}",
+                            "text": text,
+                        }
+                    )
+                    + "\n"
+                )
+    return tmp_path
@@ -0,0 +1,78 @@
+# tests/fake_stripe.py
+"""
+Minimal local stand-in for the Stripe API, enough for api/billing/stripe_gateway.py.
+Point the SDK at it with `stripe.api_base = server.url` (STRIPE_API_BASE in a deployment).
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeStripe:
+    def __init__(self):
+        self.customers = {}
+        self.subscriptions = []  # subscription objects, any customer
+        self.requests = []  # (method, path) in arrival order
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> "FakeStripe":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def add_subscription(self, customer: str, status: str, sub_id: str = "sub_1") -> dict:
+        sub = {
+            "id": sub_id,
+            "object": "subscription",
+            "customer": customer,
+            "status": status,
+            "cancel_at_period_end": False,
+        }
+        self.subscriptions = [s for s in self.subscriptions if s["id"] != sub_id] + [sub]
+        return sub
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                fake.requests.append(("GET", url.path))
+                if url.path == "/v1/subscriptions":
+                    customer = parse_qs(url.query).get("customer", [None])[0]
+                    data = [s for s in fake.subscriptions if s["customer"] == customer]
+                    return self._send(200, {"object": "list", "url": url.path, "has_more": False, "data": data})
+                self._send(404, {"error": {"type": "invalid_request_error", "message": f"Unknown path {url.path}"}})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+                fake.requests.append(("POST", url.path))
+                if url.path == "/v1/customers":
+                    customer = {
+                        "id": f"cus_{len(fake.customers) + 1}",
+                        "object": "customer",
+                        "email": form.get("email", [None])[0],
+                    }
+                    fake.customers[customer["id"]] = customer
+                    return self._send(200, customer)
+                self._send(404, {"error": {"type": "invalid_request_error", "message": f"Unknown path {url.path}"}})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,55 @@
+# tests/test_agent_executor.py
+import pytest
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+
+from api.crew.executor import AgentExecutor
+from api.models.message import SendMessageInput
+from api.routes import agent as agent_routes
+
+
+def test_reserved_slot_is_not_counted_twice():
+    executor = AgentExecutor(workers=1, max_queue=0, timeout=5)
+    executor.reserve()
+    with pytest.raises(HTTPException) as exc:
+        executor.reserve()
+    assert exc.value.status_code == 503
+    job = executor.submit(lambda cancel: "ok", reserved=True)
+    assert job.future.result(5) == "ok"
+    executor.reserve()
+    executor.release()
+    assert executor.stats()["pending"] == 0
+
+
+async def test_busy_executor_records_nothing(monkeypatch):
+    executor = AgentExecutor(workers=1, max_queue=0, timeout=5)
+    executor.reserve()
+    monkeypatch.setattr(agent_routes, "agent_executor", executor)
+    hits = []
+
+    async def hit(user_id, role):
+        hits.append(user_id)
+
+    monkeypatch.setattr(agent_routes.rate_limiter, "hit", hit)
+    db = AsyncMongoMockClient()["discern"]
+
+    with pytest.raises(HTTPException) as exc:
+        await agent_routes._start_turn(db, SendMessageInput(content="hello"), {"_id": "u1", "role": "subscribed"})
+    assert exc.value.status_code == 503
+    assert hits == []
+    assert await db.messages.count_documents({}) == 0
+
+
+async def test_failed_turn_releases_its_slot(monkeypatch):
+    executor = AgentExecutor(workers=1, max_queue=0, timeout=5)
+    monkeypatch.setattr(agent_routes, "agent_executor", executor)
+
+    async def hit(user_id, role):
+        raise HTTPException(status_code=429, detail="limit")
+
+    monkeypatch.setattr(agent_routes.rate_limiter, "hit", hit)
+    with pytest.raises(HTTPException):
+        await agent_routes._start_turn(
+            AsyncMongoMockClient()["discern"], SendMessageInput(content="hi"), {"_id": "u1", "role": "subscribed"}
+        )
+    assert executor.stats()["pending"] == 0
@@ -0,0 +1,131 @@
+# tests/test_citations.py
+from contextlib import contextmanager
+
+import pytest
+from conftest import SEED_NAMES
+
+from api.crew import agent_handler, citations
+from api.crew.citations import hydrate, quote_policy
+from api.scripture.verse_store import VerseStore
+from crew.discern_crew import CrewRun
+
+KJV_3_16 = "For God so loved the world, that he gave his only begotten Son"
+
+
+@pytest.fixture(autouse=True)
+def store(seed_dir, monkeypatch):
+    store = VerseStore(data_dir=str(seed_dir), files=SEED_NAMES.values(), default_translation="KJV")
+    store.load()
+    monkeypatch.setattr("crew.tools.scripture_search_tool.verse_store", store)
+    return store
+
+
+def _prefs(**prefs):
+    return {"translation": "KJV", "citation_style": "inline", "include_direct_quotes": True, **prefs}
+
+
+def test_inline_quote_follows_the_citing_line():
+    text = "God loves you (John 3:16).\nRest in that."
+    out = hydrate(text, _prefs())
+    assert out.startswith("God loves you (John 3:16).\n\n> “" + KJV_3_16)
+    assert out.endswith("everlasting life.” (John 3:16, KJV)\n\nRest in that.")
+
+
+def test_inline_quote_nests_under_list_item():
+    out = hydrate("- Love is patient (1 Cor 13:4)\n- Next", _prefs())
+    assert out.splitlines()[1].startswith("  > “Charity suffereth long")
+    assert out.splitlines()[-1] == "- Next"
+
+
+def test_quotes_use_the_readers_translation():
+    out = hydrate("See John 3:16.", _prefs(translation="WEB"))
+    assert "his one and only Son" in out and "(John 3:16, WEB)" in out
+
+
+def test_translations_outside_the_corpus_are_quoted_in_the_default(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(
+        "crew.tools.scripture_search_tool._msearch", lambda searches: lookups.append(searches) or [[]] * len(searches)
+    )
+    out = hydrate("God loves you (John 3:16).", _prefs(translation="NIV"))
+    assert KJV_3_16 in out and "(John 3:16, KJV)" in out
+    assert lookups == []
+    assert "added from the KJV" in quote_policy(_prefs(translation="ESV"))
+    assert "added from the reader's translation" in quote_policy(_prefs(translation="WEB"))
+
+
+def test_footnotes_number_each_passage_once():
+    out = hydrate("John 3:16 and Is 53:5, then John 3:16 again.", _prefs(citation_style="footnote"))
+    body, notes = out.split("\n\n")
+    assert body == "John 3:16[^1] and Is 53:5[^2], then John 3:16[^1] again."
+    assert notes.splitlines()[0].startswith(f"[^1]: John 3:16 (KJV) “{KJV_3_16}")
+    assert notes.splitlines()[1].startswith("[^2]: Isaiah 53:5 (KJV) “But he was wounded")
+
+
+def test_no_quotes_when_the_reader_opted_out():
+    text = "God loves you (John 3:16)."
+    assert hydrate(text, _prefs(citation_style="none")) == text
+    assert hydrate(text, _prefs(include_direct_quotes=False)) == text
+
+
+def test_whole_chapters_are_not_quoted():
+    assert hydrate("Read Psalm 23 tonight.", _prefs()) == "Read Psalm 23 tonight."
+
+
+def test_whole_chapter_does_not_hide_verses_cited_with_it():
+    out = hydrate("See Ps 23; Rom 8:28.", _prefs(citation_style="footnote"))
+    assert out.startswith("See Ps 23; Rom 8:28[^1].")
+    assert "[^1]: Romans 8:28 (KJV) “And we know that all things work together" in out
+    assert "LORD is my shepherd" not in out
+
+
+def test_unresolved_references_are_left_bare():
+    text = "See Obadiah 1:3."
+    before = citations.citation_stats()["unresolved"]
+    assert hydrate(text, _prefs()) == text
+    assert citations.citation_stats()["unresolved"] == before + 1
+
+
+class _Crew:
+    def __init__(self, raw):
+        self.raw = raw
+
+    def run(self, inputs, on_event=None, cancel=None):
+        on_event("token", {"text": self.raw})
+        return CrewRun(raw=self.raw, intent="teaching", timings={"total": 1.0})
+
+
+class _Pool:
+    def __init__(self, crew):
+        self.crew = crew
+
+    @contextmanager
+    def checkout(self):
+        yield self.crew
+
+
+def _context(prompt, **prefs):
+    # a prior turn keeps the answer out of the shared response cache
+    return {
+        "user_input": prompt,
+        "user_data": {"preferences": _prefs(**prefs)},
+        "conversation": [{"role": "user", "message": "hi"}],
+    }
+
+
+def test_stream_gets_the_hydrated_text_to_swap_in(monkeypatch):
+    monkeypatch.setattr(agent_handler, "crew_pool", _Pool(_Crew("God loves you (John 3:16).")))
+    events = []
+    run = agent_handler.run_discern_agents(_context("does God love me"), on_event=lambda e, d: events.append((e, d)))
+    assert [e for e, _ in events] == ["token", "replace"]
+    assert events[0][1]["text"] == "God loves you (John 3:16)."
+    assert events[1][1]["text"] == run.raw and KJV_3_16 in run.raw
+
+
+def test_no_replace_event_when_nothing_was_added(monkeypatch):
+    monkeypatch.setattr(agent_handler, "crew_pool", _Pool(_Crew("God loves you (John 3:16).")))
+    events = []
+    agent_handler.run_discern_agents(
+        _context("does God love me", citation_style="none"), on_event=lambda e, d: events.append((e, d))
+    )
+    assert [e for e, _ in events] == ["token"]
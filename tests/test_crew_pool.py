@@ -0,0 +1,58 @@
+# tests/test_crew_pool.py
+import threading
+
+import pytest
+
+from api.crew.crew_pool import CrewPool
+
+
+class Crew:
+    built = 0
+
+    def __init__(self):
+        Crew.built += 1
+        self.number = Crew.built
+
+
+def test_checkout_reuses_instances():
+    pool = CrewPool(Crew, size=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+    assert second is first
+    assert pool.stats()["created"] == 1
+
+
+def test_failed_run_discards_the_instance():
+    pool = CrewPool(Crew, size=1)
+    with pytest.raises(RuntimeError):
+        with pool.checkout() as poisoned:
+            raise RuntimeError("run cancelled")
+    with pool.checkout() as fresh:
+        assert fresh is not poisoned
+    assert pool.stats()["discarded"] == 1
+    assert pool.stats()["created"] == 1
+
+
+def test_waiter_gets_a_replacement_for_a_discarded_instance():
+    pool = CrewPool(Crew, size=1)
+    got = []
+    acquired, release = threading.Event(), threading.Event()
+
+    def failing_run():
+        with pytest.raises(RuntimeError):
+            with pool.checkout():
+                acquired.set()
+                release.wait(5)
+                raise RuntimeError("timed out")
+
+    holder = threading.Thread(target=failing_run)
+    holder.start()
+    assert acquired.wait(5)
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout().__enter__()), daemon=True)
+    waiter.start()
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert got and isinstance(got[0], Crew)
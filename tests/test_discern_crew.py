@@ -0,0 +1,98 @@
+# tests/test_discern_crew.py
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from crewai.llms.providers.openai.completion import OpenAICompletion
+
+from crew import discern_crew
+from crew.discern_crew import DiscernCrew, parse_router_decision
+
+INPUTS = {
+    "prompt": "does god love me",
+    "conversation": "",
+    "user_profile": "",
+    "memories": "",
+    "desired_length": "short",
+    "translation": "KJV",
+    "router_summary": "",
+    "scripture": "",
+    "quote_policy": "Cite passages by reference only.",
+}
+
+
+# the compose agents' roles, as they appear in each task's system prompt
+COMPOSE_ROLES = {
+    "teaching": "Clear explainer of biblical doctrine",
+    "pastoral": "Gentle, grounded guide for pain, sin, and decisions",
+    "assurance": "Addresses salvation/assurance questions",
+}
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Canned completions: the router's JSON decision, then one fixed answer for every task.
+    Set `intent` on the returned object to change the routed intent; `prompts` collects every call.
+    """
+    fake = SimpleNamespace(intent="teaching", prompts=[])
+
+    def call(self, messages, *args, **kwargs):
+        text = messages if isinstance(messages, str) else " ".join(str(m.get("content", "")) for m in messages)
+        fake.prompts.append(text)
+        if "Decide primary intent" in text:
+            return f'{{"primary_intent": "{fake.intent}", "search": ["love"]}}'
+        return "God is love (1 John 4:8)."
+
+    monkeypatch.setattr(OpenAICompletion, "call", call)
+    return fake
+
+
+def _run(crew, cancel):
+    stages = []
+    run = crew.run(
+        INPUTS,
+        on_event=lambda event, data: stages.append(data.get("stage")) if event == "stage" else None,
+        cancel=cancel,
+    )
+    return run, stages
+
+
+def test_reused_crew_reports_to_the_current_run(fake_llm):
+    crew = DiscernCrew()
+    first_cancel = threading.Event()
+    _, first_stages = _run(crew, first_cancel)
+    # the first caller went away after its run finished (timeout, disconnect)
+    first_cancel.set()
+    seen_by_first = list(first_stages)
+
+    run, stages = _run(crew, threading.Event())
+    assert run.raw == "God is love (1 John 4:8)."
+    assert stages == ["routed", "scripture_gathered", "drafting", "validating", "editing"]
+    assert first_stages == seen_by_first
+
+
+@pytest.mark.parametrize("intent", ["pastoral", "assurance"])
+def test_routed_intent_runs_only_its_compose_task(fake_llm, monkeypatch, intent):
+    def slow_retrieval(tool, prompt, decision, limit):
+        time.sleep(0.05)
+        return [], None
+
+    monkeypatch.setattr(discern_crew, "gather_scripture", slow_retrieval)
+    fake_llm.intent = intent
+    run = DiscernCrew().run(INPUTS)
+
+    assert run.intent == intent
+    ran = {name for name, role in COMPOSE_ROLES.items() if any(role in prompt for prompt in fake_llm.prompts)}
+    assert ran == {intent}
+    # router, compose, validate, edit
+    assert len(fake_llm.prompts) == 4
+    # retrieval is timed on its own, not again as part of the answer
+    assert run.timings["retrieve"] >= 0.05
+    assert run.timings["answer"] < run.timings["total"] - run.timings["retrieve"]
+
+
+def test_router_decision_falls_back_to_teaching():
+    assert parse_router_decision("not json")["primary_intent"] == "teaching"
+    assert parse_router_decision('```json\n{"primary_intent": "Pastoral"}\n```')["primary_intent"] == "pastoral"
@@ -0,0 +1,40 @@
+# tests/test_indexes.py
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from api.db import indexes
+from api.db.indexes import INDEXES, ensure_indexes
+
+
+async def test_database_seeded_with_default_names_gets_every_index():
+    db = AsyncMongoMockClient()["discern"]
+    # what the old seed script created: create_index("email", unique=True), ...
+    await db.users.create_indexes(
+        [
+            IndexModel([("email", 1)], unique=True),
+            IndexModel([("auth_providers.google.sub", 1)], unique=True, sparse=True),
+        ]
+    )
+
+    await ensure_indexes(db)
+
+    names = set(await db.users.index_information())
+    assert {m.document["name"] for m in INDEXES["users"]} <= names
+
+
+async def test_conflicts_fail_startup(monkeypatch):
+    db = AsyncMongoMockClient()["discern"]
+    create = type(db.users).create_indexes
+
+    async def conflicting(self, models, *args, **kwargs):
+        if self.name == "users":
+            raise OperationFailure("Index already exists with a different name", code=85)
+        return await create(self, models, *args, **kwargs)
+
+    monkeypatch.setattr(type(db.users), "create_indexes", conflicting)
+    with pytest.raises(RuntimeError, match="users"):
+        await indexes.ensure_indexes(db)
+    # the other collections were still indexed
+    assert "user_recent_id" in await db.conversations.index_information()
@@ -0,0 +1,146 @@
+# tests/test_jobs.py
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from api.crew.agent_handler import run_fake_agents
+from api.crew.jobs import DONE, FAILED, QUEUED, RUNNING, JobWorker, enqueue_job
+
+
+@pytest.fixture
+async def db():
+    db = AsyncMongoMockClient()["discern"]
+    await db.users.insert_one({"email": "ada@example.com", "first_name": "Ada", "preferences": {}})
+    return db
+
+
+@pytest.fixture
+async def user(db):
+    return await db.users.find_one({})
+
+
+def _worker(db, runner=run_fake_agents, max_attempts=2):
+    return JobWorker(db, runner=runner, concurrency=2, lease=30, poll=0.02, max_attempts=max_attempts)
+
+
+async def _until(db, job_id, *statuses, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await db.jobs.find_one({"_id": job_id})
+        if job["status"] in statuses:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, f"job stuck in {job['status']}"
+        await asyncio.sleep(0.02)
+
+
+async def _enqueue(db, user, prompt="what is grace"):
+    return ObjectId(await enqueue_job(db, user, "c1", {"user_input": prompt}))
+
+
+async def test_claims_runs_and_saves_the_reply(db, user):
+    job_id = await _enqueue(db, user)
+    worker = _worker(db)
+    worker.start()
+    try:
+        job = await _until(db, job_id, DONE)
+    finally:
+        await worker.stop()
+
+    assert job["attempts"] == 1 and job["worker_id"] == worker.worker_id
+    assert job["result"]["response"] == "(fake answer) You asked: what is grace"
+    message = await db.messages.find_one({"conversation_id": "c1"})
+    assert str(message["_id"]) == job["result"]["message_id"]
+    assert worker.stats()["claimed"] == 1 and worker.stats()["done"] == 1
+
+
+async def test_failing_job_is_retried_then_failed(db, user):
+    calls = []
+
+    def broken(context, cancel=None):
+        calls.append(context["user_input"])
+        raise RuntimeError("model unavailable")
+
+    job_id = await _enqueue(db, user)
+    worker = _worker(db, runner=broken, max_attempts=2)
+    worker.start()
+    try:
+        job = await _until(db, job_id, FAILED)
+    finally:
+        await worker.stop()
+
+    assert len(calls) == 2 and job["attempts"] == 2
+    assert job["error"] == "Agent failed to respond." and "expires_at" in job
+    assert worker.stats()["retried"] == 1 and worker.stats()["failed"] == 1
+
+
+async def test_lapsed_lease_is_reclaimed(db, user):
+    # a worker that died mid-run on its first attempt
+    result = await db.jobs.insert_one(
+        {
+            "user_id": str(user["_id"]),
+            "conversation_id": "c1",
+            "status": RUNNING,
+            "worker_id": "dead-worker",
+            "lease_expires_at": datetime.utcnow() - timedelta(seconds=1),
+            "input": {"user_input": "what is grace", "conversation": [], "memories": []},
+            "attempts": 1,
+            "created_at": datetime.utcnow(),
+        }
+    )
+    worker = _worker(db, max_attempts=2)
+    worker.start()
+    try:
+        job = await _until(db, result.inserted_id, DONE)
+    finally:
+        await worker.stop()
+    assert job["attempts"] == 2 and job["worker_id"] == worker.worker_id
+
+
+async def test_lapsed_lease_on_the_last_attempt_is_failed(db, user):
+    calls = []
+    result = await db.jobs.insert_one(
+        {
+            "user_id": str(user["_id"]),
+            "conversation_id": "c1",
+            "status": RUNNING,
+            "worker_id": "dead-worker",
+            "lease_expires_at": datetime.utcnow() - timedelta(seconds=1),
+            "input": {"user_input": "what is grace", "conversation": [], "memories": []},
+            "attempts": 2,
+            "created_at": datetime.utcnow(),
+        }
+    )
+    worker = _worker(db, runner=lambda context, cancel=None: calls.append(context), max_attempts=2)
+    worker.start()
+    try:
+        job = await _until(db, result.inserted_id, FAILED)
+    finally:
+        await worker.stop()
+    assert calls == [] and job["attempts"] == 2
+    assert job["error"] == "Agent stopped responding." and worker.stats()["failed"] == 1
+
+
+async def test_stop_requeues_running_jobs(db, user):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(context, cancel=None):
+        started.set()
+        release.wait(5)
+        return run_fake_agents(context)
+
+    job_id = await _enqueue(db, user)
+    worker = _worker(db, runner=slow)
+    worker.start()
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        await worker.stop()
+    finally:
+        release.set()
+
+    job = await db.jobs.find_one({"_id": job_id})
+    assert job["status"] == QUEUED and job["attempts"] == 0 and job["lease_expires_at"] is None
+    assert worker.stats()["requeued"] == 1
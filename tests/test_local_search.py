@@ -0,0 +1,60 @@
+# tests/test_local_search.py
+import os
+import threading
+
+from conftest import SEED_NAMES
+
+from api.scripture import local_search as local_search_module
+from api.scripture.local_search import LocalSearch, build_index, read_header
+
+FILES = list(SEED_NAMES.values())
+
+
+def _engine(seed_dir, tmp_path):
+    engine = LocalSearch(path=str(tmp_path / "verses.idx"), data_dir=str(seed_dir), files=FILES)
+    engine.load()
+    return engine
+
+
+def test_ranks_the_matching_verse_first(seed_dir, tmp_path):
+    engine = _engine(seed_dir, tmp_path)
+    assert engine.search("for god so loved the world", "KJV", 3)[0]["reference"] == "JHN 3:16"
+    assert engine.search("the lord is my shepherd", "KJV", 3)[0]["reference"] == "PSA 23:1"
+
+
+def test_synonyms_and_stemming(seed_dir, tmp_path):
+    engine = _engine(seed_dir, tmp_path)
+    # "charity" is folded onto "love"; "suffereth" stems like "suffer"
+    assert engine.search("love suffer long", "KJV", 1)[0]["reference"] == "1CO 13:4"
+
+
+def test_translation_filter(seed_dir, tmp_path):
+    engine = _engine(seed_dir, tmp_path)
+    hits = engine.search("god loved the world", "WEB", 5)
+    assert hits and {h["translation"] for h in hits} == {"WEB"}
+    assert engine.search("god loved the world", "ESV", 5) == []
+    assert {h["translation"] for h in engine.search("god loved the world", None, 5)} == {"KJV", "WEB"}
+
+
+def test_index_from_another_analyzer_is_rebuilt(seed_dir, tmp_path, monkeypatch):
+    _engine(seed_dir, tmp_path)
+    path = str(tmp_path / "verses.idx")
+    assert read_header(path)["analyzer"] == local_search_module.ANALYZER_FINGERPRINT
+
+    monkeypatch.setattr(local_search_module, "ANALYZER_FINGERPRINT", "changed")
+    assert LocalSearch(path=path, data_dir=str(seed_dir), files=FILES)._stale()
+    _engine(seed_dir, tmp_path)
+    assert read_header(path)["analyzer"] == "changed"
+
+
+def test_concurrent_builds_leave_a_valid_index(seed_dir, tmp_path):
+    path = str(tmp_path / "verses.idx")
+    builders = [threading.Thread(target=build_index, args=(str(seed_dir), FILES, path)) for _ in range(4)]
+    for b in builders:
+        b.start()
+    for b in builders:
+        b.join()
+    assert sorted(os.listdir(tmp_path)) == sorted(FILES + ["verses.idx"])
+    engine = LocalSearch(path=path, data_dir=str(seed_dir), files=FILES)
+    engine.load()
+    assert engine.doc_count == 14
@@ -0,0 +1,73 @@
+# tests/test_pagination.py
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+
+from api.db.pagination import decode_cursor, encode_cursor, fetch_page
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+async def _pages(collection, flt, field, limit, descending=True):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await fetch_page(collection, flt, field, cursor, limit, {"_id": 1, field: 1}, descending)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+async def _messages():
+    collection = AsyncMongoMockClient()["discern"]["messages"]
+    # pairs of rows share a timestamp, so only _id orders them
+    await collection.insert_many(
+        [
+            {"conversation_id": "c1" if i < 10 else "c2", "created_at": START + timedelta(seconds=i // 2)}
+            for i in range(12)
+        ]
+    )
+    return collection
+
+
+def test_cursor_round_trips_datetimes_and_plain_values():
+    _id = ObjectId()
+    assert decode_cursor(encode_cursor(START, _id)) == (START, _id)
+    assert decode_cursor(encode_cursor("ada@example.com", _id)) == ("ada@example.com", _id)
+    assert decode_cursor(encode_cursor(None, _id)) == (None, _id)
+    assert "=" not in encode_cursor(START, _id)
+
+
+# "e30" is base64 for "{}": well-formed, but without the keys
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(1, ObjectId())[:-4]])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+async def test_pages_walk_every_row_once_newest_first():
+    collection = await _messages()
+    pages = await _pages(collection, {"conversation_id": "c1"}, "created_at", limit=3)
+
+    assert [len(p) for p in pages] == [3, 3, 3, 1]
+    rows = [r for p in pages for r in p]
+    expected = await collection.find({"conversation_id": "c1"}).sort([("created_at", -1), ("_id", -1)]).to_list(None)
+    assert [r["_id"] for r in rows] == [r["_id"] for r in expected]
+
+
+async def test_ascending_pages_and_exact_last_page():
+    collection = await _messages()
+    pages = await _pages(collection, {"conversation_id": "c1"}, "created_at", limit=5, descending=False)
+
+    assert [len(p) for p in pages] == [5, 5]
+    keys = [(r["created_at"], r["_id"]) for p in pages for r in p]
+    assert keys == sorted(keys)
+
+
+async def test_filter_applies_on_every_page():
+    collection = await _messages()
+    pages = await _pages(collection, {"conversation_id": "c2"}, "created_at", limit=1)
+    assert [len(p) for p in pages] == [1, 1]
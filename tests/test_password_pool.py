@@ -0,0 +1,44 @@
+# tests/test_password_pool.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from api.auth import auth
+from api.auth.auth import _run_password_job, password_pool_stats
+
+
+def _boom():
+    raise ValueError("malformed hash")
+
+
+async def test_failed_jobs_are_not_counted_as_completed():
+    before = password_pool_stats()
+    assert await _run_password_job(lambda a, b: a + b, 1, 2) == 3
+    with pytest.raises(ValueError):
+        await _run_password_job(_boom)
+
+    after = password_pool_stats()
+    assert after["completed"] - before["completed"] == 1
+    assert after["failed"] - before["failed"] == 1
+    assert after["pending"] == 0
+
+
+async def test_concurrent_callers_cannot_overshoot_the_pending_limit(monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_MAX_PENDING", 2)
+    release = threading.Event()
+    before = password_pool_stats()
+
+    results = await asyncio.gather(
+        *(_run_password_job(release.wait, 5) for _ in range(5)),
+        asyncio.get_running_loop().run_in_executor(None, lambda: (release.wait(0.2), release.set())),
+        return_exceptions=True,
+    )
+
+    rejected = [r for r in results[:5] if isinstance(r, HTTPException)]
+    assert len(rejected) == 3 and all(r.status_code == 503 for r in rejected)
+    after = password_pool_stats()
+    assert after["rejected"] - before["rejected"] == 3
+    assert after["completed"] - before["completed"] == 2
+    assert after["peak_pending"] <= max(before["peak_pending"], 2)
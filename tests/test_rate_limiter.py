@@ -0,0 +1,110 @@
+# tests/test_rate_limiter.py
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from api.ratelimit import limiter
+from api.ratelimit.limiter import RateLimiter, RatePolicy, _TokenBucket
+
+HOUR = 3600
+# a window boundary, plus a little
+T0 = 1000 * HOUR + 10
+
+
+class _Clock:
+    """Stands in for the `time` module: one hand-moved clock for wall and monotonic time."""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(T0)
+    monkeypatch.setattr(limiter, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def collection():
+    return AsyncMongoMockClient()["discern"]["rate_limits"]
+
+
+def _limiter(collection, spec="3/h"):
+    return RateLimiter(collection, {"subscriber": RatePolicy.parse(spec), "admin": RatePolicy.parse("unlimited")})
+
+
+@pytest.mark.parametrize(
+    "spec, limit, window",
+    [("25/1d", 25, 86400), ("25/h", 25, 3600), ("100 / 30m", 100, 1800), ("unlimited", None, 3600), ("", None, 3600)],
+)
+def test_parse(spec, limit, window):
+    assert RatePolicy.parse(spec) == RatePolicy(limit=limit, window=window)
+
+
+@pytest.mark.parametrize("spec", ["25", "25/1w", "x/h", "-1/h", "25/h/2", "1.5/h"])
+def test_parse_errors(spec):
+    with pytest.raises(ValueError, match="Invalid rate limit spec"):
+        RatePolicy.parse(spec)
+
+
+def test_local_bucket_refills_at_the_window_rate(clock):
+    bucket = _TokenBucket(capacity=2, window=60)
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+    assert bucket.seconds_until_token() == 30
+    clock.now += 29
+    assert not bucket.take()
+    clock.now += 1
+    assert bucket.take()
+    # never refills past capacity
+    clock.now += 3600
+    assert bucket.take() and bucket.take() and not bucket.take()
+
+
+async def test_window_boundary_blends_the_previous_window(clock, collection):
+    rl = _limiter(collection)
+    assert [(await rl.hit("u1", "subscriber")).remaining for _ in range(3)] == [2, 1, 0]
+    assert not (await rl.hit("u1", "subscriber")).allowed
+
+    # right after the boundary the full previous window still counts
+    clock.now = 1001 * HOUR
+    decision = await rl.hit("u1", "subscriber")
+    assert not decision.allowed and decision.retry_after == HOUR
+
+    # halfway through, it counts half: 1 + 3 * 0.5 = 2.5 of 3
+    clock.now = 1001 * HOUR + HOUR / 2
+    decision = await rl.hit("u1", "subscriber")
+    assert decision.allowed and decision.remaining == 0
+
+
+async def test_rejected_hit_is_rolled_back(clock, collection):
+    # two workers sharing the Mongo buckets; the second one's local bucket is still full
+    first, second = _limiter(collection), _limiter(collection)
+    for _ in range(3):
+        assert (await first.hit("u1", "subscriber")).allowed
+    bucket_id = f"u1:{HOUR}:{1000 * HOUR}"
+
+    decision = await second.hit("u1", "subscriber")
+
+    assert not decision.allowed and decision.retry_after == HOUR - 10
+    assert (await collection.find_one({"_id": bucket_id}))["count"] == 3
+    assert second.stats()["rejected_shared"] == 1
+    # and the refused worker now stops locally instead of going back to Mongo
+    assert not (await second.hit("u1", "subscriber")).allowed
+    assert second.stats()["rejected_local"] == 1
+    assert (await collection.find_one({"_id": bucket_id}))["count"] == 3
+
+
+async def test_unlimited_roles_skip_the_count(clock, collection):
+    rl = _limiter(collection)
+    for _ in range(10):
+        assert (await rl.hit("admin-1", "admin")).allowed
+    assert await collection.count_documents({}) == 0
+    # roles without a policy get the fallback one
+    assert rl.policy_for("unsubscribed") == RatePolicy(limit=3, window=HOUR)
@@ -0,0 +1,88 @@
+# tests/test_references.py
+import pytest
+
+from api.scripture.books import book_code, synonym_rules
+from api.scripture.references import LAST_VERSE, Span, find_references, format_span, parse_references
+
+
+def _labels(text):
+    return ["; ".join(format_span(s) for s in spans) for _, _, spans in find_references(text)]
+
+
+@pytest.mark.parametrize(
+    "ref, spans",
+    [
+        ("John 3:16", [Span("JHN", 3, 16, 3, 16)]),
+        ("John 3:16-18", [Span("JHN", 3, 16, 3, 18)]),
+        ("Gen 1:1-2:3", [Span("GEN", 1, 1, 2, 3)]),
+        ("Psalm 23", [Span("PSA", 23, 1, 23, LAST_VERSE)]),
+        ("1 Cor 13:4-7, 13", [Span("1CO", 13, 4, 13, 7), Span("1CO", 13, 13, 13, 13)]),
+        ("Ps 23; Rom 8:28", [Span("PSA", 23, 1, 23, LAST_VERSE), Span("ROM", 8, 28, 8, 28)]),
+        ("John 3:16; 4:1", [Span("JHN", 3, 16, 3, 16), Span("JHN", 4, 1, 4, 1)]),
+        ("Jude 3", [Span("JUD", 1, 3, 1, 3)]),
+        ("First Samuel 3:10", [Span("1SA", 3, 10, 3, 10)]),
+        ("Is 53:5", [Span("ISA", 53, 5, 53, 5)]),
+        ("Am 5:24", [Span("AMO", 5, 24, 5, 24)]),
+        ("Song of Songs 2:4", [Span("SNG", 2, 4, 2, 4)]),
+        ("John 3.16", [Span("JHN", 3, 16, 3, 16)]),
+        ("John 3.16-17", [Span("JHN", 3, 16, 3, 17)]),
+        ("John 3:16 KJV", [Span("JHN", 3, 16, 3, 16)]),
+        ("John 3:16 (esv)", [Span("JHN", 3, 16, 3, 16)]),
+        ("Ps 23, NIV", [Span("PSA", 23, 1, 23, LAST_VERSE)]),
+    ],
+)
+def test_parse_references(ref, spans):
+    assert parse_references(ref) == spans
+
+
+@pytest.mark.parametrize("text", ["love your enemies", "Genesis", "John 3:18-16", "John 0:1", "Hezekiah 3:1", "KJV"])
+def test_parse_references_rejects_non_references(text):
+    assert parse_references(text) is None
+
+
+def test_format_span_round_trips():
+    for ref in ("John 3:16", "John 3:16-18", "Genesis 1:1-2:3", "Psalms 23", "Psalms 120-122"):
+        assert [format_span(s) for s in parse_references(ref)] == [ref]
+
+
+def test_find_references_in_free_text():
+    text = "Read Song of Songs 2:4 and Is 53:5; about 1 Cor 13:4 see also john 3.16. Romans 8 (KJV) and Am 5:24."
+    assert _labels(text) == [
+        "Song of Songs 2:4",
+        "Isaiah 53:5",
+        "1 Corinthians 13:4",
+        "John 3:16",
+        "Romans 8",
+        "Amos 5:24",
+    ]
+
+
+def test_find_references_reports_offsets():
+    text = "See John 3:16-17 today."
+    [(start, end, _)] = find_references(text)
+    assert text[start:end] == "John 3:16-17"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "he did the job 3 times",
+        "it is 5 miles away",
+        "I am 5 years old",
+        "Is 5 enough?",
+        "a song 3 minutes long",
+        "mark 2 more",
+    ],
+)
+def test_find_references_ignores_ordinary_words(text):
+    assert find_references(text) == []
+
+
+def test_capitalized_book_without_verse_is_a_reference():
+    assert _labels("Job 3 is bleak; so is the Book of Job 4.") == ["Job 3", "Job 4"]
+
+
+def test_word_abbreviations_stay_out_of_index_synonyms():
+    assert book_code("is") == "ISA" and book_code("am") == "AMO"
+    rules = {rule.rsplit(" => ", 1)[1]: rule.rsplit(" => ", 1)[0].split(", ") for rule in synonym_rules()}
+    assert "is" not in rules["isa"] and "am" not in rules["amo"] and "song" not in rules["sng"]
@@ -0,0 +1,72 @@
+# tests/test_response_cache.py
+from api.cache.response_cache import ResponseCache, normalize_prompt, response_cache
+from api.crew.agent_handler import build_inputs
+from crew.discern_crew import CrewRun
+
+PREFS = {"translation": "KJV", "citation_style": "inline", "include_direct_quotes": True}
+
+
+def _context(prompt, **prefs):
+    return {"user_input": prompt, "user_data": {"preferences": {**PREFS, **prefs}}}
+
+
+def _run(text):
+    return CrewRun(raw=text, intent="assurance", timings={"total": 4.0})
+
+
+def test_normalize_prompt_expands_contractions():
+    assert normalize_prompt("How do I know I'm NOT saved?") == "how do i know i am not saved"
+    assert normalize_prompt("Why doesn’t God answer?") == "why does not god answer"
+
+
+def test_exact_key_ignores_case_and_punctuation():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0)
+    cache.store(_context("How do I know I'm saved?"), _run("answer"))
+    hit = cache.lookup(_context("how do i know i am saved"))
+    assert hit.raw == "answer" and hit.cached
+
+
+def test_key_includes_answer_preferences():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0)
+    cache.store(_context("what is grace"), _run("answer"))
+    assert cache.lookup(_context("what is grace", translation="WEB")) is None
+    assert cache.lookup(_context("what is grace", include_direct_quotes=False)) is None
+
+
+def test_key_covers_every_preference_the_prompt_shows():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0)
+    context = _context("what is grace", locale="es-MX", use_denomination_weighting=False)
+    cache.store(context, _run("respuesta"))
+    assert cache.lookup(_context("what is grace")) is None
+    assert cache.lookup(_context("what is grace", locale="es-MX")) is None
+    # same preferences stored in another order are the same prompt, and the same key
+    reordered = {**context, "user_data": {"preferences": dict(reversed(context["user_data"]["preferences"].items()))}}
+    assert cache.lookup(reordered).raw == "respuesta"
+    assert "locale: es-MX" in build_inputs(context)["user_profile"]
+
+
+def test_personal_turns_are_never_cached():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0)
+    context = {**_context("what is grace"), "conversation": [{"role": "user", "message": "hi"}]}
+    cache.store(context, _run("answer"))
+    assert cache.lookup(context) is None
+    assert len(cache._exact) == 0
+
+
+def test_similarity_fallback_is_off_by_default():
+    assert response_cache.similarity_threshold == 0
+
+
+def test_similar_prompt_is_served_when_enabled():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0.8)
+    cache.store(_context("how do i know i am saved"), _run("assurance answer"))
+    cache.store(_context("what is the trinity"), _run("trinity answer"))
+    hit = cache.lookup(_context("how do i really know i am saved"))
+    assert hit is not None and hit.raw == "assurance answer"
+
+
+def test_negated_prompt_is_not_a_near_match():
+    cache = ResponseCache(maxsize=10, ttl=60, similarity_threshold=0.5)
+    cache.store(_context("how do I know I'm saved"), _run("assurance answer"))
+    assert cache.lookup(_context("how do I know I'm not saved")) is None
+    assert cache.lookup(_context("why do I know I'm saved")) is None
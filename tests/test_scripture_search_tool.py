@@ -0,0 +1,43 @@
+# tests/test_scripture_search_tool.py
+import pytest
+from conftest import SEED_NAMES
+
+from api.scripture.verse_store import VerseStore
+from crew.tools import scripture_search_tool
+from crew.tools.scripture_search_tool import ScriptureSearchTool, gather_scripture
+
+
+@pytest.fixture(autouse=True)
+def store(seed_dir, monkeypatch):
+    store = VerseStore(data_dir=str(seed_dir), files=SEED_NAMES.values(), default_translation="KJV")
+    store.load()
+    monkeypatch.setattr(scripture_search_tool, "verse_store", store)
+    return store
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    sent = []
+
+    def _msearch(bodies):
+        sent.extend(bodies)
+        return [[] for _ in bodies]
+
+    monkeypatch.setattr(scripture_search_tool, "_msearch", _msearch)
+    monkeypatch.setattr(scripture_search_tool, "SCRIPTURE_BACKEND", "elastic")
+    return sent
+
+
+@pytest.mark.parametrize("preference, served", [("NIV", "KJV"), ("ESV", "KJV"), ("WEB", "WEB"), ("DEFAULT", "DEFAULT")])
+def test_translations_outside_the_corpus_fall_back_to_the_default(preference, served):
+    assert ScriptureSearchTool(translation=preference).translation == served
+
+
+def test_niv_reader_still_gets_passages(searches):
+    tool = ScriptureSearchTool(translation="NIV")
+    passages, topic = gather_scripture(tool, "what does John 3:16 mean", {"primary_intent": "teaching"})
+
+    assert topic is None
+    assert [(v["reference"], v["translation"]) for v in passages] == [("JHN 3:16", "KJV")]
+    # full-text searches are filtered to the translation served, not to one the index lacks
+    assert searches and "NIV" not in str(searches) and "KJV" in str(searches)
@@ -0,0 +1,72 @@
+# tests/test_stripe_gateway.py
+import anyio
+import pytest
+import stripe
+from fake_stripe import FakeStripe
+from mongomock_motor import AsyncMongoMockClient
+
+from api.billing.stripe_gateway import StripeGateway
+
+
+@pytest.fixture
+def fake_stripe(monkeypatch):
+    server = FakeStripe().start()
+    monkeypatch.setattr(stripe, "api_base", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def status_collection():
+    return AsyncMongoMockClient()["discern"]["stripe_status"]
+
+
+def _subscription_calls(server):
+    return sum(1 for call in server.requests if call == ("GET", "/v1/subscriptions"))
+
+
+async def test_create_customer(fake_stripe, status_collection):
+    gateway = StripeGateway(status_collection, max_workers=2, status_ttl=60)
+    assert await gateway.create_customer("ann@example.com") == "cus_1"
+    assert fake_stripe.customers["cus_1"]["email"] == "ann@example.com"
+
+
+async def test_status_is_cached(fake_stripe, status_collection):
+    fake_stripe.add_subscription("cus_1", "active")
+    gateway = StripeGateway(status_collection, max_workers=2, status_ttl=60)
+    first = await gateway.active_subscription("cus_1")
+    second = await gateway.active_subscription("cus_1")
+    assert first == second == {"id": "sub_1", "status": "active", "cancel_at_period_end": False}
+    assert _subscription_calls(fake_stripe) == 1
+
+
+async def test_webhook_invalidation_reaches_every_worker(fake_stripe, status_collection):
+    fake_stripe.add_subscription("cus_1", "active")
+    # two workers sharing one database
+    worker_a = StripeGateway(status_collection, max_workers=2, status_ttl=60)
+    worker_b = StripeGateway(status_collection, max_workers=2, status_ttl=60)
+    assert (await worker_b.active_subscription("cus_1"))["status"] == "active"
+
+    fake_stripe.add_subscription("cus_1", "canceled")
+    await worker_a.invalidate("cus_1")
+
+    assert await worker_b.active_subscription("cus_1") is None
+    assert _subscription_calls(fake_stripe) == 2
+
+
+async def test_fetch_racing_a_webhook_is_not_cached(fake_stripe, status_collection):
+    fake_stripe.add_subscription("cus_1", "active")
+    gateway = StripeGateway(status_collection, max_workers=2, status_ttl=60)
+    fetch = gateway._fetch_active_subscription
+
+    def fetch_then_webhook(customer_id):
+        sub = fetch(customer_id)
+        # the webhook lands while Stripe's (now stale) answer is in flight
+        fake_stripe.add_subscription("cus_1", "canceled")
+        anyio.from_thread.run(gateway.invalidate, customer_id)
+        return sub
+
+    gateway._fetch_active_subscription = fetch_then_webhook
+    assert (await gateway.active_subscription("cus_1"))["status"] == "active"
+    gateway._fetch_active_subscription = fetch
+    assert await gateway.active_subscription("cus_1") is None
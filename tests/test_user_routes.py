@@ -0,0 +1,38 @@
+# tests/test_user_routes.py
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.auth.deps import get_current_user
+from api.db import users_repo
+from api.routes import user as user_routes
+
+
+def _client(current_user):
+    app = FastAPI()
+    app.include_router(user_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: current_user
+    return TestClient(app)
+
+
+def test_delete_user_calls_the_repository(monkeypatch):
+    deleted = []
+
+    async def fake_delete(query):
+        deleted.append(query)
+        return True
+
+    monkeypatch.setattr(users_repo, "delete_user", fake_delete)
+    user_id = ObjectId()
+    r = _client({"_id": ObjectId(), "role": "admin"}).delete(f"/users/{user_id}")
+    assert r.status_code == 204
+    assert deleted == [{"_id": user_id}]
+
+
+def test_delete_unknown_user_is_404(monkeypatch):
+    async def fake_delete(query):
+        return False
+
+    monkeypatch.setattr(users_repo, "delete_user", fake_delete)
+    r = _client({"_id": ObjectId(), "role": "admin"}).delete(f"/users/{ObjectId()}")
+    assert r.status_code == 404